@@ -0,0 +1,126 @@
+"""
+Benchmark of checking of permissions by ``RestAclHelper`` for items
+of a listing page. Evaluation of ACL without caches is compared with
+cached parsed permissions of ACE and with caches of a request (compiled
+ACL and memoized decisions).
+
+Usage:
+
+    PYTHONPATH=src python benchmarks/bench_acl.py
+"""
+
+import timeit
+
+from pyramid.authorization import (
+    ACLAllowed,
+    ACLDenied,
+    ALL_PERMISSIONS,
+    Allow,
+    Authenticated,
+    Deny,
+    Everyone,
+)
+from pyramid.location import lineage
+from pyramid.testing import DummyRequest
+from pyramid.util import is_nonstr_iter
+
+from restfw.authorization import (
+    _BASE_PERMISSIONS,
+    RestAclHelper,
+    _match_permission,
+)
+
+
+PAGE_SIZE = 50
+PERMISSIONS = ['get', 'get.item.view', 'patch.item.edit', 'delete']
+
+
+class Location:
+    def __init__(self, name, parent=None, acl=None):
+        self.__name__ = name
+        self.__parent__ = parent
+        if acl is not None:
+            self.__acl__ = acl
+
+
+class AclHelperBefore(RestAclHelper):
+    """RestAclHelper before compilation of ACL."""
+
+    def permits(self, context, principals, permission, request=None):
+        acl = '<No ACL found on any object in resource lineage>'
+        base_permission, _, context_permission = permission.partition('.')
+        if base_permission and base_permission not in _BASE_PERMISSIONS:
+            context_permission = permission
+            base_permission = ''
+        for location in lineage(context):
+            try:
+                acl = location.__acl__
+            except AttributeError:
+                continue
+            if acl and callable(acl):
+                acl = acl()
+            for ace_action, ace_principal, ace_permissions in acl:
+                if ace_principal in principals:
+                    if not is_nonstr_iter(ace_permissions):
+                        ace_permissions = [ace_permissions]
+                    if _match_permission(
+                        base_permission, context_permission, ace_permissions
+                    ):
+                        if ace_action == Allow:
+                            ace = (ace_action, ace_principal, ace_permissions)
+                            return ACLAllowed(
+                                ace, acl, permission, principals, location
+                            )
+                        ace = (ace_action, ace_principal, ace_permissions)
+                        return ACLDenied(ace, acl, permission, principals, location)
+        return ACLDenied('<default deny>', acl, permission, principals, context)
+
+
+def main():
+    root = Location(
+        '',
+        acl=[
+            (Allow, 'group:admins', ALL_PERMISSIONS),
+            (Allow, Authenticated, ['get', 'item.view']),
+            (Deny, Everyone, ALL_PERMISSIONS),
+        ],
+    )
+    container = Location(
+        'items',
+        root,
+        acl=[
+            (Allow, 'group:editors', ['patch.item.', 'post.item.create']),
+            (Deny, 'user:banned', ALL_PERMISSIONS),
+        ],
+    )
+    items = [Location(str(i), container) for i in range(PAGE_SIZE)]
+    principals = {Everyone, Authenticated, 'user:1', 'group:editors'}
+
+    def check_page(helper, request=None):
+        for item in items:
+            for permission in PERMISSIONS:
+                helper.permits(item, principals, permission, request=request)
+
+    def check_pages(helper, with_request):
+        # Every page is rendered by a new request, items are checked
+        # for the listing and for embedded links of items
+        request = DummyRequest() if with_request else None
+        check_page(helper, request)
+        check_page(helper, request)
+
+    number = 200
+    for title, helper, with_request in [
+        ('before', AclHelperBefore(), False),
+        ('parsed permissions', RestAclHelper(), False),
+        ('request caches', RestAclHelper(), True),
+    ]:
+        best = min(
+            timeit.repeat(
+                lambda: check_pages(helper, with_request), number=number, repeat=5
+            )
+        )
+        print(f'{title:>18}: {best / number * 1e6:8.1f} us')
+
+
+if __name__ == '__main__':
+    main()
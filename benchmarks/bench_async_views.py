@@ -0,0 +1,111 @@
+"""
+Benchmark of sync and async resource views with I/O-bound methods
+(emulated by sleep). Containers embed ten resources, representations
+of embedded resources with async views are built concurrently.
+
+Usage:
+
+    PYTHONPATH=src python benchmarks/bench_async_views.py
+"""
+
+import asyncio
+import time
+
+from pyramid.authorization import ALL_PERMISSIONS, Allow, Everyone
+from pyramid.config import Configurator
+from webtest import TestApp
+
+from restfw import views
+from restfw.async_views import AsyncHalResourceView, AsyncHalResourceWithEmbeddedView
+from restfw.hal import HalResource, SimpleContainer
+from restfw.root import Root
+
+
+IO_DELAY = 0.005
+EMBEDDED_COUNT = 10
+
+
+class Item(HalResource):
+    pass
+
+
+class Container(SimpleContainer):
+    __acl__ = [(Allow, Everyone, ALL_PERMISSIONS)]
+
+
+class SyncItemView(views.HalResourceView):
+    def as_dict(self):
+        time.sleep(IO_DELAY)
+        return {'name': self.resource.__name__}
+
+
+class SyncContainerView(views.HalResourceWithEmbeddedView):
+    def get_embedded(self, params):
+        time.sleep(IO_DELAY)
+        return views.list_to_embedded_resources(
+            self.request, params, list(self.resource.values()), self.resource, 'items'
+        )
+
+
+class AsyncItem(Item):
+    pass
+
+
+class AsyncContainer(Container):
+    pass
+
+
+class AsyncItemView(AsyncHalResourceView):
+    async def as_dict(self):
+        await asyncio.sleep(IO_DELAY)
+        return {'name': self.resource.__name__}
+
+
+class AsyncContainerView(AsyncHalResourceWithEmbeddedView):
+    async def get_embedded(self, params):
+        await asyncio.sleep(IO_DELAY)
+        return views.list_to_embedded_resources(
+            self.request, params, list(self.resource.values()), self.resource, 'items'
+        )
+
+
+def make_app():
+    with Configurator(settings={}) as config:
+        config.include('restfw')
+        config.add_resource_view(SyncItemView, Item)
+        config.add_resource_view(SyncContainerView, Container)
+        config.add_resource_view(AsyncItemView, AsyncItem)
+        config.add_resource_view(AsyncContainerView, AsyncContainer)
+        wsgi_app = config.make_wsgi_app()
+
+    registry = wsgi_app.registry
+    root = registry._restfw_root = Root(registry)
+    for name, container_class, item_class in [
+        ('sync', Container, Item),
+        ('async', AsyncContainer, AsyncItem),
+    ]:
+        root[name] = container = container_class()
+        for i in range(EMBEDDED_COUNT):
+            container[f'item-{i}'] = item_class()
+    return TestApp(wsgi_app)
+
+
+def main():
+    app = make_app()
+    print(f'I/O delay {IO_DELAY * 1000:.0f} ms, {EMBEDDED_COUNT} embedded resources')
+    for title, path in [
+        ('sync item', '/sync/item-0/'),
+        ('async item', '/async/item-0/'),
+        ('sync container', '/sync/'),
+        ('async container', '/async/'),
+    ]:
+        count = 20
+        start = time.perf_counter()
+        for _ in range(count):
+            app.get(path)
+        elapsed = (time.perf_counter() - start) / count
+        print(f'{title:>16}: {elapsed * 1000:6.1f} ms per request')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark of calculation of automatic weak ETags from rendered bodies.
+The cost of digest is compared with cost of rendering the same body.
+
+Usage:
+
+    PYTHONPATH=src python benchmarks/bench_auto_etag.py
+"""
+
+import hashlib
+import timeit
+import zlib
+
+from restfw.renderers import build_json_renderer
+from restfw.viewderivers import get_body_etag
+
+
+def get_payload(count):
+    return {
+        '_links': {'self': {'href': 'http://localhost/items/'}},
+        '_embedded': {
+            'items': [
+                {
+                    '_links': {'self': {'href': f'http://localhost/items/{i}/'}},
+                    'id': i,
+                    'title': f'Item {i}',
+                    'description': 'Some description of item',
+                }
+                for i in range(count)
+            ]
+        },
+    }
+
+
+DIGESTS = [
+    ('crc32 (auto_etag)', get_body_etag),
+    ('adler32', lambda body: zlib.adler32(body)),
+    ('md5', lambda body: hashlib.md5(body).hexdigest()),
+    ('sha1', lambda body: hashlib.sha1(body).hexdigest()),
+]
+
+
+def main():
+    render = build_json_renderer(ensure_ascii=False)(None)
+    system = {'request': None}
+    for count in (10, 100, 1000, 10000):
+        payload = get_payload(count)
+        body = render(payload, system).encode('utf-8')
+        number = max(10, 100000 // count)
+        render_time = min(
+            timeit.repeat(lambda: render(payload, system), number=number, repeat=5)
+        )
+        render_time = render_time / number * 1e6
+        print(f'{len(body):>9} bytes, render: {render_time:10.1f} us')
+        for name, digest in DIGESTS:
+            best = min(timeit.repeat(lambda: digest(body), number=number, repeat=5))
+            per_call = best / number * 1e6
+            print(
+                f'    {name:18} {per_call:10.1f} us'
+                f'  ({per_call / render_time * 100:5.2f}% of render)'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark of compression of rendered bodies by the JSON renderer.
+Bytes on the wire and CPU time are compared for every available
+content-coding and compression level.
+
+Usage:
+
+    PYTHONPATH=src python benchmarks/bench_compression.py
+"""
+
+import timeit
+
+from restfw.renderers import COMPRESSORS, Compression, build_json_renderer
+
+
+def get_payload(count):
+    return {
+        '_links': {'self': {'href': 'http://localhost/items/'}},
+        '_embedded': {
+            'items': [
+                {
+                    '_links': {'self': {'href': f'http://localhost/items/{i}/'}},
+                    'id': i,
+                    'title': f'Item {i}',
+                    'description': 'Some description of item',
+                }
+                for i in range(count)
+            ]
+        },
+    }
+
+
+LEVELS = {
+    'gzip': (1, 6, 9),
+    'deflate': (1, 6, 9),
+    'zstd': (1, 3, 9, 19),
+}
+
+
+def main():
+    render = build_json_renderer(ensure_ascii=False)(None)
+    system = {'request': None}
+    for count in (10, 100, 1000, 10000):
+        payload = get_payload(count)
+        body = render(payload, system).encode('utf-8')
+        number = max(10, 10000 // count)
+        render_time = min(
+            timeit.repeat(lambda: render(payload, system), number=number, repeat=5)
+        )
+        render_time = render_time / number * 1e6
+        print(f'{len(body):>9} bytes, render: {render_time:10.1f} us')
+        for encoding in COMPRESSORS:
+            for level in LEVELS.get(encoding, (6,)):
+                compression = Compression([encoding], level=level)
+                compressed = compression.compress(body, encoding)
+                best = min(
+                    timeit.repeat(
+                        lambda: compression.compress(body, encoding),
+                        number=number,
+                        repeat=5,
+                    )
+                )
+                per_call = best / number * 1e6
+                print(
+                    f'    {encoding:>7} level {level:<2} {len(compressed):>9} bytes'
+                    f' ({len(compressed) / len(body) * 100:5.1f}%)'
+                    f' {per_call:10.1f} us'
+                    f'  ({per_call / render_time * 100:6.1f}% of render)'
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark of JSON renderers on payloads with many non-JSON values.
+
+Usage:
+
+    PYTHONPATH=src python benchmarks/bench_json_renderer.py
+"""
+
+import datetime
+import timeit
+from decimal import Decimal
+
+from pyramid.renderers import JSON
+
+from restfw.renderers import JSON as RestfwJSON
+from restfw.renderers import (
+    build_json_renderer,
+    date_adapter,
+    datetime_adapter,
+    decimal_adapter,
+    time_adapter,
+)
+
+
+def get_payload(count=1000):
+    now = datetime.datetime(2020, 1, 2, 3, 4, 5, 678)
+    return [
+        {
+            'id': i,
+            'created': now,
+            'updated': now,
+            'date': now.date(),
+            'time': now.time(),
+            'cost': Decimal('10.25'),
+            'price': Decimal(i),
+            'title': f'Item {i}',
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    payload = get_payload()
+    system = {'request': None}
+    adapters = [
+        (datetime.datetime, datetime_adapter),
+        (datetime.date, date_adapter),
+        (datetime.time, time_adapter),
+        (Decimal, decimal_adapter),
+    ]
+    pyramid_renderer = JSON(adapters=adapters, ensure_ascii=False)
+    renderers = [
+        ('pyramid JSON', pyramid_renderer(None)),
+        ('restfw stdlib', build_json_renderer(ensure_ascii=False)(None)),
+        (
+            'restfw orjson',
+            RestfwJSON(adapters=adapters, backend='orjson', ensure_ascii=False)(None),
+        ),
+    ]
+    expected = renderers[0][1](payload, system)
+    assert renderers[1][1](payload, system) == expected
+    compact = RestfwJSON(adapters=adapters, separators=(',', ':'), ensure_ascii=False)
+    assert renderers[2][1](payload, system) == compact(None)(payload, system)
+
+    number = 20
+    base_time = None
+    for name, render in renderers:
+        best = min(
+            timeit.repeat(lambda: render(payload, system), number=number, repeat=5)
+        )
+        per_call = best / number * 1000
+        base_time = base_time or per_call
+        print(f'{name:16} {per_call:8.2f} ms/render  x{base_time / per_call:.2f}')
+
+
+if __name__ == '__main__':
+    main()
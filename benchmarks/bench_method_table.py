@@ -0,0 +1,100 @@
+"""
+Benchmark of per-request lookups of HTTP method options of resource views:
+building of OPTIONS response headers, method checks, lookups of input
+schemas and permissions. The per-request ``getattr`` approach used before
+is compared with precompiled method tables.
+
+Usage:
+
+    PYTHONPATH=src python benchmarks/bench_method_table.py
+"""
+
+import timeit
+
+from restfw import interfaces, schemas
+from restfw.views import HalResourceView, get_method_table
+
+
+class DummyView(HalResourceView):
+    options_for_get = interfaces.MethodOptions(
+        schemas.GetResourceSchema, schemas.HalResourceSchema, permission='get'
+    )
+    options_for_put = interfaces.MethodOptions(schemas.GetResourceSchema)
+    options_for_delete = interfaces.MethodOptions(None, None, permission='edit')
+
+
+def get_allowed_methods_before(view_class):
+    methods = {'OPTIONS'}
+    for method in ('get', 'put', 'patch', 'delete', 'post'):
+        method_options = f'options_for_{method}'
+        method_options = getattr(view_class, method_options, None)
+        if method_options is not None:
+            methods.add(method.upper())
+    if 'GET' in methods:
+        methods.add('HEAD')
+    return methods
+
+
+def options_before():
+    return ', '.join(get_allowed_methods_before(DummyView))
+
+
+def options_after():
+    return get_method_table(DummyView).allow_header
+
+
+def method_check_before():
+    return 'PUT' in get_allowed_methods_before(DummyView)
+
+
+def method_check_after():
+    return 'PUT' in get_method_table(DummyView).allowed_methods
+
+
+def input_schema_before(request_method='HEAD'):
+    request_method = request_method.lower()
+    request_method = 'get' if request_method == 'head' else request_method
+    method_options = getattr(DummyView, f'options_for_{request_method}', None)
+    return method_options.input_schema if method_options else None
+
+
+def input_schema_after(request_method='HEAD'):
+    return get_method_table(DummyView).input_schemas.get(request_method.lower())
+
+
+def permission_before(http_method='delete'):
+    if options := getattr(DummyView, f'options_for_{http_method}', None):
+        if permission := options.permission:
+            return f'{http_method}.{permission}'
+
+
+def permission_after(http_method='delete'):
+    table = get_method_table(DummyView)
+    if options := table.options.get(http_method):
+        if options.permission:
+            return table.permissions[http_method]
+
+
+CASES = [
+    ('OPTIONS Allow header', options_before, options_after),
+    ('method check', method_check_before, method_check_after),
+    ('input schema lookup', input_schema_before, input_schema_after),
+    ('permission lookup', permission_before, permission_after),
+]
+
+
+def main():
+    number = 200000
+    for name, before, after in CASES:
+        assert sorted(str(before()).split(', ')) == sorted(str(after()).split(', '))
+        before_time = min(timeit.repeat(before, number=number, repeat=5))
+        after_time = min(timeit.repeat(after, number=number, repeat=5))
+        print(
+            f'{name:22} before: {before_time / number * 1e9:7.0f} ns'
+            f'  after: {after_time / number * 1e9:7.0f} ns'
+            f'  x{before_time / after_time:.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark of binding and deserialization of input schemas.
+``schema().bind(...).deserialize(...)`` executed for every request is
+compared with compiled schemas from ``restfw.schema_cache``.
+
+Usage:
+
+    PYTHONPATH=src python benchmarks/bench_schema_cache.py
+"""
+
+import timeit
+
+import colander
+from webob.multidict import MultiDict
+
+from restfw import schemas
+from restfw.schema_cache import get_compiled_schema
+
+
+FIELDS_COUNT = 50
+
+
+def make_group_schema():
+    nodes = {}
+    for i in range(FIELDS_COUNT // 5):
+        nodes[f'string_{i}'] = schemas.StringNode(missing='')
+        nodes[f'int_{i}'] = schemas.IntegerNode(
+            missing=0, validator=colander.Range(min=0)
+        )
+        nodes[f'bool_{i}'] = schemas.BooleanNode(missing=False)
+        nodes[f'choice_{i}'] = schemas.StringNode(
+            missing='a', validator=schemas.LaconicOneOf(['a', 'b', 'c'])
+        )
+        nodes[f'time_{i}'] = schemas.DateTimeNode(nullable=True, missing=None)
+    return type('GroupSchema', (schemas.MappingNode,), nodes)
+
+
+GroupSchema = make_group_schema()
+
+
+class NestedSchema(schemas.MappingNode):
+    title = schemas.StringNode(validator=colander.Length(max=100))
+    group = GroupSchema()
+
+
+NESTED_DATA = {
+    'title': 'Title',
+    'group': {
+        f'{prefix}_{i}': value
+        for i in range(FIELDS_COUNT // 5)
+        for prefix, value in [
+            ('string', 'value'),
+            ('int', '10'),
+            ('bool', 'true'),
+            ('choice', 'b'),
+            ('time', '2026-10-17T10:00:00+00:00'),
+        ]
+    },
+}
+
+GET_DATA = MultiDict({'offset': '20', 'limit': '10', 'fields': 'title'})
+
+
+def main():
+    number = 2000
+    request = object()
+    context = object()
+    for title, schema_class, data in [
+        ('GetEmbeddedSchema', schemas.GetEmbeddedSchema, GET_DATA),
+        (f'nested {FIELDS_COUNT} fields', NestedSchema, NESTED_DATA),
+    ]:
+        compiled = get_compiled_schema(schema_class)
+        expected = schema_class().bind(request=request, context=context)
+        assert compiled.deserialize(
+            data, request=request, context=context
+        ) == expected.deserialize(data)
+
+        cases = [
+            (
+                'bind per call',
+                lambda: (
+                    schema_class()
+                    .bind(request=request, context=context)
+                    .deserialize(data)
+                ),
+            ),
+            (
+                'compiled bind',
+                lambda: compiled.bind(request=request, context=context).deserialize(
+                    data
+                ),
+            ),
+            (
+                'compiled deserialize',
+                lambda: compiled.deserialize(data, request=request, context=context),
+            ),
+        ]
+        print(f'{title} (static: {compiled.is_static})')
+        for name, func in cases:
+            best = min(timeit.repeat(func, number=number, repeat=5))
+            print(f'  {name:>22}: {best / number * 1e6:8.1f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark of deserialization of input data by colander schemas,
+compiled schemas (``restfw.schema_cache``) and functions generated
+by ``restfw.schema_compiler``. Valid and invalid input data is used,
+invalid data falls back to colander.
+
+Usage:
+
+    PYTHONPATH=src python benchmarks/bench_schema_compiler.py
+"""
+
+import timeit
+
+import colander
+from webob.multidict import MultiDict
+
+from restfw import schemas
+from restfw.schema_cache import get_compiled_schema
+from restfw.schema_compiler import get_schema_validator
+
+
+class TagSchema(schemas.MappingNode):
+    name = schemas.StringNode(validator=colander.Length(max=50))
+    weight = schemas.FloatNode(missing=1.0, validator=colander.Range(0, 10))
+
+
+class PostItemSchema(schemas.MappingNode):
+    title = schemas.StringNode(validator=colander.Length(max=100))
+    description = schemas.EmptyStringNode(missing='')
+    count = schemas.IntegerNode(
+        nullable=True, missing=None, validator=colander.Range(min=0)
+    )
+    kind = schemas.StringNode(
+        missing='a', validator=schemas.LaconicOneOf(['a', 'b', 'c'])
+    )
+    enabled = schemas.BooleanNode(missing=False)
+    tags = schemas.SequenceNode(TagSchema(), missing=colander.drop)
+    options = schemas.PreserveMappingSchema(missing=colander.drop)
+
+
+POST_DATA = {
+    'title': ' Title ',
+    'description': 'Description',
+    'count': 10,
+    'kind': 'b',
+    'enabled': True,
+    'tags': [{'name': f'tag {i}', 'weight': i / 2} for i in range(10)],
+    'options': {'a': 1},
+}
+
+INVALID_POST_DATA = dict(POST_DATA, count=-1)
+
+GET_DATA = MultiDict({'offset': '20', 'limit': '10', 'fields': 'title'})
+
+
+def main():
+    number = 2000
+    kw = {'request': object(), 'context': object()}
+    for title, schema_class, data in [
+        ('GetEmbeddedSchema', schemas.GetEmbeddedSchema, GET_DATA),
+        ('POST item', PostItemSchema, POST_DATA),
+        ('invalid POST item', PostItemSchema, INVALID_POST_DATA),
+    ]:
+        compiled = get_compiled_schema(schema_class)
+        validator = get_schema_validator(schema_class)
+        assert validator.is_compiled
+
+        def interpreter():
+            try:
+                return schema_class().bind(**kw).deserialize(data)
+            except colander.Invalid as e:
+                return e.asdict()
+
+        def compiled_schema():
+            try:
+                return compiled.deserialize(data, **kw)
+            except colander.Invalid as e:
+                return e.asdict()
+
+        def generated():
+            try:
+                return validator.deserialize(data, **kw)
+            except colander.Invalid as e:
+                return e.asdict()
+
+        assert interpreter() == compiled_schema() == generated()
+        print(title)
+        for name, func in [
+            ('bind per call', interpreter),
+            ('compiled schema', compiled_schema),
+            ('generated function', generated),
+        ]:
+            best = min(timeit.repeat(func, number=number, repeat=5))
+            print(f'  {name:>20}: {best / number * 1e6:8.1f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark of fabrics of sub-resources with predicates. Evaluation
+of predicates by a generator is compared with chains of predicates
+bound at registration time.
+
+Usage:
+
+    PYTHONPATH=src python benchmarks/bench_sub_resource_dispatch.py
+"""
+
+import timeit
+
+from restfw.config.common import derive_fabric
+from restfw.hal import HalResource
+
+
+class Node(HalResource):
+    def __init__(self, parent):
+        self.__parent__ = parent
+
+
+class TruePredicate:
+    def __init__(self, val, config):
+        self.val = val
+
+    def __call__(self, parent):
+        return True
+
+
+def derive_fabric_before(fabric, predicates):
+    def fabric_wrapper(resource):
+        if all((predicate(resource) for predicate in predicates)):
+            return fabric(resource)
+
+    return fabric_wrapper
+
+
+def timeit_us(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    node = Node(None)
+    number = 100000
+    for count in (1, 2, 3):
+        predicates = [TruePredicate(True, None)] * count
+        fabric_before = derive_fabric_before(Node, predicates)
+        fabric_after = derive_fabric(Node, predicates)
+        before = timeit_us(lambda: fabric_before(node), number)
+        after = timeit_us(lambda: fabric_after(node), number)
+        print(
+            f'{count} predicates: before {before:6.2f} us, after {after:6.2f} us,'
+            f' {before / after:5.2f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark of traversal through chains of sub-resources with depth 2-10.
+Lookup of the registry by ``find_root()`` on every traversal step
+is compared with the registry propagated from parents to sub-resources.
+
+Usage:
+
+    PYTHONPATH=src python benchmarks/bench_traversal.py
+"""
+
+import timeit
+
+from pyramid.config import Configurator
+from pyramid.traversal import find_root
+
+from restfw.hal import HalResource
+from restfw.resources import Resource
+from restfw.root import Root
+
+
+class Node(HalResource):
+    def __init__(self, parent):
+        self.__parent__ = parent
+
+
+def get_registry_by_find_root(resource):
+    return find_root(resource).registry
+
+
+def make_root():
+    with Configurator(settings={}) as config:
+        config.include('restfw')
+        config.add_sub_resource_fabric(Node, 'node', Root)
+        config.add_sub_resource_fabric(Node, 'node', Node)
+        registry = config.registry
+    return Root(registry)
+
+
+def traverse(root, depth):
+    resource = root
+    for _ in range(depth):
+        resource = resource['node']
+    return resource
+
+
+def main():
+    root = make_root()
+    get_registry = Resource.get_registry
+    number = 10000
+    for depth in (2, 4, 6, 8, 10):
+        Resource.get_registry = get_registry_by_find_root
+        try:
+            before = min(
+                timeit.repeat(lambda: traverse(root, depth), number=number, repeat=5)
+            )
+        finally:
+            Resource.get_registry = get_registry
+        after = min(
+            timeit.repeat(lambda: traverse(root, depth), number=number, repeat=5)
+        )
+        before = before / number * 1e6
+        after = after / number * 1e6
+        print(
+            f'depth {depth:>2}: find_root {before:8.2f} us,'
+            f' propagated {after:8.2f} us, {before / after:5.2f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,7 @@
 :Authors: cykooz
 :Date: 12.07.2021
 """
+
 from pyramid.authentication import extract_http_basic_credentials
 from pyramid.authorization import Authenticated, Everyone
 from pyramid.interfaces import ISecurityPolicy
@@ -38,7 +39,7 @@ class ExampleSecurityPolicy:
         if identity is not None:
             principals.add(Authenticated)
             principals.add(identity)
-        return self.helper.permits(context, principals, permission)
+        return self.helper.permits(context, principals, permission, request=request)
 
     def remember(self, request: PyramidRequest, userid, **kw):
         pass
@@ -4,6 +4,7 @@
 """
 from restfw.hal import HalResource
 from restfw.resources import sub_resource_config
+from restfw.utils import get_resource_identity_map
 from .models import FileModel
 from ..users.resources import User
 
@@ -15,6 +16,7 @@ class File(HalResource):
         self.model = model
         self.__parent__ = parent
         self.__name__ = model.name
+        self.__registry__ = parent.__registry__
 
     def http_put(self, request, params):
         self.model.write(request.body)
@@ -36,5 +38,15 @@ class Files(HalResource):
     def __getitem__(self, item):
         if item in ('.', '..'):
             raise KeyError(item)
+        # Return the same instance of file for repeated lookups
+        # inside of one request.
+        identity_map = get_resource_identity_map(registry=self.get_registry())
+        if identity_map is not None:
+            file = identity_map.get_child(self, item)
+            if file is not None:
+                return file
         model = FileModel(self.dir_path / item)
-        return File(model, parent=self)
+        file = File(model, parent=self)
+        if identity_map is not None:
+            identity_map.add_child(self, item, file)
+        return file
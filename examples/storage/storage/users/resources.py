@@ -19,6 +19,7 @@ class User(HalResource):
         self.model = model
         self.__parent__ = parent
         self.__name__ = model.name
+        self.__registry__ = parent.__registry__
 
     def __acl__(self):
         return [
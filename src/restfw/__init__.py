@@ -9,6 +9,7 @@ from pyramid.config import Configurator
 
 def includeme(config: Configurator):
     config.include('restfw.config')
+    config.include('restfw.response_cache')
 
     from . import predicates
     from .viewderivers import register_view_derivers
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+
+Async variants of resource views. Methods ``http_*``, ``as_dict`` and
+``get_embedded`` of these views are coroutines. Resource methods
+``http_post``, ``http_put``, ``http_patch`` and ``http_delete`` may be
+coroutines too.
+
+The router of Pyramid is synchronous, so coroutines are executed in an event
+loop of the current thread and a worker is occupied by a request until its
+coroutines are finished. Async views allow to execute I/O of one request
+concurrently, e.g. representations of embedded resources are built
+concurrently.
+"""
+
+import asyncio
+import threading
+from contextlib import contextmanager
+from inspect import isawaitable
+from typing import Any, Awaitable, Optional
+
+from .errors import ParametersError
+from .typing import Json, PyramidRequest
+from .utils import create_multi_validation_error
+from .views import (
+    EmbeddedResources,
+    HalResourceView,
+    HalResourceWithEmbeddedView,
+    JsonStream,
+    ResourceView,
+    get_resource_view,
+)
+
+
+_thread_local = threading.local()
+
+
+def _get_thread_loop() -> asyncio.AbstractEventLoop:
+    loop = getattr(_thread_local, 'loop', None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _thread_local.loop = loop
+    return loop
+
+
+def run_coroutine(request: Optional[PyramidRequest], coro: Awaitable) -> Any:
+    """Executes a coroutine from synchronous code and returns its result."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        coro.close()
+        raise RuntimeError(
+            'A coroutine can not be executed synchronously inside '
+            'a running event loop, use "await" instead.'
+        )
+    return _get_thread_loop().run_until_complete(coro)
+
+
+async def maybe_await(value):
+    if isawaitable(value):
+        return await value
+    return value
+
+
+@contextmanager
+def _translate_parameters_error(method_options):
+    try:
+        yield
+    except ParametersError as e:
+        error = create_multi_validation_error(
+            method_options.input_schema,
+            errors=e.errors,
+        )
+        error.headers = e.headers
+        raise error from e
+
+
+class AsyncResourceView(ResourceView):
+    async def as_dict(self) -> Json:
+        return {}
+
+    def __json__(self) -> Json:
+        return run_coroutine(self.request, self.async_json())
+
+    async def async_json(self) -> Json:
+        return self._filter_fields(await self.as_dict())
+
+    async def http_head(self):
+        if not self._is_fast_head():
+            return await self.http_get()
+        cached_response = self._get_cached_get_response()
+        if cached_response is not None:
+            return cached_response
+        self._process_result(result=self.resource, context=self.resource)
+        await self._async_add_head_headers()
+        return self._get_head_response()
+
+    async def _async_add_head_headers(self):
+        self._add_head_headers()
+
+    async def http_get(self):
+        self._process_result(result=self.resource, context=self.resource)
+        self.fields = self.get_requested_fields(self.request)
+        return await self.async_json()
+
+    async def http_post(self):
+        params = self._get_params()
+        with _translate_parameters_error(self.options_for_post):
+            result, created = await maybe_await(
+                self.resource.http_post(self.request, params)
+            )
+        self._on_resource_changed()
+        return self._process_result(result, created)
+
+    async def http_put(self):
+        params = self._get_params()
+        with _translate_parameters_error(self.options_for_put):
+            created = await maybe_await(self.resource.http_put(self.request, params))
+        self._on_resource_changed()
+        self._process_result(
+            result=self.resource, created=created, context=self.resource
+        )
+        return await self.async_json()
+
+    async def http_patch(self):
+        params = self._get_params()
+        with _translate_parameters_error(self.options_for_patch):
+            created = await maybe_await(self.resource.http_patch(self.request, params))
+        self._on_resource_changed()
+        self._process_result(
+            result=self.resource, created=created, context=self.resource
+        )
+        return await self.async_json()
+
+    async def http_delete(self):
+        params = self._get_params()
+        with _translate_parameters_error(self.options_for_delete):
+            result = await maybe_await(self.resource.http_delete(self.request, params))
+        self._on_resource_changed()
+        return self._process_result(result)
+
+
+class AsyncHalResourceView(AsyncResourceView, HalResourceView):
+    async def async_json(self) -> Json:
+        return self._add_links(self._filter_fields(await self.as_dict()))
+
+    def as_embedded(self) -> dict:
+        return run_coroutine(self.request, self.async_as_embedded())
+
+    async def async_as_embedded(self) -> dict:
+        return self._add_embedded_links(await self.as_dict())
+
+
+class AsyncHalResourceWithEmbeddedView(
+    AsyncHalResourceView, HalResourceWithEmbeddedView
+):
+    async def http_get(self):
+        params = self._get_params()
+        self.fields = fields = self.get_requested_fields(self.request)
+        result = await self.async_json()
+        if params.get('embedded', True) and (fields is None or '_embedded' in fields):
+            embedded_resources = await self.get_embedded(params)
+            if embedded_resources:
+                await render_embedded_resources(self.request, embedded_resources)
+                result['_embedded'] = embedded_resources
+                result['_links'].update(embedded_resources.paging_links)
+        result = self._process_result(result, context=self.resource)
+        if self.stream_embedded and isinstance(result, dict):
+            return JsonStream(result)
+        return result
+
+    async def get_embedded(self, params: dict) -> EmbeddedResources:
+        return EmbeddedResources(total_count=0, items=[])
+
+    async def _async_add_head_headers(self):
+        params = self._get_params()
+        if not params.get('total_count') or not params.get('embedded', True):
+            return
+        fields = self.get_requested_fields(self.request)
+        if fields is not None and '_embedded' not in fields:
+            return
+        embedded_resources = await self.get_embedded(dict(params, limit=0))
+        if embedded_resources:
+            embedded_resources.add_headers(self.request)
+
+
+async def render_embedded_resources(
+    request: PyramidRequest, embedded_resources: EmbeddedResources
+):
+    """Renders lists of embedded resources in place. Representations
+    of resources with async views are built concurrently.
+    """
+    embedded = embedded_resources.embedded
+    for key, resources in embedded.items():
+        if not isinstance(resources, (list, tuple)):
+            continue
+        rendered = list(resources)
+        coroutines = []
+        positions = []
+        for i, resource in enumerate(resources):
+            view = get_resource_view(resource, request)
+            # Resources with sync views are rendered later by the renderer
+            # outside the event loop.
+            if isinstance(view, AsyncHalResourceView):
+                # Coroutines are executed in separate tasks
+                coroutines.append(view.async_as_embedded())
+                positions.append(i)
+        for i, value in zip(positions, await asyncio.gather(*coroutines)):
+            rendered[i] = value
+        embedded[key] = rendered
@@ -4,7 +4,8 @@
 :Date: 30.03.2017
 """
 
-from typing import Union
+import threading
+from typing import Optional, Union
 
 from pyramid.authorization import (
     ACLAllowed,
@@ -19,7 +20,12 @@ from pyramid.util import is_nonstr_iter
 
 from restfw.interfaces import IResource
 from restfw.typing import PyramidRequest
-from restfw.views import get_resource_view
+from restfw.utils import get_acl_decisions, get_compiled_acls
+from restfw.views import (
+    get_method_table,
+    get_resource_view,
+    get_resource_view_class,
+)
 
 
 ALL_GET_REQUESTS = 'get'
@@ -37,9 +43,22 @@ class RestAclHelper:
     authorization information about a :term:`principal` or multiple principals.
     If the context is part of a :term:`lineage`, the context's parents are
     consulted for ACL information too.
+
+    Permissions of ACE are parsed once and cached. If a request is given,
+    static ACL (not returned by a callable ``__acl__``) are compiled into
+    an index of principals and decisions are memoized for the request
+    by a context, a permission and a set of principals. ACL are supposed
+    to be unchanged while the request, ``clear_acl_decisions(request)``
+    drops the caches after modification of resources.
     """
 
-    def permits(self, context, principals: Union[list, set], permission: str):
+    def permits(
+        self,
+        context,
+        principals: Union[list, set],
+        permission: str,
+        request: Optional[PyramidRequest] = None,
+    ):
         """Return an instance of :class:`pyramid.authorization.ACLAllowed` if
         the ACL allows access a user with the given principals, return an
         instance of :class:`pyramid.authorization.ACLDenied` if not.
@@ -64,6 +83,34 @@ class RestAclHelper:
         access, return an instance of
         :class:`pyramid.authorization.ACLDenied` (equals ``False``).
         """
+        principals_key = _get_principals_key(principals)
+        if request is None or principals_key is None:
+            return self._permits(context, principals, permission)
+        decisions = get_acl_decisions(request)
+        key = (id(context), permission, principals_key)
+        decision = decisions.get(key)
+        # The context is stored with the decision, so its id
+        # can't be reused by other object while the request.
+        if decision is not None and decision[0] is context:
+            return decision[1]
+        result = self._permits(
+            context,
+            principals,
+            permission,
+            principals_key,
+            get_compiled_acls(request),
+        )
+        decisions[key] = (context, result)
+        return result
+
+    def _permits(
+        self,
+        context,
+        principals: Union[list, set],
+        permission: str,
+        principals_key: Optional[frozenset] = None,
+        compiled_acls: Optional[dict] = None,
+    ):
         acl = '<No ACL found on any object in resource lineage>'
         base_permission, _, context_permission = permission.partition('.')
         # base_permission - permission based on HTTP-method used to call a resource
@@ -77,39 +124,209 @@ class RestAclHelper:
             except AttributeError:
                 continue
 
+            compiled_acl = None
             if acl and callable(acl):
                 acl = acl()
-
-            for ace in acl:
-                ace_action, ace_principal, ace_permissions = ace
-                if ace_principal in principals:
-                    if not is_nonstr_iter(ace_permissions):
-                        ace_permissions = [ace_permissions]
-                    if _match_permission(
-                        base_permission, context_permission, ace_permissions
-                    ):
-                        if ace_action == Allow:
-                            return ACLAllowed(
-                                ace,
-                                acl,
-                                permission,
-                                principals,
-                                location,
-                            )
-                        else:
-                            return ACLDenied(
-                                ace,
-                                acl,
-                                permission,
-                                principals,
-                                location,
-                            )
+            elif compiled_acls is not None:
+                compiled_acl = _get_compiled_acl(compiled_acls, acl)
+
+            if compiled_acl is None:
+                ace = _find_ace(acl, principals, base_permission, context_permission)
+            else:
+                position = compiled_acl.decisions.get((principals_key, permission))
+                if position is None:
+                    position = compiled_acl.add_decision(
+                        principals_key,
+                        permission,
+                        base_permission,
+                        context_permission,
+                    )
+                ace = None if position < 0 else compiled_acl.aces[position]
+            if ace is not None:
+                if ace[0] == Allow:
+                    return ACLAllowed(ace, acl, permission, principals, location)
+                else:
+                    return ACLDenied(ace, acl, permission, principals, location)
 
         # Deny by default (if no ACL in lineage at all, or if none of the
         # principals were mentioned in any ACE we found)
         return ACLDenied('<default deny>', acl, permission, principals, context)
 
 
+def _find_ace(acl, principals, base_permission: str, context_permission: str):
+    """Returns the first ACE of ACL that matches one of principals
+    and the permission."""
+    for ace in acl:
+        ace_action, ace_principal, ace_permissions = ace
+        if ace_principal in principals:
+            if not is_nonstr_iter(ace_permissions):
+                ace_permissions = [ace_permissions]
+            matcher = get_permission_matcher(ace_permissions)
+            if matcher is not None:
+                is_match = matcher.match(base_permission, context_permission)
+            else:
+                is_match = _match_permission(
+                    base_permission, context_permission, ace_permissions
+                )
+            if is_match:
+                return ace
+    return None
+
+
+def _get_principals_key(principals) -> Optional[frozenset]:
+    try:
+        return frozenset(principals)
+    except TypeError:
+        # Some of principals is not hashable
+        return None
+
+
+class PermissionMatcher:
+    """Permissions of ACE parsed for matching with required permissions."""
+
+    __slots__ = ('all_permissions', 'entries')
+
+    def __init__(self, ace_permissions):
+        self.all_permissions = ace_permissions is ALL_PERMISSIONS
+        entries = []
+        if not self.all_permissions:
+            for ace_permission in ace_permissions:
+                ace_base_permission, _, ace_context_permission = (
+                    ace_permission.partition('.')
+                )
+                if not ace_base_permission and not ace_context_permission:
+                    continue
+                if ace_base_permission and ace_base_permission not in _BASE_PERMISSIONS:
+                    ace_context_permission = ace_permission
+                    ace_base_permission = ''
+                entries.append((ace_base_permission, ace_context_permission))
+        self.entries = tuple(entries)
+
+    def match(self, base_permission: str, context_permission: str) -> bool:
+        """The same as ``_match_permission()`` for parsed permissions of ACE."""
+        if self.all_permissions:
+            return True
+        if not base_permission and not context_permission:
+            return False
+        for ace_base_permission, ace_context_permission in self.entries:
+            if ace_base_permission and base_permission != ace_base_permission:
+                continue
+            if _match_context_permission(context_permission, ace_context_permission):
+                return True
+        return False
+
+
+_MAX_CACHE_SIZE = 1000
+# Tuple of permission strings -> PermissionMatcher
+_matchers = {}
+_matchers_lock = threading.Lock()
+# ALL_PERMISSIONS is not hashable
+_ALL_PERMISSIONS_KEY = object()
+
+
+def get_permission_matcher(ace_permissions) -> Optional[PermissionMatcher]:
+    """Returns cached matcher of permissions of ACE or None if permissions
+    can't be parsed in advance."""
+    if ace_permissions is ALL_PERMISSIONS:
+        key = _ALL_PERMISSIONS_KEY
+    elif isinstance(ace_permissions, (list, tuple, set, frozenset)):
+        # Permissions of ACE may be changed in place, so the current
+        # permissions are used as a key.
+        try:
+            key = tuple(ace_permissions)
+            return _matchers[key]
+        except KeyError:
+            pass
+        except TypeError:
+            return None
+    else:
+        return None
+    matcher = _matchers.get(key)
+    if matcher is None:
+        try:
+            matcher = PermissionMatcher(ace_permissions)
+        except Exception:
+            # Errors are raised by the usual matching
+            return None
+        with _matchers_lock:
+            if len(_matchers) >= _MAX_CACHE_SIZE:
+                _matchers.clear()
+            _matchers[key] = matcher
+    return matcher
+
+
+class CompiledAcl:
+    """ACL compiled into an index of principals. Every principal
+    is mapped to a list of positions of its ACE and matchers of ACE
+    permissions."""
+
+    __slots__ = ('aces', 'index', 'decisions')
+
+    def __init__(self, acl):
+        self.aces = tuple(acl)
+        index = {}
+        for i, ace in enumerate(self.aces):
+            _, ace_principal, ace_permissions = ace
+            if not is_nonstr_iter(ace_permissions):
+                ace_permissions = [ace_permissions]
+            matcher = get_permission_matcher(ace_permissions)
+            if matcher is None:
+                raise ValueError('Permissions of ACE can not be compiled')
+            index.setdefault(ace_principal, []).append((i, matcher))
+        self.index = index
+        # (principals, permission) -> position of ACE or -1
+        self.decisions = {}
+
+    def add_decision(
+        self,
+        principals: frozenset,
+        permission: str,
+        base_permission: str,
+        context_permission: str,
+    ) -> int:
+        """Finds a position of ACE for the set of principals and
+        the permission and caches it in ``decisions``."""
+        position = self.find_position(principals, base_permission, context_permission)
+        self.decisions[(principals, permission)] = position
+        return position
+
+    def find_position(
+        self, principals: frozenset, base_permission: str, context_permission: str
+    ) -> int:
+        """Returns a position of the first ACE that matches one of principals
+        and the permission or -1."""
+        index = self.index
+        best = -1
+        for principal in principals:
+            entries = index.get(principal)
+            if not entries:
+                continue
+            for i, matcher in entries:
+                if best >= 0 and i >= best:
+                    break
+                if matcher.match(base_permission, context_permission):
+                    best = i
+                    break
+        return best
+
+
+def _get_compiled_acl(compiled_acls: dict, acl) -> Optional[CompiledAcl]:
+    """Returns compiled version of the ACL from the cache of a request.
+    The ACL is stored with compiled version, so its id can't be reused
+    by other object while the request."""
+    entry = compiled_acls.get(id(acl))
+    if entry is None:
+        compiled_acl = None
+        if isinstance(acl, (list, tuple)):
+            try:
+                compiled_acl = CompiledAcl(acl)
+            except Exception:
+                # Errors are raised by the usual evaluation of ACL
+                pass
+        entry = compiled_acls[id(acl)] = (acl, compiled_acl)
+    return entry[1]
+
+
 def principals_allowed_by_permission(context, permission: str) -> set:
     """Return the set of principals explicitly granted the
     permission named ``permission`` according to the ACL directly
@@ -137,9 +354,13 @@ def principals_allowed_by_permission(context, permission: str) -> set:
         for ace_action, ace_principal, ace_permissions in acl:
             if not is_nonstr_iter(ace_permissions):
                 ace_permissions = [ace_permissions]
-            is_match = _match_permission(
-                base_permission, context_permission, ace_permissions
-            )
+            matcher = get_permission_matcher(ace_permissions)
+            if matcher is not None:
+                is_match = matcher.match(base_permission, context_permission)
+            else:
+                is_match = _match_permission(
+                    base_permission, context_permission, ace_permissions
+                )
             if (ace_action == Allow) and is_match:
                 if ace_principal not in denied_here:
                     allowed_here.add(ace_principal)
@@ -224,10 +445,15 @@ def has_view_access(
     context,
     http_method: str,
 ) -> bool:
-    if view := get_resource_view(context, request):
-        options_name = f'options_for_{http_method}'
-        if options := getattr(view, options_name, None):
-            if permission := options.permission:
-                permission = f'{http_method}.{permission}'
+    if view_class := get_resource_view_class(context, request):
+        table = get_method_table(view_class)
+        if table.has_custom_allowed_methods:
+            # Allowed methods may depend on an instance of the view
+            view = get_resource_view(context, request)
+            if view is None or http_method.upper() not in view.get_allowed_methods():
+                return False
+        if options := table.options.get(http_method):
+            if options.permission:
+                permission = table.permissions[http_method]
                 return request.has_permission(permission, context=context)
     return False
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+
+Optional resource ``_batch`` that executes many sub-requests
+in one HTTP request. Use ``config.include('restfw.batch')`` to enable it.
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from urllib.parse import urlencode, urlsplit
+
+import colander
+from pyramid.authorization import Allow, Everyone
+from pyramid.config import PHASE3_CONFIG, Configurator
+from pyramid.interfaces import IRequestFactory, IRootFactory, ISecurityPolicy
+from pyramid.registry import Registry
+from pyramid.request import Request
+from pyramid.response import Response
+from zope.interface import implementer
+
+from . import interfaces, schemas
+from .authorization import ALL_POST_REQUESTS
+from .renderers import decompress_body
+from .resources import Resource
+from .typing import PyramidRequest
+from .views import ResourceView
+
+
+BATCH_NAME = '_batch'
+READ_METHODS = ('GET', 'HEAD')
+
+# Items of environment of a batch request that are shared with sub-requests.
+# Identity and root of a batch request are resolved once and are shared
+# through ``BatchContext``, but authorization and cookies are copied too,
+# because views may use them directly (e.g. sessions).
+_SHARED_ENVIRON_KEYS = (
+    'wsgi.url_scheme',
+    'SCRIPT_NAME',
+    'SERVER_NAME',
+    'SERVER_PORT',
+    'SERVER_PROTOCOL',
+    'REMOTE_ADDR',
+    'HTTP_HOST',
+    'HTTP_AUTHORIZATION',
+    'HTTP_COOKIE',
+    'HTTP_ACCEPT_LANGUAGE',
+)
+
+# Headers of sub-requests that are ignored. Responses of sub-requests are
+# embedded into the body of a batch response, so they are not compressed.
+_IGNORED_HEADERS = frozenset(['accept-encoding'])
+
+
+def validate_path(node, value):
+    path = urlsplit(value).path if '://' in value else value
+    if BATCH_NAME in path.strip('/').split('/'):
+        raise colander.Invalid(node, 'Nested batch requests are not allowed')
+
+
+class BatchItemSchema(schemas.MappingNode):
+    method = schemas.StringNode(
+        title='HTTP method',
+        missing='GET',
+        validator=colander.OneOf(['GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE']),
+    )
+    path = schemas.StringNode(title='Path to a resource', validator=validate_path)
+    params = schemas.PreserveMappingSchema(
+        title='Query parameters',
+        missing=colander.drop,
+    )
+    body = schemas.PreserveMappingSchema(
+        title='JSON body of request',
+        missing=colander.drop,
+    )
+    headers = schemas.PreserveMappingSchema(
+        title='Additional headers of request',
+        missing=colander.drop,
+    )
+
+
+def validate_batch_size(node, value):
+    request = node.bindings.get('request') if node.bindings else None
+    if request is None:
+        return
+    max_requests = get_batch_settings(request.registry)['max_requests']
+    if len(value) > max_requests:
+        raise colander.Invalid(
+            node, f'Batch can contain no more than {max_requests} requests'
+        )
+
+
+class BatchSchema(schemas.MappingNode):
+    requests = schemas.SequenceNode(
+        BatchItemSchema(),
+        title='List of sub-requests',
+        validator=colander.All(colander.Length(min=1), validate_batch_size),
+    )
+    concurrent = schemas.BooleanNode(
+        title='Execute independent GET and HEAD requests concurrently',
+        missing=False,
+    )
+
+
+BATCH_CONTEXT_KEY = 'restfw.batch.context'
+
+
+class BatchContext:
+    """Identity and root of a batch request resolved once
+    and shared with all its sub-requests."""
+
+    __slots__ = ('root', 'identity', 'authenticated_userid')
+
+    def __init__(self, request: PyramidRequest):
+        self.root = request.root
+        self.identity = request.identity
+        self.authenticated_userid = request.authenticated_userid
+
+
+@implementer(ISecurityPolicy)
+class BatchSecurityPolicy:
+    """Security policy that returns identity of a batch request
+    for its sub-requests and delegates all other calls to the wrapped policy.
+    """
+
+    def __init__(self, policy):
+        self.policy = policy
+
+    def identity(self, request: PyramidRequest):
+        context: Optional[BatchContext] = request.environ.get(BATCH_CONTEXT_KEY)
+        if context is None:
+            return self.policy.identity(request)
+        return context.identity
+
+    def authenticated_userid(self, request: PyramidRequest):
+        context: Optional[BatchContext] = request.environ.get(BATCH_CONTEXT_KEY)
+        if context is None:
+            return self.policy.authenticated_userid(request)
+        return context.authenticated_userid
+
+    def permits(self, request: PyramidRequest, context, permission):
+        return self.policy.permits(request, context, permission)
+
+    def remember(self, request: PyramidRequest, userid, **kw):
+        return self.policy.remember(request, userid, **kw)
+
+    def forget(self, request: PyramidRequest, **kw):
+        return self.policy.forget(request, **kw)
+
+
+def batch_root_factory(root_factory):
+    """Returns root factory that returns root of a batch request
+    for its sub-requests."""
+
+    def factory(request: PyramidRequest):
+        context: Optional[BatchContext] = request.environ.get(BATCH_CONTEXT_KEY)
+        if context is None:
+            return root_factory(request)
+        return context.root
+
+    return factory
+
+
+class Batch(Resource):
+    __acl__ = [(Allow, Everyone, ALL_POST_REQUESTS)]
+
+    def __init__(self, parent):
+        self.__parent__ = parent
+
+
+class BatchView(ResourceView):
+    resource: Batch
+    options_for_post = interfaces.MethodOptions(BatchSchema, None)
+
+    def http_post(self):
+        params = self._get_params()
+        request = self.request
+        batch_context = BatchContext(request)
+        items = params['requests']
+        responses: list[Optional[dict]] = [None] * len(items)
+        executor = (
+            get_batch_executor(request.registry) if params['concurrent'] else None
+        )
+        pending = []
+        for i, item in enumerate(items):
+            if executor is not None and item['method'] in READ_METHODS:
+                pending.append(
+                    (i, executor.submit(run_sub_request, request, item, batch_context))
+                )
+                continue
+            # Other requests may modify resources, so they wait for
+            # completion of all previous requests.
+            self._wait(pending, responses)
+            responses[i] = run_sub_request(request, item, batch_context)
+        self._wait(pending, responses)
+        return {'responses': responses}
+
+    @staticmethod
+    def _wait(pending: list, responses: list):
+        for i, future in pending:
+            responses[i] = future.result()
+        pending.clear()
+
+
+def get_batch_settings(registry: Registry) -> dict:
+    settings = registry.settings or {}
+    return {
+        'max_requests': int(settings.get('restfw.batch.max_requests', 50)),
+        'max_workers': int(settings.get('restfw.batch.max_workers', 4)),
+    }
+
+
+_executor_lock = threading.Lock()
+
+
+def get_batch_executor(registry: Registry) -> ThreadPoolExecutor:
+    executor = getattr(registry, '_restfw_batch_executor', None)
+    if executor is None:
+        with _executor_lock:
+            executor = getattr(registry, '_restfw_batch_executor', None)
+            if executor is None:
+                max_workers = get_batch_settings(registry)['max_workers']
+                executor = ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix='restfw-batch'
+                )
+                registry._restfw_batch_executor = executor
+    return executor
+
+
+def make_sub_request(
+    request: PyramidRequest,
+    item: dict,
+    batch_context: Optional[BatchContext] = None,
+) -> PyramidRequest:
+    """Creates a sub-request described by an item of a batch.
+    Identity and root of the sub-request are taken from ``batch_context``
+    if it is specified.
+    """
+    path = item['path']
+    if '://' in path:
+        path = urlsplit(path).path
+    script_name = request.script_name
+    if script_name and path.startswith(script_name + '/'):
+        path = path[len(script_name) :]
+    if not path.startswith('/'):
+        path = '/' + path
+    if params := item.get('params'):
+        path = f'{path}?{urlencode(params, doseq=True)}'
+
+    environ = {
+        key: request.environ[key]
+        for key in _SHARED_ENVIRON_KEYS
+        if key in request.environ
+    }
+    if batch_context is not None:
+        environ[BATCH_CONTEXT_KEY] = batch_context
+    headers = {
+        name: value
+        for name, value in (item.get('headers') or {}).items()
+        if name.lower() not in _IGNORED_HEADERS
+    }
+    kwargs = {}
+    if 'body' in item:
+        kwargs['body'] = json.dumps(item['body']).encode('utf-8')
+        kwargs['content_type'] = 'application/json'
+    request_factory = request.registry.queryUtility(IRequestFactory, default=Request)
+    sub_request = request_factory.blank(
+        path,
+        environ=environ,
+        headers=headers,
+        method=item['method'],
+        **kwargs,
+    )
+    sub_request.registry = request.registry
+    return sub_request
+
+
+def run_sub_request(
+    request: PyramidRequest,
+    item: dict,
+    batch_context: Optional[BatchContext] = None,
+) -> dict:
+    """Executes an item of a batch and returns its status, headers and body."""
+    sub_request = make_sub_request(request, item, batch_context)
+    response = request.invoke_subrequest(sub_request, use_tweens=True)
+    return _response_to_dict(response, with_body=item['method'] != 'HEAD')
+
+
+def _response_to_dict(response: Response, with_body=True) -> dict:
+    body = None
+    if with_body and response.body:
+        # Sub-requests may have Accept-Encoding header only if it is added
+        # by a tween, so bodies are decompressed just in case.
+        data = decompress_body(response.body, response.content_encoding)
+        if response.content_type == 'application/json':
+            body = json.loads(data)
+        else:
+            body = data.decode(response.charset or 'utf-8')
+    headers = {
+        name: value
+        for name, value in response.headerlist
+        if name not in ('Content-Length', 'Content-Type', 'Content-Encoding')
+    }
+    return {'status': response.status_code, 'headers': headers, 'body': body}
+
+
+def _share_batch_context(registry: Registry):
+    policy = registry.queryUtility(ISecurityPolicy)
+    if policy is not None and not isinstance(policy, BatchSecurityPolicy):
+        registry.registerUtility(BatchSecurityPolicy(policy), ISecurityPolicy)
+    root_factory = registry.queryUtility(IRootFactory)
+    if root_factory is not None:
+        registry.registerUtility(batch_root_factory(root_factory), IRootFactory)
+
+
+def includeme(config: Configurator):
+    config.add_sub_resource_fabric(Batch, BATCH_NAME, interfaces.IRoot)
+    config.add_resource_view(BatchView, Batch)
+    # Security policy and root factory are wrapped after their registration.
+    config.action(
+        'restfw.batch.context',
+        _share_batch_context,
+        args=(config.registry,),
+        order=PHASE3_CONFIG + 1,
+    )
@@ -7,8 +7,28 @@ from functools import update_wrapper
 
 
 def derive_fabric(fabric, predicates):
-    def fabric_wrapper(resource):
-        if all((predicate(resource) for predicate in predicates)):
+    """Returns a wrapper of the fabric which calls it only if all
+    predicates are true. The chain of predicates is bound
+    at registration time."""
+    predicates = tuple(predicates)
+    if not predicates:
+
+        def fabric_wrapper(resource):
+            return fabric(resource)
+
+    elif len(predicates) == 1:
+        predicate = predicates[0]
+
+        def fabric_wrapper(resource):
+            if predicate(resource):
+                return fabric(resource)
+
+    else:
+
+        def fabric_wrapper(resource):
+            for predicate in predicates:
+                if not predicate(resource):
+                    return None
             return fabric(resource)
 
     if hasattr(fabric, '__name__'):
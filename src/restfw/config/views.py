@@ -16,9 +16,9 @@ from zope.interface.interfaces import IInterface
 from zope.interface.verify import verifyClass, verifyObject
 
 from .. import interfaces
-from ..authorization import get_view_permission
 from ..interfaces import IResource, IResourceView
 from ..typing import PyramidRequest
+from ..views import HTTP_METHODS, get_method_table
 
 
 def _method_not_allowed_view(request: PyramidRequest):
@@ -34,25 +34,17 @@ def add_resource_view(config: Configurator, view_class, resource_class, **predic
     verifyClass(interfaces.IResourceView, view_class, tentative=True)
     verifyObject(interfaces.IResourceViewClass, view_class, tentative=True)
 
+    table = get_method_table(view_class)
     not_allowed_methods = []
-    for http_method in ('get', 'post', 'put', 'patch', 'delete'):
-        method_options: Optional[interfaces.MethodOptions] = getattr(
-            view_class, f'options_for_{http_method}', None
-        )
-        if method_options is None:
+    for http_method in HTTP_METHODS:
+        if http_method not in table.options:
             not_allowed_methods.append(http_method.upper())
             continue
 
-        if (
-            http_method in ('get', 'post')
-            and getattr(method_options, 'output_schema', None) is False
-        ):
-            raise RuntimeError(
-                f'Output schema specified for {http_method.upper()} method in'
-                f' {view_class.__name__} view class can not be False.'
-            )
+        if error := table.output_errors.get(http_method):
+            raise RuntimeError(error)
 
-        permission = get_view_permission(http_method, method_options.permission)
+        permission = table.permissions[http_method]
         methods = ['head', 'get'] if http_method == 'get' else [http_method]
         for request_method in methods:
             method = request_method.upper()
@@ -112,6 +104,14 @@ def _register_resource_view(
                 'request_type must be an interface, not %s' % request_type
             )
 
+    if getattr(view_class, 'cursor_paging', False):
+        settings = config.get_settings() or {}
+        if not settings.get('restfw.cursor_secret'):
+            raise ConfigurationError(
+                '%s uses cursor paging, so setting "restfw.cursor_secret" '
+                'is required' % config.object_description(view_class)
+            )
+
     introspectables = []
     ovals = view_options.copy()
     ovals.update(
@@ -6,7 +6,7 @@
 
 from zope.interface import implementer
 
-from .interfaces import IEvent, IRoot, IRootCreated
+from .interfaces import IEvent, IResourceChanged, IRoot, IRootCreated
 from .typing import PyramidRequest
 
 
@@ -22,3 +22,13 @@ class RootCreated(Event):
     def __init__(self, root: IRoot):
         super().__init__()
         self.root = root
+
+
+@implementer(IResourceChanged)
+class ResourceChanged(Event):
+    """An instance of this class is emitted after a resource was successfully
+    modified by POST, PUT, PATCH or DELETE request."""
+
+    def __init__(self, resource):
+        super().__init__()
+        self.resource = resource
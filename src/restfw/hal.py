@@ -30,6 +30,8 @@ class SimpleContainer(HalResource):
         if ILocation.providedBy(value):
             value.__name__ = key
             value.__parent__ = self
+            if isinstance(value, Resource):
+                value.__registry__ = self.__registry__
         return self._data.__setitem__(key, value)
 
     def __delitem__(self, key):
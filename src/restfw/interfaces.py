@@ -13,15 +13,21 @@ from .typing import PyramidRequest
 
 
 class MethodOptions:
-    __slots__ = ('input_schema', 'output_schema', 'permission')
+    __slots__ = ('input_schema', 'output_schema', 'permission', 'cacheable')
 
-    def __init__(self, input_schema, output_schema=False, *, permission=None):
+    def __init__(
+        self, input_schema, output_schema=False, *, permission=None, cacheable=False
+    ):
         """If output_schema is False for the PUT and PATCH methods,
         the output_schema value for the GET method will be used instead.
+
+        If cacheable is True for the GET method, rendered responses are
+        stored in the response cache (see ``restfw.response_cache``).
         """
         self.input_schema = input_schema
         self.output_schema = output_schema
         self.permission = permission
+        self.cacheable = cacheable
 
     def replace(self, **kwargs) -> 'MethodOptions':
         """Create copy of current instance and replace some fields in it."""
@@ -56,6 +62,11 @@ class IResource(ILocation):
         :rtype: restfw.utils.ETag or None
         """
 
+    def get_last_modified():
+        """Returns time of last modification of the resource or None.
+        :rtype: datetime.datetime or None
+        """
+
     def http_post(request: PyramidRequest, params: dict) -> Tuple['IResource', bool]:
         """Returns a new or modified resource and a flag indicating that the
         resource was created or not.
@@ -184,6 +195,19 @@ class IHalResourceLinks(Interface):
         """
 
 
+class ITotalCountProvider(Interface):
+    """Interface of adapter that returns total count of items in a collection
+    resource. The adapter is registered for class of collection resource with
+    name of embedded resources."""
+
+    def get_total_count(request):
+        """Returns total count of items in the collection
+        or None if the count is unknown.
+        :type request: pyramid.request.Request
+        :rtype: int or restfw.total_count.TotalCount or None
+        """
+
+
 class IExternalLinkAdapter(Interface):
     title = Attribute('Title for schema node')
     description = Attribute('Description for schema node')
@@ -217,3 +241,34 @@ class IRootCreated(IEvent):
     """An event type that is emitted after root object was created."""
 
     root = Attribute('The root object')
+
+
+class IResourceChanged(IEvent):
+    """An event type that is emitted after a resource was successfully
+    modified by POST, PUT, PATCH or DELETE request."""
+
+    resource = Attribute('The modified resource')
+
+
+class IResponseCacheBackend(Interface):
+    """Storage of rendered responses of GET requests."""
+
+    def get(key):
+        """Returns a cached response or None.
+        :rtype: restfw.response_cache.CachedResponse or None
+        """
+
+    def set(key, path, response):
+        """Stores a response for a resource with the given path.
+        :type key: tuple
+        :type path: str
+        :type response: restfw.response_cache.CachedResponse
+        """
+
+    def invalidate(path, descendants=False):
+        """Removes all responses stored for a resource with the given path
+        and, optionally, for all its descendants.
+        """
+
+    def clear():
+        """Removes all stored responses."""
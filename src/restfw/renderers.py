@@ -5,13 +5,22 @@
 """
 
 import datetime
+import json
+import zlib
 from decimal import Decimal
+from enum import Enum
+from typing import Callable, Iterator, Optional
+from uuid import UUID
 
-from pyramid.renderers import JSON
+from pyramid import renderers
+from pyramid.interfaces import IJSONAdapter, IRendererFactory
+from pyramid.settings import aslist
+from webob import Response
+from zope.interface import implementedBy, providedBy
 
 from .interfaces import IResource
-from .typing import PyramidRequest
-from .views import get_resource_view
+from .typing import Json, PyramidRequest
+from .views import EmbeddedResources, JsonStream, get_resource_view
 
 
 def resource_adapter(obj: IResource, request: PyramidRequest):
@@ -46,20 +55,490 @@ def enum_adapter(obj, request):
     return obj.name
 
 
-def build_json_renderer(**kwargs):
+ORJSON_OPTIONS = {
+    'ensure_ascii': (False,),
+    'indent': (None, 2),
+    'sort_keys': (False, True),
+    'separators': (None, (',', ':')),
+}
+
+
+def orjson_serializer_factory(**kw) -> Optional[Callable[..., str]]:
+    """Returns serializer based on ``orjson`` package or None if this package
+    is not installed.
+
+    Output of this serializer is compact (without spaces after separators,
+    except key separators of indented output) and is not escaped into ASCII, so ``ensure_ascii=False`` is required.
+    Only options from ``ORJSON_OPTIONS`` are supported, other options
+    raise ``ValueError``.
+
+    Types from ``native_types`` attribute of the serializer are serialized
+    by ``orjson`` itself, so adapters registered for them are never called.
+    """
+    if kw.get('ensure_ascii', True):
+        raise ValueError('orjson backend requires "ensure_ascii=False"')
+    for name, value in kw.items():
+        if value not in ORJSON_OPTIONS.get(name, ()):
+            raise ValueError(f'orjson backend does not support "{name}={value!r}"')
+    try:
+        import orjson
+    except ImportError:
+        return None
+
+    option = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+    if kw.get('sort_keys'):
+        option |= orjson.OPT_SORT_KEYS
+    if kw.get('indent'):
+        option |= orjson.OPT_INDENT_2
+
+    def serializer(value, default=None, **kwargs):
+        # kwargs are the same options of renderer that were checked above
+        return orjson.dumps(value, default=default, option=option).decode('utf-8')
+
+    serializer.separators = (',', ': ') if kw.get('indent') else (',', ':')
+    serializer.native_types = (Enum, UUID)
+    return serializer
+
+
+JSON_BACKENDS = {
+    'stdlib': lambda **kw: json.dumps,
+    'orjson': orjson_serializer_factory,
+}
+
+
+class _ZlibCompressor:
+    __slots__ = ('_obj',)
+
+    def __init__(self, level: int, wbits: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, wbits)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush_block(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _ZstdCompressor:
+    __slots__ = ('_obj',)
+
+    def __init__(self, level: int):
+        import zstandard
+
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush_block(self) -> bytes:
+        import zstandard
+
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+def _zstd_factory() -> Optional[Callable]:
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return None
+    return _ZstdCompressor
+
+
+# Factories of compressors (callables that take a compression level)
+# by names of content-codings.
+COMPRESSORS = {
+    'gzip': lambda level: _ZlibCompressor(level, 16 + zlib.MAX_WBITS),
+    'deflate': lambda level: _ZlibCompressor(level, zlib.MAX_WBITS),
+}
+_zstd = _zstd_factory()
+if _zstd is not None:
+    COMPRESSORS['zstd'] = _zstd
+
+
+def strip_etag_encoding(value: str) -> str:
+    """Returns value of strong ETag without a suffix of content-coding
+    that is added to ETag of a compressed response."""
+    base, separator, encoding = value.rpartition('-')
+    if separator and encoding in ('gzip', 'deflate', 'zstd'):
+        return base
+    return value
+
+
+def decompress_body(body: bytes, encoding: Optional[str]) -> bytes:
+    """Returns decoded body of a response with given Content-Encoding."""
+    if not encoding or encoding == 'identity':
+        return body
+    if encoding == 'gzip':
+        return zlib.decompress(body, 16 + zlib.MAX_WBITS)
+    if encoding == 'deflate':
+        return zlib.decompress(body)
+    if encoding == 'zstd':
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    raise ValueError(f'Unsupported content-coding: {encoding}')
+
+
+class Compression:
+    """Options of compression of rendered bodies.
+
+    :param encodings: names of content-codings from ``COMPRESSORS``
+                      in order of server preference. Unavailable codings
+                      are ignored.
+    :param min_size: bodies smaller than this size (in bytes) are not
+                     compressed. Streamed bodies are always compressed.
+    :param level: level of compression.
+    """
+
+    def __init__(self, encodings=(), min_size=1024, level=6):
+        self.encodings = tuple(e for e in encodings if e in COMPRESSORS)
+        self.min_size = min_size
+        self.level = level
+
+    def __bool__(self):
+        return bool(self.encodings)
+
+    @classmethod
+    def from_settings(cls, settings: dict, default: 'Compression') -> 'Compression':
+        """Returns options overridden by ``restfw.compression.*`` settings."""
+        encodings = settings.get('restfw.compression.encodings')
+        return cls(
+            encodings=(default.encodings if encodings is None else aslist(encodings)),
+            min_size=int(settings.get('restfw.compression.min_size', default.min_size)),
+            level=int(settings.get('restfw.compression.level', default.level)),
+        )
+
+    def negotiate(self, request: PyramidRequest) -> Optional[str]:
+        """Returns the best content-coding acceptable by client or None."""
+        if 'Accept-Encoding' not in request.headers:
+            return None
+        offers = request.accept_encoding.acceptable_offers(self.encodings)
+        return offers[0][0] if offers else None
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        compressor = COMPRESSORS[encoding](self.level)
+        return compressor.compress(body) + compressor.finish()
+
+    def iter_compressed(self, chunks: Iterator[bytes], encoding: str):
+        """Compresses chunks of a streamed body. Every compressed chunk
+        is flushed, so client can decode it without waiting for the end
+        of the stream."""
+        compressor = COMPRESSORS[encoding](self.level)
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush_block()
+            if data:
+                yield data
+        yield compressor.finish()
+
+    @staticmethod
+    def prepare_response(response: Response, encoding: Optional[str]):
+        """Adds headers of a variant of a response for the negotiated
+        content-coding. Headers don't depend on size of a body, so responses
+        of HEAD requests get the same headers as responses of GET requests.
+        :param encoding: a negotiated content-coding or None.
+        """
+        vary = response.vary or ()
+        if 'Accept-Encoding' not in vary:
+            response.vary = tuple(vary) + ('Accept-Encoding',)
+        if encoding is None:
+            return
+        etag = response.headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            # Representations with different content-codings are not
+            # byte-for-byte identical, so they must have different strong
+            # ETags. The suffix is ignored by handling of conditional requests.
+            # https://tools.ietf.org/html/rfc7232#section-2.1
+            response.headers['ETag'] = f'{etag[:-1]}-{encoding}"'
+
+
+def get_compression(registry) -> Compression:
+    """Returns options of compression of the default renderer
+    of the application."""
+    compression = getattr(registry, '_restfw_compression', None)
+    if compression is None:
+        renderer = registry.queryUtility(IRendererFactory, name='')
+        compression = getattr(renderer, 'compression', None) or Compression()
+        compression = Compression.from_settings(registry.settings or {}, compression)
+        registry._restfw_compression = compression
+    return compression
+
+
+_marker = object()
+
+
+class JSON(renderers.JSON):
+    """JSON renderer with pluggable encoder backend that supports
+    streaming of embedded resources.
+
+    ``backend`` is a name of encoder backend from ``JSON_BACKENDS``.
+    If required backend is not available, the standard ``json`` module is used.
+    The standard module is used also if an adapter is registered for
+    a type that is serialized by the backend natively (see
+    ``native_types`` attribute of serializer), because such backend
+    would give other output than the adapter.
+
+    Adapters of non-JSON types are resolved by exact type of an object.
+    Results of resolving are cached, so adapters lookup through MRO of
+    a type is made only once.
+
+    If a view returns an instance of :class:`restfw.views.JsonStream`,
+    the renderer returns an iterator of body chunks instead of a string.
+    Every embedded resource is rendered and encoded just before
+    the corresponding chunk will be sent to client.
+
+    ``compression`` is an instance of :class:`Compression`. If it is
+    specified, rendered bodies are compressed according
+    to Accept-Encoding header of a request. The options may be overridden
+    by ``restfw.compression.encodings``, ``restfw.compression.min_size``
+    and ``restfw.compression.level`` settings.
+    """
+
+    chunk_size = 16 * 1024
+
+    def __init__(
+        self,
+        serializer=None,
+        adapters=(),
+        backend='stdlib',
+        compression: Optional[Compression] = None,
+        **kw,
+    ):
+        self._adapters_cache = {}
+        self.compression = compression or Compression()
+        if serializer is None:
+            backend_factory = JSON_BACKENDS.get(backend)
+            serializer = backend_factory(**kw) if backend_factory else None
+            if serializer is None:
+                backend = 'stdlib'
+                serializer = json.dumps
+        self.backend = backend
+        super().__init__(serializer=serializer, adapters=adapters, **kw)
+
+    @property
+    def separators(self):
+        return getattr(self.serializer, 'separators', None) or (
+            self.kw.get('separators') or (', ', ': ')
+        )
+
+    def add_adapter(self, type_or_iface, adapter):
+        super().add_adapter(type_or_iface, adapter)
+        self._adapters_cache.clear()
+        native_types = getattr(self.serializer, 'native_types', ())
+        if isinstance(type_or_iface, type) and issubclass(type_or_iface, native_types):
+            self.backend = 'stdlib'
+            self.serializer = json.dumps
+
+    def get_adapter(self, obj) -> Optional[Callable]:
+        """Returns adapter registered for type of given object or None."""
+        cls = type(obj)
+        adapter = self._adapters_cache.get(cls, _marker)
+        if adapter is _marker:
+            obj_iface = providedBy(obj)
+            adapter = self.components.adapters.lookup((obj_iface,), IJSONAdapter)
+            if obj_iface is implementedBy(cls):
+                # Object doesn't provide interfaces directly,
+                # so an adapter depends on its type only.
+                self._adapters_cache[cls] = adapter
+        return adapter
+
+    def _make_default(self, request):
+        get_adapter = self.get_adapter
+
+        def default(obj):
+            if hasattr(obj, '__json__'):
+                return obj.__json__(request)
+            adapter = get_adapter(obj)
+            if adapter is None:
+                raise TypeError(f'{obj!r} is not JSON serializable')
+            return adapter(obj, request)
+
+        return default
+
+    def to_json_data(self, value, request: PyramidRequest) -> Json:
+        """Returns the value converted by adapters of the renderer into
+        JSON data (dicts, lists, strings, numbers, booleans and None)
+        without encoding. Rendering of the returned data gives the same
+        body as rendering of the value.
+        """
+        default = self._make_default(request)
+
+        def convert(obj):
+            if obj is None or isinstance(obj, (str, int, float)):
+                return obj
+            if isinstance(obj, dict):
+                return {_to_json_key(k): convert(v) for k, v in obj.items()}
+            if isinstance(obj, (list, tuple)):
+                return [convert(item) for item in obj]
+            return convert(default(obj))
+
+        return convert(value)
+
+    def __call__(self, info):
+        render = super().__call__(info)
+        compression = self.compression
+        settings = getattr(info, 'settings', None)
+        if settings:
+            compression = Compression.from_settings(settings, compression)
+        if compression:
+            render = self._compressed(render, compression)
+
+        def _render(value, system):
+            if isinstance(value, JsonStream):
+                request = system.get('request')
+                value = value.value
+                if request is None or not self._can_stream(request, value):
+                    return render(value, system)
+                response = request.response
+                if response.content_type == response.default_content_type:
+                    response.content_type = 'application/json'
+                for item in value.values():
+                    if isinstance(item, EmbeddedResources):
+                        item.add_headers(request)
+                charset = response.charset or 'utf-8'
+                # A body is iterated after the end of request processing
+                # (threadlocals are popped, finished callbacks are called,
+                # a transaction is committed), so representations
+                # of embedded resources are built here and only
+                # their encoding is streamed.
+                value = {
+                    key: (
+                        _RenderedEmbedded(item, request)
+                        if isinstance(item, EmbeddedResources)
+                        else item
+                    )
+                    for key, item in value.items()
+                }
+                chunks = self._iter_chunks(value, request, charset)
+                if compression:
+                    encoding = compression.negotiate(request)
+                    compression.prepare_response(response, encoding)
+                    if encoding:
+                        response.content_encoding = encoding
+                        chunks = compression.iter_compressed(chunks, encoding)
+                return chunks
+            return render(value, system)
+
+        return _render
+
+    @staticmethod
+    def _compressed(render, compression: Compression):
+        def _render(value, system):
+            result = render(value, system)
+            request = system.get('request')
+            if request is None:
+                return result
+            response = request.response
+            if response.content_encoding:
+                return result
+            encoding = compression.negotiate(request)
+            compression.prepare_response(response, encoding)
+            if encoding is None:
+                return result
+            body = result.encode(response.charset or 'utf-8')
+            if len(body) < compression.min_size:
+                return result
+            response.content_encoding = encoding
+            return compression.compress(body, encoding)
+
+        return _render
+
+    def _can_stream(self, request: PyramidRequest, value) -> bool:
+        if request.method != 'GET' or self.kw.get('indent') is not None:
+            # A body of response for HEAD request will be dropped,
+            # so it is not needed to stream it.
+            return False
+        return isinstance(value, dict) and all(isinstance(k, str) for k in value)
+
+    def _iter_chunks(self, value: dict, request: PyramidRequest, charset: str):
+        chunks = []
+        size = 0
+        for chunk in self._iter_json(value, request):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.chunk_size:
+                yield ''.join(chunks).encode(charset)
+                chunks = []
+                size = 0
+        if chunks:
+            yield ''.join(chunks).encode(charset)
+
+    def _iter_json(self, value: dict, request: PyramidRequest) -> Iterator[str]:
+        item_separator, key_separator = self.separators
+        default = self._make_default(request)
+
+        def dumps(obj):
+            return self.serializer(obj, default=default, **self.kw)
+
+        yield '{'
+        for i, (key, item) in enumerate(value.items()):
+            if i:
+                yield item_separator
+            yield dumps(key) + key_separator
+            if not isinstance(item, _RenderedEmbedded):
+                yield dumps(item)
+                continue
+            yield '{'
+            for j, (name, rendered, is_list) in enumerate(item.items):
+                if j:
+                    yield item_separator
+                yield dumps(name) + key_separator
+                if not is_list:
+                    yield dumps(rendered)
+                    continue
+                yield '['
+                for k, rendered_item in enumerate(rendered):
+                    if k:
+                        yield item_separator
+                    yield dumps(rendered_item)
+                yield ']'
+            yield '}'
+        yield '}'
+
+
+def _to_json_key(key) -> str:
+    if isinstance(key, str):
+        return key
+    if key is None or isinstance(key, (int, float)):
+        return json.dumps(key)
+    raise TypeError(
+        f'keys must be str, int, float, bool or None, not {key.__class__.__name__}'
+    )
+
+
+class _RenderedEmbedded:
+    __slots__ = ('items',)
+
+    def __init__(self, embedded_resources: EmbeddedResources, request):
+        self.items = [
+            (name, list(rendered) if is_list else rendered, is_list)
+            for name, rendered, is_list in embedded_resources.iter_rendered(request)
+        ]
+
+
+def build_json_renderer(backend='stdlib', **kwargs):
+    """Returns JSON renderer with registered adapters for common types.
+    :param backend: name of encoder backend (see ``JSON_BACKENDS``).
+      The adapter of enums is registered always, so backends that
+      serialize enums natively are replaced by the standard ``json``.
+    """
     adapters = [
         (IResource, resource_adapter),
         (datetime.datetime, datetime_adapter),
         (datetime.date, date_adapter),
         (datetime.time, time_adapter),
         (Decimal, decimal_adapter),
+        (Enum, enum_adapter),
     ]
-    try:
-        from enum import Enum
-
-        adapters.append((Enum, enum_adapter))
-    except ImportError:
-        pass
     try:
         from bson import ObjectId
 
@@ -67,7 +546,7 @@ def build_json_renderer(**kwargs):
     except ImportError:
         pass
 
-    return JSON(adapters=adapters, **kwargs)
+    return JSON(adapters=adapters, backend=backend, **kwargs)
 
 
 json_renderer = build_json_renderer(ensure_ascii=False)
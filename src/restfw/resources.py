@@ -4,6 +4,7 @@
 :Date: 19.08.2016
 """
 
+from datetime import datetime
 from inspect import isclass
 from typing import Generator, Optional, Type, get_type_hints
 
@@ -14,13 +15,16 @@ from pyramid.traversal import find_root
 from zope.interface import implementer
 
 from . import interfaces
-from .utils import ETag
+from .utils import ETag, get_resource_identity_map
 
 
 @implementer(interfaces.IResource)
 class Resource:
     __parent__ = None
     __name__ = None
+    # Registry of the application which is propagated from a parent
+    # to sub-resources while traversal.
+    __registry__: Optional[Registry] = None
 
     def __str__(self):
         return '<{} {}>'.format(self.__class__.__name__, self.__name__)
@@ -34,7 +38,13 @@ class Resource:
         resource = None
         registry = self.get_registry()
         key = str(key)
+        identity_map = None
         if registry is not None:
+            identity_map = get_resource_identity_map(registry=registry)
+            if identity_map is not None:
+                resource = identity_map.get_child(self, key)
+                if resource is not None:
+                    return resource
             try:
                 resource = registry.queryAdapter(self, interfaces.IResource, name=key)
             except KeyError:
@@ -43,6 +53,9 @@ class Resource:
             raise KeyError(key)
         resource.__name__ = key
         resource.__parent__ = self
+        resource.__registry__ = registry
+        if identity_map is not None:
+            identity_map.add_child(self, key, resource)
         return resource
 
     def get_sub_resources(
@@ -56,13 +69,22 @@ class Resource:
         return self.__class__.__name__
 
     def get_registry(self) -> Registry:
-        root = find_root(self)
-        return root.registry
+        registry = self.__registry__
+        if registry is None:
+            # The resource was created outside of traversal
+            registry = find_root(self).registry
+            self.__registry__ = registry
+        return registry
 
     def get_etag(self) -> Optional[ETag]:
         """Returns value of ETag header for the resource or None."""
         return None
 
+    def get_last_modified(self) -> Optional[datetime]:
+        """Returns time of last modification of the resource
+        (value of Last-Modified header) or None."""
+        return None
+
     def http_post(self, request, params) -> tuple['Resource', bool]:
         """Returns a new or modified resource, and a flag indicating that the
         resource was created or not."""
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from pyramid.config import Configurator
+from pyramid.location import lineage
+from pyramid.registry import Registry
+from pyramid.response import Response
+from pyramid.settings import asbool
+from pyramid.traversal import resource_path
+from zope.interface import implementer
+
+from .interfaces import IResourceChanged, IResponseCacheBackend
+from .typing import PyramidRequest
+from .utils import get_resource_etag
+
+
+class CachedResponse:
+    __slots__ = ('status', 'headerlist', 'body')
+
+    def __init__(self, status: str, headerlist: list, body: bytes):
+        self.status = status
+        self.headerlist = headerlist
+        self.body = body
+
+    @classmethod
+    def from_response(cls, response: Response) -> 'CachedResponse':
+        return cls(response.status, list(response.headerlist), response.body)
+
+    def to_response(self) -> Response:
+        response = Response(status=self.status, headerlist=list(self.headerlist))
+        response.body = self.body
+        return response
+
+
+@implementer(IResponseCacheBackend)
+class InMemoryResponseCache:
+    """In-process LRU storage of rendered responses which is bounded
+    by count of responses and by total size of their bodies.
+
+    Responses are invalidated only in the current process, so other
+    processes of the application may keep stale responses of resources
+    without ETag. Such responses expire after ``ttl`` seconds
+    (``None`` - never expire).
+    """
+
+    def __init__(
+        self,
+        max_entries=1000,
+        max_bytes=64 * 1024 * 1024,
+        ttl: Optional[float] = 60.0,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._keys_by_path = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires = entry[2]
+            if expires is not None and expires <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, path: str, response: CachedResponse):
+        size = len(response.body)
+        if size > self.max_bytes:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (path, response, expires)
+            self._keys_by_path.setdefault(path, set()).add(key)
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, path: str, descendants=False):
+        with self._lock:
+            if descendants:
+                prefix = path.rstrip('/') + '/'
+                paths = [
+                    p for p in self._keys_by_path if p == path or p.startswith(prefix)
+                ]
+            else:
+                paths = [path]
+            for p in paths:
+                for key in list(self._keys_by_path.get(p, ())):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_path.clear()
+            self._size = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        path, response, _ = entry
+        self._size -= len(response.body)
+        keys = self._keys_by_path.get(path)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_path[path]
+
+
+def set_response_cache_backend(config: Configurator, backend):
+    """Registers a storage of rendered responses.
+    :param config: A pyramid configurator.
+    :param backend: An object that implements IResponseCacheBackend.
+    """
+    config.registry.registerUtility(backend, IResponseCacheBackend)
+
+
+def get_response_cache_backend(registry: Registry):
+    """Returns the registered storage of rendered responses. By default,
+    ``InMemoryResponseCache`` is used which is configured by settings
+    ``restfw.response_cache.max_entries``,
+    ``restfw.response_cache.max_bytes`` and
+    ``restfw.response_cache.ttl`` (in seconds, 0 - never expire).
+    """
+    backend = registry.queryUtility(IResponseCacheBackend)
+    if backend is None:
+        settings = registry.settings or {}
+        ttl = float(settings.get('restfw.response_cache.ttl', 60))
+        backend = InMemoryResponseCache(
+            max_entries=int(settings.get('restfw.response_cache.max_entries', 1000)),
+            max_bytes=int(
+                settings.get('restfw.response_cache.max_bytes', 64 * 1024 * 1024)
+            ),
+            ttl=ttl if ttl > 0 else None,
+        )
+        registry.registerUtility(backend, IResponseCacheBackend)
+    return backend
+
+
+def is_response_cache_enabled(registry: Registry) -> bool:
+    settings = registry.settings or {}
+    return asbool(settings.get('restfw.response_cache.enabled', True))
+
+
+def get_user_fingerprint(request: PyramidRequest):
+    """Returns a value that identifies a set of principals of current user.
+    The security policy of Pyramid 2 doesn't expose effective principals,
+    so the authenticated user ID is used.
+    """
+    return request.authenticated_userid
+
+
+def get_response_cache_key(request: PyramidRequest, context) -> tuple:
+    etag = get_resource_etag(request, context)
+    return (
+        request.path_url,
+        tuple(sorted(request.GET.items())),
+        etag.serialize() if etag else None,
+        get_user_fingerprint(request),
+        # Bodies of responses may be compressed according to this header
+        request.headers.get('Accept-Encoding'),
+    )
+
+
+def invalidate_response_cache(event):
+    """Subscriber of IResourceChanged event which removes cached responses
+    of the modified resource, its descendants and its ancestors."""
+    request = event.request
+    backend = request.registry.queryUtility(IResponseCacheBackend)
+    if backend is None:
+        return
+    resource = event.resource
+    backend.invalidate(resource_path(resource), descendants=True)
+    parent = resource.__parent__
+    if parent is not None:
+        for ancestor in lineage(parent):
+            backend.invalidate(resource_path(ancestor))
+
+
+def includeme(config: Configurator):
+    config.add_directive('set_response_cache_backend', set_response_cache_backend)
+    config.add_subscriber(invalidate_response_cache, IResourceChanged)
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+
+Validation of results of resource views against output schemas.
+
+In testing mode every result is validated and an error is raised
+if it doesn't match the schema. In production mode only a sample
+of results is validated, errors are logged and counted:
+
+- ``restfw.result_validation.sample_rate`` - a part of requests
+  that are validated, from 0 to 1 (default: 0 - disabled);
+- ``restfw.result_validation.budget`` - max count of validations for every
+  view class during ``restfw.result_validation.interval`` seconds
+  (default: 60 validations per 60 seconds).
+
+A sampled result is converted into JSON data by adapters of the JSON
+renderer before rendering, so a body of response isn't parsed.
+Results are validated in the request thread, the budget limits
+the overhead.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+import colander
+from pyramid.registry import Registry
+
+from .errors import ResultValidationError
+from .schema_cache import get_compiled_schema
+from .typing import Json, PyramidRequest
+from .utils import make_partial_schema
+
+
+logger = logging.getLogger('restfw.result_validation')
+
+
+def get_result_schema(
+    view_class, method: str, request: PyramidRequest, context
+) -> Optional[colander.SchemaNode]:
+    """Returns bound output schema of the view class for the HTTP method."""
+    try:
+        output_schema = view_class.get_output_schema_for_http_method(method)
+    except RuntimeError as e:
+        raise ResultValidationError(e.args[0])
+    if output_schema is None:
+        return None
+    schema = get_compiled_schema(output_schema).bind(request=request, context=context)
+    if method == 'get':
+        get_fields = getattr(view_class, 'get_requested_fields', None)
+        fields = get_fields(request) if get_fields else None
+        if fields is not None:
+            schema = make_partial_schema(schema, fields)
+    return schema
+
+
+def validate_result(schema: colander.SchemaNode, cstruct):
+    """Raises ResultValidationError if the decoded result of a view
+    doesn't match the schema."""
+    try:
+        appstruct = schema.deserialize(cstruct)
+    except colander.Invalid as e:
+        raise ResultValidationError(e.asdict())
+    if isinstance(appstruct, dict):
+        if not isinstance(cstruct, dict):
+            raise ResultValidationError(
+                f'Type of API result ({cstruct.__class__.__name__}) '
+                f'is not equal to expected type (dict)'
+            )
+        result_keys = set(cstruct.keys())
+        schema_keys = set(appstruct.keys())
+        detail = {}
+        diff = result_keys - schema_keys
+        for key in diff:
+            detail[key] = 'Field from result is absent in the schema'
+        diff = schema_keys - result_keys
+        for key in diff:
+            detail[key] = 'Field from schema is absent in the result'
+        if detail:
+            raise ResultValidationError(detail)
+    elif isinstance(appstruct, (list, tuple)):
+        if not isinstance(cstruct, (list, tuple)):
+            raise ResultValidationError(
+                f'Type of API result ({cstruct.__class__.__name__}) '
+                f'is not equal to expected type (list)'
+            )
+
+
+def get_result_validation_settings(registry: Registry) -> dict:
+    settings = registry.settings or {}
+    prefix = 'restfw.result_validation.'
+    return {
+        'sample_rate': float(settings.get(prefix + 'sample_rate', 0)),
+        'budget': int(settings.get(prefix + 'budget', 60)),
+        'interval': float(settings.get(prefix + 'interval', 60)),
+    }
+
+
+class ResultValidationSampler:
+    """Selects results of views that are validated in production mode
+    and counts outcomes of validations."""
+
+    def __init__(self, sample_rate: float, budget: int, interval: float = 60.0):
+        self.sample_rate = sample_rate
+        self.budget = budget
+        self.interval = interval
+        self._lock = threading.Lock()
+        # view class -> (start of current interval, count of validations)
+        self._windows = {}
+        self.checked = Counter()
+        self.failed = Counter()
+        self.errors = Counter()
+
+    def should_validate(self, view_class) -> bool:
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            start, count = self._windows.get(view_class, (now, 0))
+            if now - start >= self.interval:
+                start, count = now, 0
+            if count >= self.budget:
+                return False
+            self._windows[view_class] = (start, count + 1)
+        return True
+
+    def validate(self, view_class, request_info: str, schema, data: Json):
+        name = _get_view_name(view_class)
+        try:
+            validate_result(schema, data)
+        except ResultValidationError as e:
+            with self._lock:
+                self.checked[name] += 1
+                self.failed[name] += 1
+            logger.warning(
+                'Result of %s for %s does not match the output schema: %s',
+                name,
+                request_info,
+                e.detail,
+            )
+        except Exception:
+            with self._lock:
+                self.checked[name] += 1
+                self.errors[name] += 1
+            logger.exception(
+                'Failed to validate result of %s for %s', name, request_info
+            )
+        else:
+            with self._lock:
+                self.checked[name] += 1
+
+    def get_stats(self) -> dict:
+        """Returns counts of validations for every view class."""
+        with self._lock:
+            return {
+                name: {
+                    'checked': self.checked[name],
+                    'failed': self.failed[name],
+                    'errors': self.errors[name],
+                }
+                for name in self.checked
+            }
+
+
+def _get_view_name(view_class) -> str:
+    return f'{view_class.__module__}.{view_class.__qualname__}'
+
+
+_lock = threading.Lock()
+
+
+def get_result_validation_sampler(registry: Registry) -> ResultValidationSampler:
+    sampler = getattr(registry, '_restfw_result_validation_sampler', None)
+    if sampler is None:
+        with _lock:
+            sampler = getattr(registry, '_restfw_result_validation_sampler', None)
+            if sampler is None:
+                settings = get_result_validation_settings(registry)
+                sampler = ResultValidationSampler(
+                    settings['sample_rate'],
+                    settings['budget'],
+                    settings['interval'],
+                )
+                registry._restfw_result_validation_sampler = sampler
+    return sampler
@@ -22,6 +22,7 @@ class Root(SimpleContainer):
     def __init__(self, registry: Registry):
         super(Root, self).__init__()
         self.registry = registry
+        self.__registry__ = registry
 
 
 def root_factory(request, root_class=Root):
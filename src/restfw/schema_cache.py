@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+
+Cache of compiled colander schemas.
+
+``colander.SchemaNode.bind()`` clones a whole tree of nodes, calls ``dir()``
+for every node to find deferred values and calls ``after_bind`` hooks.
+Compiled schema makes this work once per schema class:
+
+- a schema without deferred values, ``after_bind`` hooks and custom
+  ``_bind()`` methods (a static schema) is instantiated only once.
+  Bindings of its nodes are taken from a context-local variable during
+  deserialization, so validators that read ``node.bindings`` still
+  get the values of the current call;
+- other schemas are cloned and bound by a precomputed plan that binds
+  only nodes which really need it.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from weakref import WeakKeyDictionary
+
+import colander
+
+
+_current_bindings: ContextVar[Optional[dict]] = ContextVar(
+    'restfw_schema_bindings', default=None
+)
+
+
+class ContextBindings:
+    """Read-only mapping with bindings of the current call of
+    ``CompiledSchema.deserialize()``.
+    """
+
+    def _get(self) -> dict:
+        return _current_bindings.get() or {}
+
+    def __getitem__(self, key):
+        return self._get()[key]
+
+    def get(self, key, default=None):
+        return self._get().get(key, default)
+
+    def __contains__(self, key):
+        return key in self._get()
+
+    def __iter__(self):
+        return iter(self._get())
+
+    def __len__(self):
+        return len(self._get())
+
+    def keys(self):
+        return self._get().keys()
+
+    def items(self):
+        return self._get().items()
+
+    def values(self):
+        return self._get().values()
+
+    def copy(self) -> dict:
+        return dict(self._get())
+
+    def __repr__(self):
+        return f'<ContextBindings {self._get()!r}>'
+
+
+CONTEXT_BINDINGS = ContextBindings()
+
+
+@contextmanager
+def schema_bindings(**kw) -> Iterator[None]:
+    """Sets bindings of shared instances of static schemas."""
+    token = _current_bindings.set(kw)
+    try:
+        yield
+    finally:
+        _current_bindings.reset(token)
+
+
+class _BindPlan:
+    __slots__ = ('full_bind', 'custom_clone', 'children')
+
+    def __init__(self, full_bind: bool, custom_clone: bool, children: tuple):
+        self.full_bind = full_bind
+        self.custom_clone = custom_clone
+        self.children = children
+
+    @property
+    def is_static(self) -> bool:
+        return not self.full_bind and all(c.is_static for c in self.children)
+
+
+def _needs_full_bind(node: colander.SchemaNode) -> bool:
+    if type(node)._bind is not colander.SchemaNode._bind:
+        return True
+    if getattr(node, 'after_bind', None):
+        return True
+    # The same search of deferred values as in colander.SchemaNode._bind()
+    return any(isinstance(getattr(node, k), colander.deferred) for k in dir(node))
+
+
+def _make_plan(node: colander.SchemaNode) -> _BindPlan:
+    full_bind = _needs_full_bind(node)
+    custom_clone = type(node).clone is not colander.SchemaNode.clone
+    if full_bind or custom_clone:
+        # Sub-tree is processed by colander itself
+        return _BindPlan(full_bind, custom_clone, ())
+    return _BindPlan(False, False, tuple(_make_plan(c) for c in node.children))
+
+
+def _clone(node: colander.SchemaNode, plan: _BindPlan) -> colander.SchemaNode:
+    if plan.custom_clone or plan.full_bind:
+        return node.clone()
+    # Same as colander.SchemaNode.clone() but without calling
+    # of __new__() and __init__() of the node class.
+    cloned = object.__new__(node.__class__)
+    cloned.__dict__.update(node.__dict__)
+    cloned.children = [
+        _clone(child, child_plan)
+        for child, child_plan in zip(node.children, plan.children)
+    ]
+    return cloned
+
+
+def _bind(node: colander.SchemaNode, plan: _BindPlan, kw: dict):
+    if plan.full_bind or plan.custom_clone:
+        node._bind(kw)
+        return
+    node.bindings = kw
+    for child, child_plan in zip(node.children, plan.children):
+        _bind(child, child_plan, kw)
+
+
+def _set_context_bindings(node: colander.SchemaNode):
+    node.bindings = CONTEXT_BINDINGS
+    for child in node.children:
+        _set_context_bindings(child)
+
+
+class CompiledSchema:
+    """Schema class prepared for fast binding and deserialization.
+
+    Use :func:`get_compiled_schema` to get an instance of this class.
+    """
+
+    def __init__(self, schema_class):
+        self.schema_class = schema_class
+        self._instance = schema_class()
+        self._plan = _make_plan(self._instance)
+        self.is_static = self._plan.is_static
+        self._shared = None
+        if self.is_static:
+            self._shared = _clone(self._instance, self._plan)
+            _set_context_bindings(self._shared)
+
+    @property
+    def instance(self) -> colander.SchemaNode:
+        """Unbound instance of schema. It is shared, so it must not be modified."""
+        return self._instance
+
+    @property
+    def shared_instance(self) -> Optional[colander.SchemaNode]:
+        """Shared instance of a static schema which takes bindings from
+        ``schema_bindings()`` context or None for other schemas."""
+        return self._shared
+
+    def bind(self, **kw) -> colander.SchemaNode:
+        """Returns a new bound copy of schema,
+        an equivalent of ``schema_class().bind(**kw)``.
+        """
+        schema = _clone(self._instance, self._plan)
+        _bind(schema, self._plan, kw)
+        return schema
+
+    def deserialize(self, cstruct=colander.null, **kw):
+        """An equivalent of ``schema_class().bind(**kw).deserialize(cstruct)``."""
+        if self._shared is None:
+            return self.bind(**kw).deserialize(cstruct)
+        with schema_bindings(**kw):
+            return self._shared.deserialize(cstruct)
+
+
+_compiled_schemas = WeakKeyDictionary()
+_compiled_schemas_lock = threading.Lock()
+
+
+def get_compiled_schema(schema_class) -> CompiledSchema:
+    """Returns compiled version of the given schema class.
+    Compiled schemas are cached for every schema class.
+    """
+    try:
+        return _compiled_schemas[schema_class]
+    except KeyError:
+        pass
+    with _compiled_schemas_lock:
+        compiled = _compiled_schemas.get(schema_class)
+        if compiled is None:
+            compiled = CompiledSchema(schema_class)
+            _compiled_schemas[schema_class] = compiled
+    return compiled
+
+
+def clear_compiled_schemas():
+    with _compiled_schemas_lock:
+        _compiled_schemas.clear()
@@ -0,0 +1,464 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+
+Compiler of colander schemas into specialized Python functions.
+
+Colander deserializes data by a generic walk over a tree of nodes with
+dynamic dispatch of types, preparers and validators. The compiler generates
+source code of a function for a static schema (see :mod:`restfw.schema_cache`)
+in which checks of common node types and validators are inlined:
+
+- types ``String``, ``Integer``, ``Float``, ``Boolean``, ``Mapping``
+  (including ``UrlEncodeMapping``), ``Sequence`` and ``Nullable``
+  wrapping any of them;
+- preparers of ``StringNode`` and ``EmptyStringNode``;
+- validators ``Range``, ``Length``, ``OneOf``, ``LaconicOneOf``,
+  ``All``, ``LazyAll`` and ``NullableValidator`` wrapping any of them.
+
+Other nodes, preparers and validators are called as is, exactly once.
+Errors of children of mappings and sequences are collected in the same way
+as colander does it, failed builtin validators are called to raise their
+errors, and a leaf node which value can't be converted by the generated code
+is deserialized by colander. So the result and the structure
+of ``colander.Invalid`` errors are always the same as without the compiler.
+"""
+
+import copy
+import threading
+from typing import Optional
+from weakref import WeakKeyDictionary
+
+import colander
+from colander import is_nonstr_iter
+
+from .schema_cache import CompiledSchema, get_compiled_schema, schema_bindings
+
+
+class _Fallback(Exception):
+    """Generated code can't handle the data."""
+
+
+def _required(node) -> colander.Invalid:
+    return colander.Invalid(
+        node,
+        colander._(node.missing_msg, mapping={'title': node.title, 'name': node.name}),
+    )
+
+
+def _unsupported_fields(node, value) -> colander.UnsupportedFields:
+    return colander.UnsupportedFields(
+        node,
+        value,
+        msg=colander._(
+            'Unrecognized keys in mapping: "${val}"', mapping={'val': value}
+        ),
+    )
+
+
+class _Emitter:
+    def __init__(self):
+        self.lines = []
+        self.namespace = {
+            'null': colander.null,
+            'drop': colander.drop,
+            'copy': copy,
+            'Invalid': colander.Invalid,
+            '_Fallback': _Fallback,
+            '_conversion_errors': (_Fallback, ValueError, TypeError, OverflowError),
+            '_required': _required,
+            '_unsupported_fields': _unsupported_fields,
+        }
+        self._counter = 0
+
+    def name(self, prefix: str) -> str:
+        self._counter += 1
+        return f'{prefix}{self._counter}'
+
+    def const(self, value, prefix='k') -> str:
+        name = self.name(prefix)
+        self.namespace[name] = value
+        return name
+
+    def line(self, indent: int, text: str):
+        self.lines.append('    ' * indent + text)
+
+
+class _SchemaCompiler:
+    def __init__(self):
+        from . import schemas
+
+        self.schemas = schemas
+        self.emitter = _Emitter()
+
+    def compile(self, schema: colander.SchemaNode) -> tuple[str, dict]:
+        e = self.emitter
+        e.line(0, 'def deserialize(cstruct):')
+        self.emit_node(schema, 'cstruct', 'result', 1)
+        e.line(1, 'return result')
+        return '\n'.join(e.lines) + '\n', e.namespace
+
+    # Nodes
+
+    def emit_node(self, node, src: str, dst: str, indent: int):
+        e = self.emitter
+        n = e.const(node, 'n')
+        if not self.is_supported_node(node):
+            # Colander deserializes the whole node
+            e.line(indent, f'{dst} = {n}.deserialize({src})')
+            return
+        if self.is_container_type(node.typ):
+            self.emit_type(node, node.typ, src, dst, indent)
+        else:
+            # Conversion of a leaf value has no side effects, so colander
+            # may repeat it to raise an error or to convert an unusual value
+            e.line(indent, 'try:')
+            self.emit_type(node, node.typ, src, dst, indent + 1)
+            e.line(indent, 'except _conversion_errors:')
+            e.line(indent + 1, f'{dst} = {n}.deserialize({src})')
+            e.line(indent, 'else:')
+            indent += 1
+        self.emit_preparer(node, dst, indent)
+        e.line(indent, f'if {dst} is null:')
+        missing = node.missing
+        if missing is colander.required:
+            e.line(indent + 1, f'raise _required({n})')
+        else:
+            e.line(indent + 1, f'{dst} = {e.const(missing, "m")}')
+        if node.validator is not None:
+            e.line(indent, 'else:')
+            self.emit_validator(node, node.validator, dst, indent + 1)
+
+    def is_supported_node(self, node) -> bool:
+        deserialize = type(node).deserialize
+        if deserialize is self.schemas.SequenceNode.deserialize:
+            # Only sequences of resources are deserialized in a special way
+            if node.children and not self.is_supported_type(node.children[0].typ):
+                return False
+        elif deserialize is not colander.SchemaNode.deserialize:
+            return False
+        if isinstance(node.missing, colander.deferred) or isinstance(
+            node.validator, colander.deferred
+        ):
+            return False
+        if (
+            self.get_base_type(node.typ).__class__ is colander.Sequence
+            and not node.children
+        ):
+            # Colander fails on such sequences in its own way
+            return False
+        return self.is_supported_type(node.typ)
+
+    def get_base_type(self, typ):
+        while type(typ) is self.schemas.Nullable:
+            typ = typ.typ
+        return typ
+
+    def is_container_type(self, typ) -> bool:
+        return type(self.get_base_type(typ)) in (
+            colander.Mapping,
+            self.schemas.UrlEncodeMapping,
+            colander.Sequence,
+        )
+
+    def is_supported_type(self, typ) -> bool:
+        schemas = self.schemas
+        typ_class = type(typ)
+        if typ_class is schemas.Nullable:
+            return self.is_supported_type(typ.typ)
+        return typ_class in (
+            colander.String,
+            schemas.EmptyString,
+            colander.Integer,
+            colander.Float,
+            colander.Boolean,
+            colander.Mapping,
+            schemas.UrlEncodeMapping,
+            colander.Sequence,
+        )
+
+    # Types
+
+    def emit_type(self, node, typ, src: str, dst: str, indent: int):
+        e = self.emitter
+        typ_class = type(typ)
+        if typ_class is self.schemas.Nullable:
+            nulls = e.const(typ.null_values, 'nulls')
+            e.line(indent, f'if {src} is None or {src} in {nulls}:')
+            e.line(indent + 1, f'{dst} = None')
+            e.line(indent, 'else:')
+            self.emit_type(node, typ.typ, src, dst, indent + 1)
+        elif issubclass(typ_class, colander.String):
+            self.emit_string(typ, src, dst, indent)
+        elif typ_class in (colander.Integer, colander.Float):
+            num = e.const(typ.num, 'num')
+            e.line(indent, f'if {src} != 0 and not {src}:')
+            e.line(indent + 1, f'{dst} = null')
+            e.line(indent, 'else:')
+            e.line(indent + 1, f'{dst} = {num}({src})')
+        elif typ_class is colander.Boolean:
+            self.emit_boolean(typ, src, dst, indent)
+        elif typ_class is colander.Sequence:
+            self.emit_sequence(node, typ, src, dst, indent)
+        else:
+            self.emit_mapping(node, typ, src, dst, indent)
+
+    def emit_string(self, typ, src: str, dst: str, indent: int):
+        e = self.emitter
+        keyword = 'if'
+        if typ.allow_empty:
+            e.line(indent, f"if {src} == '':")
+            e.line(indent + 1, f"{dst} = ''")
+            keyword = 'elif'
+        e.line(indent, f'{keyword} not {src}:')
+        e.line(indent + 1, f'{dst} = null')
+        e.line(indent, f'elif {src}.__class__ is str:')
+        e.line(indent + 1, f'{dst} = {src}')
+        e.line(indent, 'else:')
+        e.line(indent + 1, 'raise _Fallback')
+
+    def emit_boolean(self, typ, src: str, dst: str, indent: int):
+        e = self.emitter
+        value = e.name('b')
+        e.line(indent, f'if {src} is null:')
+        e.line(indent + 1, f'{dst} = null')
+        e.line(indent, 'else:')
+        e.line(indent + 1, f'{value} = str({src}).lower()')
+        e.line(indent + 1, f'if {value} in {e.const(typ.false_choices, "false")}:')
+        e.line(indent + 2, f'{dst} = False')
+        if typ.true_choices:
+            e.line(
+                indent + 1,
+                f'elif {value} in {e.const(typ.true_choices, "true")}:',
+            )
+            e.line(indent + 2, f'{dst} = True')
+            e.line(indent + 1, 'else:')
+            e.line(indent + 2, 'raise _Fallback')
+        else:
+            e.line(indent + 1, 'else:')
+            e.line(indent + 2, f'{dst} = True')
+
+    def emit_mapping(self, node, typ, src: str, dst: str, indent: int):
+        e = self.emitter
+        n = e.const(node, 'n')
+        t = e.const(typ, 't')
+        value = e.name('mapping')
+        unknown = typ.unknown
+        e.line(indent, f'if {src} is null:')
+        e.line(indent + 1, f'{dst} = null')
+        e.line(indent, 'else:')
+        indent += 1
+        if unknown == 'ignore':
+            # Values are not popped, so a dict may be used without copying
+            e.line(indent, f'if {src}.__class__ is dict:')
+            e.line(indent + 1, f'{value} = {src}')
+            e.line(indent, 'else:')
+            e.line(indent + 1, f'{value} = {t}._validate({n}, {src})')
+            get = 'get'
+        else:
+            e.line(indent, f'{value} = {t}._validate({n}, {src})')
+            get = 'pop'
+        e.line(indent, f'{dst} = {{}}')
+        error = e.name('error')
+        e.line(indent, f'{error} = None')
+        for num, child in enumerate(node.children):
+            sub_src = e.name('c')
+            sub_dst = e.name('v')
+            name = e.const(child.name, 'name')
+            e.line(indent, f'{sub_src} = {value}.{get}({name}, null)')
+            check = f'{sub_src} is not drop'
+            if child.missing is colander.drop:
+                check = f'{sub_src} is not null and {check}'
+            e.line(indent, f'if {check}:')
+            self.emit_child(node, child, sub_src, sub_dst, error, str(num), indent + 1)
+            e.line(indent + 2, f'if {sub_dst} is not drop:')
+            e.line(indent + 3, f'{dst}[{name}] = {sub_dst}')
+        if unknown == 'raise':
+            e.line(indent, f'if {value}:')
+            e.line(indent + 1, f'raise _unsupported_fields({n}, {value})')
+        elif unknown == 'preserve':
+            e.line(indent, f'{dst}.update(copy.deepcopy({value}))')
+        e.line(indent, f'if {error} is not None:')
+        e.line(indent + 1, f'raise {error}')
+
+    def emit_sequence(self, node, typ, src: str, dst: str, indent: int):
+        e = self.emitter
+        n = e.const(node, 'n')
+        t = e.const(typ, 't')
+        items = e.name('items')
+        num = e.name('i')
+        item = e.name('c')
+        sub_dst = e.name('v')
+        error = e.name('error')
+        child = node.children[0]
+        e.line(indent, f'if {src} is null:')
+        e.line(indent + 1, f'{dst} = null')
+        e.line(indent, 'else:')
+        indent += 1
+        e.line(indent, f'if {src}.__class__ is list:')
+        e.line(indent + 1, f'{items} = {src}')
+        e.line(indent, 'else:')
+        e.line(indent + 1, f'{items} = {t}._validate({n}, {src}, {t}.accept_scalar)')
+        e.line(indent, f'{dst} = []')
+        e.line(indent, f'{error} = None')
+        e.line(indent, f'for {num}, {item} in enumerate({items}):')
+        skip = f'{item} is drop'
+        if child.missing is colander.drop:
+            skip = f'{item} is null or {skip}'
+        e.line(indent + 1, f'if {skip}:')
+        e.line(indent + 2, 'continue')
+        self.emit_child(node, child, item, sub_dst, error, num, indent + 1)
+        e.line(indent + 2, f'if {sub_dst} is not drop:')
+        e.line(indent + 3, f'{dst}.append({sub_dst})')
+        e.line(indent, f'if {error} is not None:')
+        e.line(indent + 1, f'raise {error}')
+
+    def emit_child(
+        self, node, child, src: str, dst: str, error: str, num: str, indent: int
+    ):
+        """Emits deserialization of a child node with collecting of its error
+        in the same way as colander does it. The caller has to emit handling
+        of the successful result with ``indent + 1``.
+        """
+        e = self.emitter
+        exc = e.name('exc')
+        e.line(indent, 'try:')
+        self.emit_node(child, src, dst, indent + 1)
+        e.line(indent, f'except Invalid as {exc}:')
+        e.line(indent + 1, f'if {error} is None:')
+        e.line(indent + 2, f'{error} = Invalid({e.const(node, "n")})')
+        e.line(indent + 1, f'{error}.add({exc}, {num})')
+        e.line(indent, 'else:')
+
+    # Preparers and validators
+
+    def emit_preparer(self, node, dst: str, indent: int):
+        e = self.emitter
+        preparer = node.preparer
+        if preparer is None:
+            return
+        node_class = type(node)
+        schemas = self.schemas
+        if (
+            node_class.preparer
+            in (
+                schemas.StringNode.preparer,
+                schemas.EmptyStringNode.preparer,
+            )
+            and getattr(preparer, '__func__', None) is node_class.preparer
+        ):
+            e.line(indent, f'if {dst} is not null and {dst} is not None:')
+            if node.strip:
+                e.line(indent + 1, f'if {dst}:')
+                e.line(indent + 2, f'{dst} = {dst}.strip()')
+            if node_class.preparer is schemas.StringNode.preparer:
+                e.line(indent + 1, f'if not {dst}:')
+                e.line(indent + 2, f'{dst} = null')
+            elif not node.strip:
+                e.line(indent + 1, 'pass')
+        elif callable(preparer):
+            e.line(indent, f'{dst} = {e.const(preparer, "p")}({dst})')
+        elif is_nonstr_iter(preparer):
+            for item in preparer:
+                e.line(indent, f'{dst} = {e.const(item, "p")}({dst})')
+
+    def emit_validator(self, node, validator, value: str, indent: int):
+        e = self.emitter
+        n = e.const(node, 'n')
+        call = f'{e.const(validator, "validator")}({n}, {value})'
+        condition = self.get_validator_condition(validator, value)
+        if condition is None:
+            e.line(indent, call)
+        else:
+            # The validator itself raises an error if the value is not valid
+            e.line(indent, f'if not ({condition}):')
+            e.line(indent + 1, call)
+
+    def get_validator_condition(self, validator, value: str) -> Optional[str]:
+        """Returns an expression which is true if the given validator
+        accepts the value, or None if the validator can't be inlined.
+        """
+        e = self.emitter
+        schemas = self.schemas
+        validator_class = type(validator)
+        if validator_class is schemas.NullableValidator:
+            condition = self.get_validator_condition(validator.validator, value)
+            if condition is None:
+                return None
+            return f'{value} is None or ({condition})'
+        if validator_class in (colander.All, schemas.LazyAll):
+            # Both of them fail if any of validators fails
+            conditions = []
+            for item in validator.validators:
+                condition = self.get_validator_condition(item, value)
+                if condition is None:
+                    return None
+                conditions.append(f'({condition})')
+            return ' and '.join(conditions) or 'True'
+        if validator_class in (colander.Range, colander.Length):
+            actual = value if validator_class is colander.Range else f'len({value})'
+            conditions = []
+            if validator.min is not None:
+                conditions.append(f'not {actual} < {e.const(validator.min, "min")}')
+            if validator.max is not None:
+                conditions.append(f'not {actual} > {e.const(validator.max, "max")}')
+            return ' and '.join(conditions) or 'True'
+        if validator_class in (colander.OneOf, schemas.LaconicOneOf):
+            return f'{value} in {e.const(validator.choices, "choices")}'
+        return None
+
+
+class SchemaValidator:
+    """Deserializes data by a function compiled from a schema class.
+
+    Use :func:`get_schema_validator` to get an instance of this class.
+    """
+
+    def __init__(self, schema_class):
+        self.schema_class = schema_class
+        self.compiled_schema: CompiledSchema = get_compiled_schema(schema_class)
+        self.source: Optional[str] = None
+        self._func = None
+        schema = self.compiled_schema.shared_instance
+        if schema is not None:
+            # Only static schemas are compiled
+            self.source, namespace = _SchemaCompiler().compile(schema)
+            code = compile(self.source, f'<compiled {schema_class.__name__}>', 'exec')
+            exec(code, namespace)
+            self._func = namespace['deserialize']
+
+    @property
+    def is_compiled(self) -> bool:
+        return self._func is not None
+
+    def deserialize(self, cstruct=colander.null, **kw):
+        """An equivalent of ``schema_class().bind(**kw).deserialize(cstruct)``."""
+        func = self._func
+        if func is not None:
+            with schema_bindings(**kw):
+                try:
+                    return func(cstruct)
+                except _Fallback:
+                    pass
+        return self.compiled_schema.deserialize(cstruct, **kw)
+
+
+_validators = WeakKeyDictionary()
+_validators_lock = threading.Lock()
+
+
+def get_schema_validator(schema_class) -> SchemaValidator:
+    """Returns compiled validator of the given schema class.
+    Validators are cached for every schema class.
+    """
+    try:
+        return _validators[schema_class]
+    except KeyError:
+        pass
+    with _validators_lock:
+        validator = _validators.get(schema_class)
+        if validator is None:
+            validator = SchemaValidator(schema_class)
+            _validators[schema_class] = validator
+    return validator
@@ -4,16 +4,18 @@
 :Date: 26.08.2016
 """
 
+from contextvars import ContextVar
+from typing import Optional
 from urllib.parse import urlsplit
 
 import colander
 from pyramid.interfaces import ILocation
-from pyramid.traversal import find_resource
 from webob.multidict import MultiDict
 from zope.deprecation import deprecate
 from zope.interface.interfaces import IInterface
 
 from .external_links import get_external_links
+from .utils import find_resource_by_path, find_resources
 
 
 LISTING_CONF = {'max_limit': 500}
@@ -133,13 +135,37 @@ class ResourceType(colander.SchemaType):
                     mapping={'val': cstruct, 'err': e},
                 ),
             )
+        resolved = _resolved_resources.get()
+        if resolved is not None and resource_path in resolved:
+            resource = resolved[resource_path]
+            if resource is None:
+                raise colander.Invalid(node, colander._('Resource has not found'))
+            return resource
         try:
-            resource = find_resource(request.root, resource_path)
+            resource = find_resource_by_path(request.root, resource_path, request)
         except KeyError:
             raise colander.Invalid(node, colander._('Resource has not found'))
         return resource
 
 
+# Resources found by paths of URLs from a sequence of resource nodes
+# which is deserializing in the current context.
+_resolved_resources: ContextVar[Optional[dict]] = ContextVar(
+    'restfw_resolved_resources', default=None
+)
+
+
+def _resolve_resource_urls(request, urls) -> dict:
+    paths = []
+    for url in urls:
+        if url and isinstance(url, str):
+            try:
+                paths.append(urlsplit(url).path)
+            except ValueError:
+                pass
+    return find_resources(request.root, paths, request)
+
+
 # Basic nodes
 
 
@@ -295,6 +321,31 @@ class SequenceNode(BaseNode, colander.SequenceSchema):
     def schema_type(self):
         return colander.Sequence(accept_scalar=self.accept_scalar)
 
+    def deserialize(self, cstruct=colander.null):
+        request = self._get_request_for_bulk_resolving(cstruct)
+        if request is None:
+            return super().deserialize(cstruct)
+        # All resources are found before deserialization of items,
+        # so common prefixes of their paths are traversed only once.
+        token = _resolved_resources.set(_resolve_resource_urls(request, cstruct))
+        try:
+            return super().deserialize(cstruct)
+        finally:
+            _resolved_resources.reset(token)
+
+    def _get_request_for_bulk_resolving(self, cstruct):
+        if not isinstance(cstruct, (list, tuple)) or len(cstruct) < 2:
+            return None
+        if not self.children:
+            return None
+        item_node = self.children[0]
+        typ = item_node.typ
+        if isinstance(typ, Nullable):
+            typ = typ.typ
+        if not isinstance(typ, ResourceType):
+            return None
+        return (item_node.bindings or {}).get('request')
+
 
 class ResourceNode(BaseNode):
     schema_type = ResourceType
@@ -390,7 +441,15 @@ class ResourceInterface:
 
 
 class GetResourceSchema(MappingNode):
-    pass
+    fields = StringNode(
+        title='Fields',
+        description=(
+            'Comma-separated list of fields which must be included into a response. '
+            'Links can be specified as "_links.<name>". '
+            'All fields are included if the list is empty.'
+        ),
+        missing='',
+    )
 
 
 class ResourceSchema(MappingNode):
@@ -510,6 +569,11 @@ class GetNextPageSchema(GetResourceSchema):
         missing='',
         description='Position of next item used for listing in forward direction.',
     )
+    cursor_prev = StringNode(
+        title='Previous item position',
+        missing='',
+        description='Position of previous item used for listing in backward direction.',
+    )
     limit = IntegerNode(
         title='Limit',
         preparer=prepare_limit,
@@ -44,7 +44,7 @@ class TestingSecurityPolicy:
         if identity is not None:
             principals.add(Authenticated)
             principals.add(identity)
-        return self.helper.permits(context, principals, permission)
+        return self.helper.permits(context, principals, permission, request=request)
 
     def remember(self, request: PyramidRequest, userid, **kw):
         pass
@@ -55,6 +55,7 @@ class TestingSecurityPolicy:
 
 def simple_app(global_config, **settings):
     """This function returns a Pyramid WSGI application."""
+    settings.setdefault('restfw.cursor_secret', 'testing')
     with Configurator(settings=settings) as config:
         config.set_security_policy(TestingSecurityPolicy())
 
@@ -231,3 +231,27 @@ def test_links_to_sub_resource(web_app, root, app_config):
             'static_sub': {'href': 'http://localhost/3/resource/static_sub/'},
         }
     }
+
+
+def test_registry_propagation(root, monkeypatch):
+    registry = root.registry
+    # Detached container has not registry, so it is not propagated
+    # to its items.
+    detached = Container()
+    detached['resource'] = DummyResource()
+    assert detached['resource'].__registry__ is None
+    root['detached'] = detached
+    assert detached.__registry__ is registry
+    assert detached['resource'].get_registry() is registry
+    assert detached['resource'].__registry__ is registry
+
+    def find_root(resource):
+        raise AssertionError('find_root() must not be called')
+
+    monkeypatch.setattr('restfw.resources.find_root', find_root)
+    resource = root['2']['resource']
+    assert resource.get_registry() is registry
+    sub23 = resource['sub23']
+    assert sub23.__registry__ is registry
+    with pytest.raises(KeyError):
+        _ = sub23['unknown']
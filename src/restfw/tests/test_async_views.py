@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import asyncio
+
+import pytest
+from pyramid.threadlocal import get_current_request
+
+from .. import interfaces, schemas, views
+from ..async_views import (
+    AsyncHalResourceView,
+    AsyncHalResourceWithEmbeddedView,
+    run_coroutine,
+)
+from ..errors import ParametersError
+from ..typing import Json
+from .test_views import (
+    DummyContainer,
+    DummyHalResource,
+    DummyHalResourceSchema,
+    PutDummyHalResourceSchema,
+)
+
+
+class AsyncHalResource(DummyHalResource):
+    running = 0
+    max_running = 0
+    loops = set()
+    threadlocals = []
+
+    async def http_put(self, request, params):
+        await asyncio.sleep(0)
+        if self.put_errors:
+            raise ParametersError(self.put_errors)
+        self.title = params['title']
+        self.description = params['description']
+        return False
+
+
+@views.resource_view_config()
+class DummyAsyncHalResourceView(AsyncHalResourceView):
+    resource: AsyncHalResource
+    options_for_get = interfaces.MethodOptions(
+        schemas.GetResourceSchema, DummyHalResourceSchema
+    )
+    options_for_put = interfaces.MethodOptions(PutDummyHalResourceSchema)
+
+    async def as_dict(self) -> Json:
+        cls = AsyncHalResource
+        cls.loops.add(asyncio.get_running_loop())
+        cls.running += 1
+        cls.max_running = max(cls.max_running, cls.running)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            cls.running -= 1
+        cls.threadlocals.append(get_current_request() is self.request)
+        return {
+            'title': self.resource.title,
+            'description': self.resource.description,
+        }
+
+
+class AsyncContainer(DummyContainer):
+    pass
+
+
+@views.resource_view_config()
+class DummyAsyncContainerView(AsyncHalResourceWithEmbeddedView):
+    resource: AsyncContainer
+    fast_head = True
+
+    async def get_embedded(self, params: dict):
+        await asyncio.sleep(0)
+        return views.list_to_embedded_resources(
+            self.request,
+            params,
+            resources=list(self.resource.values()),
+            parent=self.resource,
+            embedded_name='items',
+        )
+
+
+@pytest.fixture(autouse=True)
+def register(app_config):
+    app_config.scan('restfw.tests.test_views')
+    app_config.scan('restfw.tests.test_async_views')
+    app_config.commit()
+
+
+@pytest.fixture(name='container')
+def container_fixture(pyramid_request):
+    pyramid_request.root['container'] = container = AsyncContainer()
+    for i in range(5):
+        container[f'res-{i}'] = AsyncHalResource(f'Title {i}', 'Description')
+    container['sync'] = DummyHalResource('Sync', 'Description')
+    AsyncHalResource.max_running = 0
+    AsyncHalResource.loops = set()
+    AsyncHalResource.threadlocals = []
+    return container
+
+
+def test_async_views(web_app, pyramid_request, container):
+    url = pyramid_request.resource_url(container['res-1'])
+    res = web_app.get(url)
+    assert res.json == {
+        'title': 'Title 1',
+        'description': 'Description',
+        '_links': {'self': {'href': url}},
+    }
+    res = web_app.get(url, params={'fields': 'title'})
+    assert res.json == {'title': 'Title 1', '_links': {'self': {'href': url}}}
+
+    res = web_app.put_json(url, params={'title': 'New title'})
+    assert res.json['title'] == 'New title'
+    assert container['res-1'].title == 'New title'
+
+    container['res-1'].put_errors = {'title': 'Error'}
+    res = web_app.put_json(url, params={'title': 'Title'}, status=422)
+    assert res.json['detail'] == {'title': 'Error'}
+
+    # Embedded resources with async views are rendered concurrently
+    container_url = pyramid_request.resource_url(container)
+    res = web_app.get(container_url, params={'total_count': True})
+    assert res.headers['X-Total-Count'] == '6'
+    items = res.json['_embedded']['items']
+    assert [item['title'] for item in items] == [
+        'Title 0',
+        'New title',
+        'Title 2',
+        'Title 3',
+        'Title 4',
+        'Sync',
+    ]
+    assert AsyncHalResource.max_running == 5
+    # Coroutines are executed in the event loop of the current thread
+    # with threadlocals of Pyramid
+    assert len(AsyncHalResource.loops) == 1
+    assert AsyncHalResource.threadlocals
+    assert all(AsyncHalResource.threadlocals)
+
+    res = web_app.head(container_url, params={'total_count': True})
+    assert res.headers['X-Total-Count'] == '6'
+
+
+def test_run_coroutine(pyramid_request):
+    async def get_value():
+        return 1
+
+    assert run_coroutine(pyramid_request, get_value()) == 1
+
+    async def nested():
+        return run_coroutine(pyramid_request, get_value())
+
+    with pytest.raises(RuntimeError):
+        run_coroutine(pyramid_request, nested())
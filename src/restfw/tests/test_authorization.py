@@ -4,17 +4,31 @@
 :Date: 30.03.2017
 """
 
+import random
 import unittest
 
-from pyramid.authorization import ALL_PERMISSIONS, Allow, DENY_ALL, Deny, Everyone
+from pyramid.authorization import (
+    ACLAllowed,
+    ACLDenied,
+    ALL_PERMISSIONS,
+    Allow,
+    DENY_ALL,
+    Deny,
+    Everyone,
+)
+from pyramid.location import lineage
+from pyramid.testing import DummyRequest
+from pyramid.util import is_nonstr_iter
 
 from .vendor import pyramid_test_authorization as vendor_test
 from ..authorization import (
     RestAclHelper,
+    _match_permission,
     principals_allowed_by_permission,
     get_view_permission,
 )
 from ..resources import Resource
+from ..utils import clear_acl_decisions, get_compiled_acls
 
 
 class RestDummyContext(Resource):
@@ -300,3 +314,194 @@ class TestRestAclHelper(unittest.TestCase):
 
         child.__acl__ = [(Deny, 1, permission)]
         assert not helper.permits(child, [1], view_permission)
+
+
+def reference_permits(context, principals, permission):
+    """Implementation of RestAclHelper.permits() without compiled ACL."""
+    acl = '<No ACL found on any object in resource lineage>'
+    base_permission, _, context_permission = permission.partition('.')
+    if base_permission and base_permission not in (
+        'get',
+        'put',
+        'patch',
+        'post',
+        'delete',
+    ):
+        context_permission = permission
+        base_permission = ''
+    for location in lineage(context):
+        try:
+            acl = location.__acl__
+        except AttributeError:
+            continue
+        if acl and callable(acl):
+            acl = acl()
+        for ace in acl:
+            ace_action, ace_principal, ace_permissions = ace
+            if ace_principal in principals:
+                if not is_nonstr_iter(ace_permissions):
+                    ace_permissions = [ace_permissions]
+                if _match_permission(
+                    base_permission, context_permission, ace_permissions
+                ):
+                    if ace_action == Allow:
+                        return ACLAllowed(ace, acl, permission, principals, location)
+                    else:
+                        return ACLDenied(ace, acl, permission, principals, location)
+    return ACLDenied('<default deny>', acl, permission, principals, context)
+
+
+def assert_same_result(result, expected):
+    assert type(result) is type(expected)
+    assert result.ace == expected.ace
+    assert result.acl == expected.acl
+    assert result.permission == expected.permission
+    assert result.principals == expected.principals
+    assert result.context is expected.context
+
+
+PERMISSIONS = [
+    'get',
+    'put',
+    'post',
+    'delete',
+    'get.dummy',
+    'get.dummy.get',
+    'post.dummy.create',
+    'dummy.edit',
+    'dummy.',
+    'dummy',
+    'other.get',
+    'patch.',
+    '.dummy',
+    '',
+]
+ACE_PERMISSIONS = PERMISSIONS + [
+    ALL_PERMISSIONS,
+    ['get', 'dummy.edit'],
+    ('post.dummy.', 'delete'),
+    [],
+]
+PRINCIPALS = [Everyone, 'user', 'admin', 1, 2]
+
+
+def random_acl(rnd):
+    return [
+        (
+            rnd.choice([Allow, Deny]),
+            rnd.choice(PRINCIPALS),
+            rnd.choice(ACE_PERMISSIONS),
+        )
+        for _ in range(rnd.randint(0, 6))
+    ]
+
+
+class Location(Resource):
+    def __init__(self, name, parent=None):
+        self.__name__ = name
+        self.__parent__ = parent
+
+
+def test_differential():
+    rnd = random.Random(42)
+    helper = RestAclHelper()
+    for _ in range(300):
+        root = Location('')
+        parent = Location('parent', root)
+        context = Location('context', parent)
+        for location in (root, parent, context):
+            if rnd.random() < 0.2:
+                continue
+            acl = random_acl(rnd)
+            if rnd.random() < 0.2:
+                location.__acl__ = lambda acl=acl: list(acl)
+            else:
+                location.__acl__ = acl
+        request = DummyRequest()
+        for _ in range(10):
+            principals = set(rnd.sample(PRINCIPALS, rnd.randint(0, 3)))
+            permission = rnd.choice(PERMISSIONS)
+            expected = reference_permits(context, principals, permission)
+            result = helper.permits(context, principals, permission)
+            assert_same_result(result, expected)
+            # ACL compiled for the request and memoized decisions
+            for _ in range(2):
+                result = helper.permits(
+                    context, principals, permission, request=request
+                )
+                assert_same_result(result, expected)
+            # Decisions for parents use the same compiled ACL
+            result = helper.permits(parent, principals, permission, request=request)
+            assert_same_result(
+                result, reference_permits(parent, principals, permission)
+            )
+
+
+def test_compiled_acls():
+    helper = RestAclHelper()
+    request = DummyRequest()
+    context = Location('context')
+    context.__acl__ = acl = [(Allow, 'user', 'get'), (Deny, 'user', ALL_PERMISSIONS)]
+    assert helper.permits(context, ['user'], 'get', request=request)
+    assert not helper.permits(context, ['user'], 'post', request=request)
+    compiled_acls = get_compiled_acls(request)
+    assert list(compiled_acls.values()) == [(acl, compiled_acls[id(acl)][1])]
+    compiled_acl = compiled_acls[id(acl)][1]
+    assert compiled_acl.aces == tuple(acl)
+    assert compiled_acl.find_position(frozenset(['user']), 'post', '') == 1
+
+    # ACL are compiled again after modification of resources
+    acl[0] = (Allow, 'user', 'post')
+    clear_acl_decisions(request)
+    assert not compiled_acls
+    assert not helper.permits(context, ['user'], 'get', request=request)
+    assert helper.permits(context, ['user'], 'post', request=request)
+
+    # ACL returned by callables are not compiled
+    clear_acl_decisions(request)
+    context.__acl__ = lambda: acl
+    assert helper.permits(context, ['user'], 'post', request=request)
+    assert not compiled_acls
+
+
+def test_decisions_memo():
+    helper = RestAclHelper()
+    request = DummyRequest()
+    root = Location('')
+    root.__acl__ = [(Allow, 'user', 'get')]
+    context = Location('context', root)
+    result = helper.permits(context, {'user'}, 'get', request=request)
+    assert result
+    assert helper.permits(context, {'user'}, 'get', request=request) is result
+    assert not helper.permits(context, {'user'}, 'post', request=request)
+    assert not helper.permits(context, {'admin'}, 'get', request=request)
+
+    # Decisions are memoized for every context separately, even if contexts
+    # have the same names and parents with the same names.
+    assert helper.permits(Location(None, root), {'user'}, 'get', request=request)
+    for other_context in [
+        Location('context', Location('')),
+        Location(None, root),
+        Location(None),
+    ]:
+        other_context.__acl__ = [(Deny, 'user', 'get')]
+        assert not helper.permits(other_context, {'user'}, 'get', request=request)
+    assert helper.permits(context, {'user'}, 'get', request=request) is result
+
+    root.__acl__ = []
+    assert helper.permits(context, {'user'}, 'get', request=request) is result
+    clear_acl_decisions(request)
+    assert not helper.permits(context, {'user'}, 'get', request=request)
+    # Unhashable principals are not memoized
+    assert not helper.permits(context, [['user']], 'get', request=request)
+
+
+def test_mutated_permissions_of_ace():
+    helper = RestAclHelper()
+    context = Location('context')
+    permissions = ['get']
+    context.__acl__ = [(Allow, 'user', permissions)]
+    assert helper.permits(context, ['user'], 'get')
+    assert not helper.permits(context, ['user'], 'post')
+    permissions.append('post')
+    assert helper.permits(context, ['user'], 'post')
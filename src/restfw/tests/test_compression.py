@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import json
+import zlib
+
+import pytest
+from pyramid import testing
+from pyramid.renderers import RendererHelper
+from webob import Request
+
+from .. import views
+from ..renderers import (
+    COMPRESSORS,
+    Compression,
+    build_json_renderer,
+    decompress_body,
+    strip_etag_encoding,
+)
+from ..utils import ETag, open_pyramid_request
+from .test_views import (
+    DummyContainer,
+    DummyHalResource,
+    DummyHalResourceView,
+    StreamingDummyContainer,
+)
+
+
+class EtagHalResource(DummyHalResource):
+    def get_etag(self):
+        return ETag(f'etag-{self.title}')
+
+
+@views.resource_view_config()
+class EtagHalResourceView(DummyHalResourceView):
+    resource: EtagHalResource
+    fast_head = True
+
+
+@pytest.fixture(name='pyramid_settings', scope='module')
+def pyramid_settings_fixture():
+    return {
+        'restfw.compression.encodings': 'gzip deflate',
+        'restfw.compression.min_size': '200',
+    }
+
+
+@pytest.fixture(autouse=True)
+def register(app_config):
+    app_config.scan('restfw.tests.test_views')
+    app_config.scan('restfw.tests.test_compression')
+    app_config.commit()
+
+
+def test_compression_negotiation():
+    compression = Compression(encodings=['zstd', 'gzip', 'deflate', 'unknown'])
+    assert compression.encodings == tuple(
+        e for e in ('zstd', 'gzip', 'deflate') if e in COMPRESSORS
+    )
+    with testing.testConfig() as config:
+        with open_pyramid_request(config.registry) as request:
+            assert compression.negotiate(request) is None
+            request.headers['Accept-Encoding'] = 'deflate, gzip;q=0.5'
+            assert compression.negotiate(request) == 'deflate'
+            request.headers['Accept-Encoding'] = 'br, identity'
+            assert compression.negotiate(request) is None
+            request.headers['Accept-Encoding'] = '*'
+            assert compression.negotiate(request) == compression.encodings[0]
+
+    assert not Compression()
+    body = b'{"key": "value"}' * 100
+    for encoding in compression.encodings:
+        compressed = compression.compress(body, encoding)
+        assert len(compressed) < len(body)
+        assert decompress_body(compressed, encoding) == body
+        chunks = compression.iter_compressed(iter([body[:500], body[500:]]), encoding)
+        assert decompress_body(b''.join(chunks), encoding) == body
+
+
+def test_renderer_compression():
+    renderer = build_json_renderer(
+        compression=Compression(encodings=['gzip'], min_size=100)
+    )
+    with testing.testConfig() as config:
+        config.add_renderer(None, renderer)
+        config.commit()
+        helper = RendererHelper(registry=config.registry)
+
+        with open_pyramid_request(config.registry) as request:
+            request.headers['Accept-Encoding'] = 'gzip'
+            # Small bodies are not compressed
+            assert helper.render({'a': 1}, None, request=request) == '{"a": 1}'
+            assert request.response.content_encoding is None
+            assert request.response.vary == ('Accept-Encoding',)
+
+        data = {'key': 'value' * 100}
+        with open_pyramid_request(config.registry) as request:
+            request.response.etag = 'etag'
+            res = helper.render(data, None, request=request)
+            assert res == json.dumps(data)
+            assert request.response.content_encoding is None
+            assert request.response.vary == ('Accept-Encoding',)
+            assert request.response.headers['ETag'] == '"etag"'
+
+        with open_pyramid_request(config.registry) as request:
+            request.headers['Accept-Encoding'] = 'gzip'
+            request.response.etag = 'etag'
+            res = helper.render(data, None, request=request)
+            assert json.loads(zlib.decompress(res, 16 + zlib.MAX_WBITS)) == data
+            response = request.response
+            assert response.content_encoding == 'gzip'
+            assert response.vary == ('Accept-Encoding',)
+            assert response.headers['ETag'] == '"etag-gzip"'
+
+
+def get_raw_response(web_app, url, encoding=None):
+    # WebTest decodes compressed responses, so the application is called
+    # directly.
+    headers = {'Accept-Encoding': encoding} if encoding else {}
+    return Request.blank(url, headers=headers).get_response(web_app.test_app.app)
+
+
+def test_compressed_responses(web_app, pyramid_request):
+    root = pyramid_request.root
+    root['container'] = container = DummyContainer()
+    root['streaming'] = streaming = StreamingDummyContainer()
+    for i in range(10):
+        container[f'res-{i}'] = DummyHalResource(f'Title {i}', 'Description')
+        streaming[f'res-{i}'] = container[f'res-{i}']
+
+    url = pyramid_request.resource_url(container)
+    res = get_raw_response(web_app, url)
+    assert 'Content-Encoding' not in res.headers
+    assert res.headers['Vary'] == 'Accept-Encoding'
+    expected = res.body
+
+    res = get_raw_response(web_app, url, 'gzip')
+    assert res.headers['Content-Encoding'] == 'gzip'
+    assert res.headers['Vary'] == 'Accept-Encoding'
+    assert len(res.body) < len(expected)
+    assert decompress_body(res.body, 'gzip') == expected
+    # Output schema is checked against decoded body
+    assert web_app.get(url, headers={'Accept-Encoding': 'gzip'}).body == expected
+
+    # Streamed responses are compressed too
+    streaming_url = pyramid_request.resource_url(streaming)
+    res = get_raw_response(web_app, streaming_url, 'deflate')
+    assert res.headers['Content-Encoding'] == 'deflate'
+    body = decompress_body(res.body, 'deflate')
+    assert body == expected.replace(b'/container/', b'/streaming/')
+
+    # Small responses are not compressed
+    url = pyramid_request.resource_url(container['res-1'])
+    res = get_raw_response(web_app, url, 'gzip')
+    assert 'Content-Encoding' not in res.headers
+    assert json.loads(res.body)['title'] == 'Title 1'
+
+
+def test_etag_of_compressed_response(web_app, pyramid_request):
+    assert strip_etag_encoding('etag-gzip') == 'etag'
+    assert strip_etag_encoding('etag-other') == 'etag-other'
+
+    root = pyramid_request.root
+    root['container'] = container = DummyContainer()
+    container['res'] = EtagHalResource('Title', 'Description ' * 30)
+    url = pyramid_request.resource_url(container['res'])
+    res = get_raw_response(web_app, url, 'gzip')
+    assert res.headers['Content-Encoding'] == 'gzip'
+    # ETag of resource is strong and depends on content-coding
+    etag = res.headers['ETag']
+    assert etag == '"etag-Title-gzip"'
+    assert get_raw_response(web_app, url).headers['ETag'] == '"etag-Title"'
+
+    # Fast HEAD response has the same headers
+    res = web_app.head(url, headers={'Accept-Encoding': 'gzip'})
+    assert res.headers['ETag'] == etag
+    assert res.headers['Vary'] == 'Accept-Encoding'
+
+    web_app.get(url, headers={'If-None-Match': etag}, status=304)
+    res = web_app.put_json(
+        url,
+        params={'title': 'New', 'description': 'Description'},
+        headers={'If-Match': etag},
+    )
+    assert res.json['title'] == 'New'
+    web_app.put_json(
+        url,
+        params={'title': 'Other', 'description': ''},
+        headers={'If-Match': etag},
+        status=412,
+    )
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import pytest
+
+from .. import schemas
+from ..hal import HalResource
+from ..utils import (
+    find_resource_by_path,
+    find_resource_by_type,
+    get_resource_identity_map,
+    open_pyramid_request,
+)
+from .test_views import DummyContainer, DummyHalResource
+
+
+class SubResource(HalResource):
+    created = 0
+
+    def __init__(self, parent):
+        SubResource.created += 1
+
+
+class ResourceSchema(schemas.MappingNode):
+    resource = schemas.ResourceNode()
+
+
+@pytest.fixture(name='pyramid_settings', scope='module')
+def pyramid_settings_fixture():
+    return {'restfw.resource_identity_map': 'true'}
+
+
+@pytest.fixture(autouse=True)
+def register(app_config):
+    app_config.scan('restfw.tests.test_views')
+    app_config.add_sub_resource_fabric(SubResource, 'sub', DummyHalResource)
+    app_config.commit()
+
+
+def test_resource_identity_map(web_app, pyramid_request):
+    root = pyramid_request.root
+    root['container'] = DummyContainer()
+    root['container']['resource'] = DummyHalResource('Title', 'Description')
+    SubResource.created = 0
+
+    with open_pyramid_request(web_app.registry) as request:
+        identity_map = get_resource_identity_map(request)
+        assert identity_map is not None
+        resource = request.root['container']['resource']
+        sub = resource['sub']
+        assert resource['sub'] is sub
+        assert SubResource.created == 1
+        assert find_resource_by_path(root, '/container/resource/sub/') is sub
+        assert (
+            find_resource_by_type(root, '/container/resource/sub', SubResource) is sub
+        )
+
+        schema = ResourceSchema().bind(request=request)
+        appstruct = schema.deserialize(
+            {'resource': request.resource_url(sub)},
+        )
+        assert appstruct['resource'] is sub
+        assert SubResource.created == 1
+
+        identity_map.clear()
+        assert len(identity_map) == 0
+        assert resource['sub'] is not sub
+        assert SubResource.created == 2
+
+    # Every request has own identity map
+    with open_pyramid_request(web_app.registry) as request:
+        assert len(get_resource_identity_map(request)) == 0
+        assert request.root['container']['resource']['sub'] is not sub
+        assert SubResource.created == 3
+
+
+def test_identity_map_is_optional(pyramid_request, monkeypatch):
+    monkeypatch.setattr(
+        pyramid_request.registry, '_restfw_identity_map_enabled', False, raising=False
+    )
+    assert get_resource_identity_map(pyramid_request) is None
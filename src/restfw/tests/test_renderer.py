@@ -4,11 +4,26 @@
 :Date: 28.08.2020
 """
 
+import datetime
+import json
+from decimal import Decimal
+from enum import Enum, IntEnum
+
 import pytest
 from pyramid import testing
-from pyramid.renderers import RendererHelper
+from pyramid.renderers import JSON, RendererHelper
+from zope.interface import Interface, alsoProvides
 
-from ..renderers import add_adapter_into_json_renderer
+from .. import renderers
+from ..renderers import (
+    add_adapter_into_json_renderer,
+    build_json_renderer,
+    date_adapter,
+    datetime_adapter,
+    decimal_adapter,
+    enum_adapter,
+    time_adapter,
+)
 from ..utils import open_pyramid_request
 
 
@@ -55,3 +70,177 @@ def test_add_adapter():
             data = SomeClass(10)
             res = renderer.render(data, system_values=None, request=request)
             assert res == '10'
+
+
+class IMarker(Interface):
+    pass
+
+
+class Color(Enum):
+    red = 1
+
+
+def marker_adapter(value, request):
+    return 'marker'
+
+
+def _get_payload():
+    return [
+        {
+            'created': datetime.datetime(2020, 1, 2, 3, 4, 5, 678),
+            'date': datetime.date(2020, 1, 2),
+            'time': datetime.time(3, 4, 5),
+            'cost': Decimal('10.25'),
+            'color': Color.red,
+            'title': 'Значение',
+            'values': (1, 2.5, None, True),
+        }
+        for _ in range(3)
+    ]
+
+
+def test_json_renderer_output_is_equal_to_pyramid_renderer():
+    renderer = build_json_renderer(ensure_ascii=False)
+    pyramid_renderer = JSON(
+        adapters=[
+            (datetime.datetime, datetime_adapter),
+            (datetime.date, date_adapter),
+            (datetime.time, time_adapter),
+            (Decimal, decimal_adapter),
+            (Enum, enum_adapter),
+        ],
+        ensure_ascii=False,
+    )
+    payload = _get_payload()
+    system = {'request': None}
+    res = renderer(None)(payload, system)
+    assert res == pyramid_renderer(None)(payload, system)
+    assert json.loads(res)[0]['color'] == 'red'
+
+
+def test_to_json_data():
+    renderer = build_json_renderer(ensure_ascii=False)
+    payload = {'items': _get_payload(), 1: 'one', None: Decimal('1.5')}
+    data = renderer.to_json_data(payload, None)
+    assert data['items'][0]['color'] == 'red'
+    assert data['items'][0]['values'] == [1, 2.5, None, True]
+    assert data['1'] == 'one'
+    assert data['null'] == '1.5'
+    system = {'request': None}
+    assert renderer(None)(data, system) == renderer(None)(payload, system)
+
+    with pytest.raises(TypeError):
+        renderer.to_json_data({(1, 2): 'tuple'}, None)
+
+
+def test_adapters_cache():
+    renderer = build_json_renderer()
+    obj = SomeClass(10)
+    assert renderer.get_adapter(obj) is None
+    renderer.add_adapter(SomeClass, some_adapter)
+    assert renderer.get_adapter(obj) is some_adapter
+    assert renderer(None)(obj, {}) == '10'
+
+    # Interfaces provided directly by instance are taken into account
+    other = SomeClass(20)
+    renderer.add_adapter(IMarker, marker_adapter)
+    alsoProvides(other, IMarker)
+    assert renderer.get_adapter(other) is marker_adapter
+    assert renderer.get_adapter(obj) is some_adapter
+
+
+def test_json_backends(monkeypatch):
+    renderer = build_json_renderer(backend='unknown', ensure_ascii=False)
+    assert renderer.backend == 'stdlib'
+
+    monkeypatch.setitem(renderers.JSON_BACKENDS, 'orjson', lambda **kw: None)
+    renderer = build_json_renderer(backend='orjson', ensure_ascii=False)
+    assert renderer.backend == 'stdlib'
+
+
+class Size(IntEnum):
+    small = 1
+
+
+class Title(str):
+    pass
+
+
+class WithJson:
+    def __json__(self, request):
+        return {'json': Decimal('1.5')}
+
+
+def _get_orjson_adapters():
+    return [
+        (datetime.datetime, datetime_adapter),
+        (datetime.date, date_adapter),
+        (datetime.time, time_adapter),
+        (Decimal, decimal_adapter),
+        (SomeClass, some_adapter),
+    ]
+
+
+@pytest.mark.parametrize('options', [{}, {'sort_keys': True}, {'indent': 2}])
+def test_orjson_backend_output_is_equal_to_stdlib(options):
+    pytest.importorskip('orjson')
+    renderer = renderers.JSON(
+        adapters=_get_orjson_adapters(),
+        backend='orjson',
+        ensure_ascii=False,
+        **options,
+    )
+    assert renderer.backend == 'orjson'
+    stdlib_renderer = renderers.JSON(
+        adapters=_get_orjson_adapters(),
+        ensure_ascii=False,
+        separators=renderer.separators,
+        **options,
+    )
+    assert stdlib_renderer.backend == 'stdlib'
+    payload = _get_payload()
+    for item in payload:
+        del item['color']
+        item.update(
+            size=Size.small,
+            title=Title('Значение'),
+            some=SomeClass(Decimal('2')),
+            json=WithJson(),
+            numbers={2: 'two', 1: 'one'},
+        )
+    system = {'request': None}
+    res = renderer(None)(payload, system)
+    assert res == stdlib_renderer(None)(payload, system)
+
+
+def test_orjson_backend_with_native_types_adapters():
+    pytest.importorskip('orjson')
+    # orjson serializes enums natively by its value,
+    # so the adapter of enums would be never called.
+    renderer = build_json_renderer(backend='orjson', ensure_ascii=False)
+    assert renderer.backend == 'stdlib'
+    payload = _get_payload()
+    assert json.loads(renderer(None)(payload, {}))[0]['color'] == 'red'
+
+    renderer = renderers.JSON(
+        adapters=_get_orjson_adapters(), backend='orjson', ensure_ascii=False
+    )
+    assert renderer.backend == 'orjson'
+    renderer.add_adapter(Color, enum_adapter)
+    assert renderer.backend == 'stdlib'
+    assert json.loads(renderer(None)(payload, {}))[0]['color'] == 'red'
+
+
+@pytest.mark.parametrize(
+    'options',
+    [
+        {},
+        {'ensure_ascii': True},
+        {'ensure_ascii': False, 'indent': 4},
+        {'ensure_ascii': False, 'separators': (', ', ': ')},
+        {'ensure_ascii': False, 'allow_nan': False},
+    ],
+)
+def test_orjson_backend_unsupported_options(options):
+    with pytest.raises(ValueError):
+        renderers.JSON(backend='orjson', **options)
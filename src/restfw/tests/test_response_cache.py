@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import base64
+
+import pytest
+from pyramid.config import Configurator
+from webtest import TestApp
+
+from .. import interfaces, response_cache, views
+from ..response_cache import (
+    CachedResponse,
+    InMemoryResponseCache,
+    get_response_cache_backend,
+)
+from ..testing.fixtures import simple_app
+from ..typing import Json
+from ..utils import is_testing, open_pyramid_request
+from .test_views import (
+    DummyContainer,
+    DummyHalResource,
+    DummyHalResourceSchema,
+    PutDummyHalResourceSchema,
+)
+
+
+class CachedHalResource(DummyHalResource):
+    render_calls = 0
+
+
+@views.resource_view_config()
+class CachedHalResourceView(views.HalResourceView):
+    resource: CachedHalResource
+    options_for_get = interfaces.MethodOptions(
+        None, DummyHalResourceSchema, cacheable=True
+    )
+    options_for_put = interfaces.MethodOptions(PutDummyHalResourceSchema)
+    fast_head = True
+
+    def as_dict(self) -> Json:
+        CachedHalResource.render_calls += 1
+        return {
+            'title': self.resource.title,
+            'description': self.resource.description,
+        }
+
+
+class CachedContainer(DummyContainer):
+    pass
+
+
+@views.resource_view_config()
+class CachedContainerView(views.HalResourceWithEmbeddedView):
+    resource: CachedContainer
+    options_for_get = views.HalResourceWithEmbeddedView.options_for_get.replace(
+        cacheable=True
+    )
+
+    def get_embedded(self, params: dict):
+        return views.list_to_embedded_resources(
+            self.request,
+            params,
+            resources=list(self.resource.values()),
+            parent=self.resource,
+            embedded_name='items',
+        )
+
+
+class StreamingCachedContainer(CachedContainer):
+    pass
+
+
+@views.resource_view_config()
+class StreamingCachedContainerView(CachedContainerView):
+    resource: StreamingCachedContainer
+    stream_embedded = True
+
+
+@pytest.fixture(autouse=True)
+def register(app_config):
+    app_config.scan('restfw.tests.test_views')
+    app_config.scan('restfw.tests.test_response_cache')
+    app_config.commit()
+
+
+def basic_auth(user_name):
+    credentials = base64.b64encode(f'{user_name}:pass'.encode()).decode()
+    return {'Authorization': f'Basic {credentials}'}
+
+
+def test_response_cache(web_app, pyramid_request):
+    container = CachedContainer()
+    pyramid_request.root['container'] = container
+    container['resource'] = CachedHalResource('Title', 'Description')
+    url = pyramid_request.resource_url(container['resource'])
+    container_url = pyramid_request.resource_url(container)
+    CachedHalResource.render_calls = 0
+
+    res1 = web_app.get(url)
+    res2 = web_app.get(url)
+    assert res2.json == res1.json
+    assert res2.headers['Content-Type'] == res1.headers['Content-Type']
+    assert CachedHalResource.render_calls == 1
+    # HEAD request gets headers of the cached response
+    res = web_app.head(url)
+    assert res.headers['Content-Length'] == res1.headers['Content-Length']
+    assert CachedHalResource.render_calls == 1
+
+    # Query parameters and user are parts of a key
+    web_app.get(url, params={'a': '1'})
+    assert CachedHalResource.render_calls == 2
+    web_app.get(url, headers=basic_auth('user'))
+    web_app.get(url, headers=basic_auth('user'))
+    assert CachedHalResource.render_calls == 3
+
+    web_app.get(container_url)
+    web_app.get(container_url)
+    assert CachedHalResource.render_calls == 4
+
+    # Modification of a resource invalidates responses of the resource
+    # and its ancestors.
+    web_app.put_json(url, params={'title': 'New title', 'description': ''})
+    render_calls = CachedHalResource.render_calls
+    res = web_app.get(url)
+    assert res.json['title'] == 'New title'
+    res = web_app.get(container_url)
+    assert res.json['_embedded']['items'][0]['title'] == 'New title'
+    assert CachedHalResource.render_calls == render_calls + 2
+
+
+def test_response_cache_backend(pyramid_request):
+    backend = get_response_cache_backend(pyramid_request.registry)
+    assert isinstance(backend, InMemoryResponseCache)
+
+    backend = InMemoryResponseCache(max_entries=2, max_bytes=10)
+    backend.set(('a',), '/a/', CachedResponse('200 OK', [], b'1234'))
+    backend.set(('b',), '/a/b/', CachedResponse('200 OK', [], b'1234'))
+    assert backend.get(('a',)) is not None
+    # The least recently used entry is removed
+    backend.set(('c',), '/c/', CachedResponse('200 OK', [], b'12'))
+    assert backend.get(('b',)) is None
+    assert len(backend) == 2
+    # Size of bodies is bounded
+    backend.set(('d',), '/d/', CachedResponse('200 OK', [], b'123456'))
+    assert backend.get(('a',)) is None
+    assert backend.get(('c',)) is not None
+    assert backend.get(('d',)) is not None
+    backend.set(('e',), '/e/', CachedResponse('200 OK', [], b'12345678901'))
+    assert backend.get(('e',)) is None
+
+    backend.set(('a',), '/a/', CachedResponse('200 OK', [], b'1'))
+    backend.set(('b',), '/a/b/', CachedResponse('200 OK', [], b'1'))
+    backend.invalidate('/a/', descendants=True)
+    assert len(backend) == 0
+
+
+def test_response_cache_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, 'monotonic', lambda: now[0])
+    backend = InMemoryResponseCache(ttl=10)
+    backend.set(('a',), '/a/', CachedResponse('200 OK', [], b'1'))
+    now[0] += 9
+    assert backend.get(('a',)) is not None
+    now[0] += 1
+    assert backend.get(('a',)) is None
+    assert len(backend) == 0
+
+    backend = InMemoryResponseCache(ttl=None)
+    backend.set(('a',), '/a/', CachedResponse('200 OK', [], b'1'))
+    now[0] += 1e6
+    assert backend.get(('a',)) is not None
+
+
+def test_streamed_response_is_not_cached():
+    # Results are not validated (and bodies are not read) in production mode
+    wsgi_app = simple_app({'apps': 'restfw'})
+    registry = wsgi_app.registry
+    assert not is_testing(registry)
+    config = Configurator(registry=registry)
+    config.scan('restfw.tests.test_views')
+    config.scan('restfw.tests.test_response_cache')
+    config.commit()
+    with open_pyramid_request(registry) as request:
+        request.root['streaming'] = container = StreamingCachedContainer()
+        container['resource'] = CachedHalResource('Title', 'Description')
+        request.root['container'] = container = CachedContainer()
+        container['resource'] = CachedHalResource('Title', 'Description')
+    app = TestApp(wsgi_app)
+    backend = get_response_cache_backend(registry)
+
+    res = app.get('/streaming/')
+    assert res.json['_embedded']['items'][0]['title'] == 'Title'
+    assert len(backend) == 0
+    app.get('/container/')
+    assert len(backend) == 1
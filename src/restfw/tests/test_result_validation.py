@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import logging
+from unittest.mock import Mock
+
+from pyramid.config import Configurator
+from pyramid.threadlocal import get_current_request
+from webtest import TestApp
+
+from .. import result_validation
+from ..result_validation import (
+    ResultValidationSampler,
+    get_result_validation_sampler,
+    validate_result,
+)
+from ..testing.fixtures import simple_app
+from ..utils import is_testing, open_pyramid_request
+from .test_views import DummyContainer, DummyHalResource, DummyHalResourceView
+
+
+class WrongResource(DummyHalResource):
+    pass
+
+
+class WrongResourceView(DummyHalResourceView):
+    resource: WrongResource
+
+    def as_dict(self):
+        result = super().as_dict()
+        result['extra'] = 1
+        return result
+
+
+def make_app(**settings) -> TestApp:
+    settings = {
+        'restfw.result_validation.sample_rate': '1',
+        'restfw.result_validation.budget': '2',
+        **settings,
+    }
+    wsgi_app = simple_app({'apps': 'restfw'}, **settings)
+    registry = wsgi_app.registry
+    assert not is_testing(registry)
+    config = Configurator(registry=registry)
+    config.scan('restfw.tests.test_views')
+    config.add_resource_view(WrongResourceView, WrongResource)
+    config.commit()
+
+    with open_pyramid_request(registry) as request:
+        request.root['container'] = container = DummyContainer()
+        container['good'] = DummyHalResource('Title', 'Description')
+        container['wrong'] = WrongResource('Title', 'Description')
+    return TestApp(wsgi_app)
+
+
+def test_sampler():
+    sampler = ResultValidationSampler(sample_rate=1, budget=2)
+    assert [sampler.should_validate(WrongResourceView) for _ in range(3)] == [
+        True,
+        True,
+        False,
+    ]
+    # Budget is separate for every view class
+    assert sampler.should_validate(DummyHalResourceView)
+
+    sampler = ResultValidationSampler(sample_rate=1, budget=1, interval=0)
+    assert [sampler.should_validate(WrongResourceView) for _ in range(3)] == [
+        True,
+        True,
+        True,
+    ]
+
+    sampler = ResultValidationSampler(sample_rate=0, budget=100)
+    assert not any(sampler.should_validate(WrongResourceView) for _ in range(100))
+
+
+def test_production_validation(caplog):
+    app = make_app()
+    registry = app.app.registry
+
+    with caplog.at_level(logging.WARNING, logger='restfw.result_validation'):
+        for _ in range(3):
+            # Errors are not raised in production mode
+            res = app.get('/container/wrong/')
+            assert res.json['extra'] == 1
+            app.get('/container/good/')
+        app.head('/container/wrong/')
+
+    assert get_result_validation_sampler(registry).get_stats() == {
+        'restfw.tests.test_result_validation.WrongResourceView': {
+            'checked': 2,
+            'failed': 2,
+            'errors': 0,
+        },
+        'restfw.tests.test_views.DummyHalResourceView': {
+            'checked': 2,
+            'failed': 0,
+            'errors': 0,
+        },
+    }
+    messages = [r.getMessage() for r in caplog.records]
+    assert len(messages) == 2
+    assert messages[0].startswith(
+        'Result of restfw.tests.test_result_validation.WrongResourceView '
+        'for GET /container/wrong/ does not match the output schema: '
+    )
+    assert "'extra': 'Field from result is absent in the schema'" in messages[0]
+
+
+def test_production_validation_of_embedded(monkeypatch):
+    app = make_app()
+    registry = app.app.registry
+    bodies = []
+
+    def validate(schema, data):
+        bodies.append(get_current_request().response.body)
+        return validate_result(schema, data)
+
+    validate_mock = Mock(side_effect=validate)
+    monkeypatch.setattr(result_validation, 'validate_result', validate_mock)
+
+    res = app.get('/container/', params={'total_count': True})
+    names = [item['title'] for item in res.json['_embedded']['items']]
+    assert names == ['Title', 'Title']
+    assert res.headers['X-Total-Count'] == '2'
+    # The result is validated before rendering
+    assert bodies == [b'']
+    assert validate_mock.call_args.args[1] == res.json
+    assert get_result_validation_sampler(registry).get_stats() == {
+        'restfw.tests.test_views.DummyContainerView': {
+            'checked': 1,
+            'failed': 0,
+            'errors': 0,
+        },
+    }
+
+
+def test_disabled_in_production():
+    app = make_app(**{'restfw.result_validation.sample_rate': '0'})
+    app.get('/container/wrong/')
+    assert get_result_validation_sampler(app.app.registry).get_stats() == {}
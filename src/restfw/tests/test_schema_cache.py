@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import threading
+
+import colander
+import pytest
+
+from .. import schemas
+from ..schema_cache import get_compiled_schema
+
+
+def validate_max_count(node, value):
+    max_count = node.bindings.get('max_count') if node.bindings else None
+    if max_count is not None and value > max_count:
+        raise colander.Invalid(node, f'Must be less than or equal to {max_count}')
+
+
+class ItemSchema(schemas.MappingNode):
+    name = schemas.StringNode(title='Name')
+    count = schemas.IntegerNode(validator=validate_max_count, missing=0)
+
+
+class StaticSchema(schemas.MappingNode):
+    title = schemas.StringNode(title='Title', validator=colander.Length(max=10))
+    items = schemas.SequenceNode(ItemSchema(), missing=colander.drop)
+
+
+@colander.deferred
+def deferred_choices(node, kw):
+    return colander.OneOf(kw['choices'])
+
+
+class DynamicSchema(schemas.MappingNode):
+    static = StaticSchema()
+    kind = schemas.StringNode(validator=deferred_choices)
+
+    def after_bind(self, node, kw):
+        node.add(schemas.BooleanNode(name='extra', missing=False))
+
+
+def deserialize(schema_class, cstruct, **kw):
+    """Reference implementation."""
+    return schema_class().bind(**kw).deserialize(cstruct)
+
+
+def errors_of(func, *args, **kwargs):
+    with pytest.raises(colander.Invalid) as info:
+        func(*args, **kwargs)
+    return info.value.asdict()
+
+
+def test_static_schema():
+    compiled = get_compiled_schema(StaticSchema)
+    assert compiled.is_static
+    assert get_compiled_schema(StaticSchema) is compiled
+    assert get_compiled_schema(schemas.GetEmbeddedSchema).is_static
+
+    cstruct = {'title': ' Title ', 'items': [{'name': 'a', 'count': '2'}]}
+    kw = {'max_count': 5}
+    assert compiled.deserialize(cstruct, **kw) == deserialize(
+        StaticSchema, cstruct, **kw
+    )
+
+    # Validators get bindings of the current call
+    cstruct['items'].append({'name': 'b', 'count': '10'})
+    errors = errors_of(compiled.deserialize, cstruct, **kw)
+    assert errors == errors_of(deserialize, StaticSchema, cstruct, **kw)
+    assert errors == {'items.1.count': 'Must be less than or equal to 5'}
+    assert compiled.deserialize(cstruct, max_count=None)['items'][1]['count'] == 10
+    assert len(compiled.deserialize(cstruct)['items']) == 2
+
+    bound = compiled.bind(max_count=1)
+    assert bound is not compiled.bind(max_count=1)
+    assert bound['items'].children[0]['count'].bindings == {'max_count': 1}
+    assert errors_of(bound.deserialize, cstruct) == {
+        'items.0.count': 'Must be less than or equal to 1',
+        'items.1.count': 'Must be less than or equal to 1',
+    }
+
+
+def test_static_schema_in_threads():
+    compiled = get_compiled_schema(StaticSchema)
+    barrier = threading.Barrier(4)
+    results = {}
+
+    def worker(max_count):
+        barrier.wait()
+        errors = []
+        for _ in range(100):
+            try:
+                compiled.deserialize(
+                    {'title': 'T', 'items': [{'name': 'a', 'count': '2'}]},
+                    max_count=max_count,
+                )
+            except colander.Invalid as e:
+                errors.append(e.asdict())
+        results[max_count] = len(errors)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {0: 100, 1: 100, 2: 0, 3: 0}
+
+
+def test_dynamic_schema():
+    compiled = get_compiled_schema(DynamicSchema)
+    assert not compiled.is_static
+
+    kw = {'choices': ['a', 'b'], 'max_count': 3}
+    bound = compiled.bind(**kw)
+    reference = DynamicSchema().bind(**kw)
+    assert [c.name for c in bound.children] == [c.name for c in reference.children]
+    assert compiled.instance.get('extra') is None
+
+    cstruct = {'static': {'title': 'T', 'items': [{'name': 'n'}]}, 'kind': 'a'}
+    assert compiled.deserialize(cstruct, **kw) == deserialize(
+        DynamicSchema, cstruct, **kw
+    )
+    cstruct['kind'] = 'c'
+    cstruct['static']['items'][0]['count'] = 4
+    errors = errors_of(compiled.deserialize, cstruct, **kw)
+    assert errors == errors_of(deserialize, DynamicSchema, cstruct, **kw)
+    assert set(errors) == {'kind', 'static.items.0.count'}
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import random
+
+import colander
+import pytest
+from webob.multidict import MultiDict
+
+from .. import schemas
+from ..errors import ValidationError
+from ..schema_compiler import get_schema_validator
+from ..utils import get_input_data
+
+
+def validate_max_count(node, value):
+    max_count = node.bindings.get('max_count') if node.bindings else None
+    if max_count is not None and value > max_count:
+        raise colander.Invalid(node, f'Must be less than or equal to {max_count}')
+
+
+class TagSchema(schemas.MappingNode):
+    name = schemas.StringNode(validator=colander.Length(min=2, max=5))
+    weight = schemas.FloatNode(missing=1.0, validator=colander.Range(0, 10))
+
+
+class ItemSchema(schemas.MappingNode):
+    title = schemas.StringNode(
+        validator=schemas.LazyAll(
+            colander.Length(max=10),
+            schemas.LaconicNoneOf(['forbidden']),
+        )
+    )
+    description = schemas.EmptyStringNode(missing='')
+    raw = schemas.StringNode(strip=False, missing=colander.drop)
+    count = schemas.IntegerNode(
+        nullable=True,
+        missing=colander.drop,
+        validator=colander.All(colander.Range(min=0), validate_max_count),
+    )
+    kind = schemas.StringNode(
+        missing='a',
+        validator=schemas.LaconicOneOf(['a', 'b', 'c']),
+    )
+    mode = schemas.StringNode(
+        missing=colander.drop,
+        validator=colander.OneOf(['x', 'y']),
+    )
+    enabled = schemas.BooleanNode(missing=False)
+    tags = schemas.SequenceNode(TagSchema(), missing=colander.drop)
+    ids = schemas.SequenceNode(
+        schemas.IntegerNode(), accept_scalar=True, missing=colander.drop
+    )
+    created = schemas.DateTimeNode(nullable=True, missing=None)
+    extra = schemas.PreserveMappingSchema(missing=colander.drop)
+
+
+class StrictSchema(schemas.MappingNode):
+    unknown = 'raise'
+    name = schemas.StringNode()
+    value = schemas.IntegerNode(missing=0)
+
+
+class ListSchema(schemas.SequenceNode):
+    item = ItemSchema()
+
+
+class ResourcesSchema(schemas.MappingNode):
+    resources = schemas.SequenceNode(schemas.ResourceNode(), missing=colander.drop)
+
+
+def deserialize(schema_class, cstruct, **kw):
+    """Result or errors of the colander's interpreter."""
+    try:
+        return schema_class().bind(**kw).deserialize(cstruct)
+    except colander.Invalid as e:
+        return ('error', e.asdict())
+
+
+def compiled_deserialize(schema_class, cstruct, **kw):
+    try:
+        return get_schema_validator(schema_class).deserialize(cstruct, **kw)
+    except colander.Invalid as e:
+        return ('error', e.asdict())
+
+
+VALID_ITEM = {
+    'title': ' Title ',
+    'description': ' Description ',
+    'raw': ' raw ',
+    'count': '5',
+    'kind': 'b',
+    'mode': 'y',
+    'enabled': 'true',
+    'tags': [{'name': 'tag', 'weight': '2.5'}, {'name': 'other'}],
+    'ids': ['1', 2, '3'],
+    'created': '2026-10-17T10:00:00+00:00',
+    'extra': {'a': [1, 2], 'b': {'c': None}},
+    'unknown': 'value',
+}
+
+CASES = [
+    VALID_ITEM,
+    {'title': 'T'},
+    {'title': 'T', 'count': '', 'ids': '7', 'created': '', 'enabled': 'false'},
+    {'title': 'T', 'count': None, 'kind': '', 'description': ''},
+    {'title': 'T', 'tags': [], 'ids': []},
+    MultiDict([('title', 'T'), ('ids', '1'), ('ids', '2'), ('kind', 'c')]),
+    # Invalid values
+    {},
+    {'title': ''},
+    {'title': '   '},
+    {'title': 'Too long title'},
+    {'title': 'forbidden'},
+    {'title': 10},
+    {'title': 'T', 'count': '-1'},
+    {'title': 'T', 'count': '100'},
+    {'title': 'T', 'count': 'abc'},
+    {'title': 'T', 'kind': 'd', 'mode': 'z'},
+    {'title': 'T', 'enabled': 'maybe'},
+    {'title': 'T', 'tags': [{'name': 'a'}, {'name': 'tag', 'weight': '11'}]},
+    {'title': 'T', 'tags': {'name': 'tag'}},
+    {'title': 'T', 'tags': 'tag'},
+    {'title': 'T', 'ids': ['1', 'x']},
+    {'title': 'T', 'created': 'yesterday'},
+    {'title': 'T', 'extra': 'value'},
+    'not a mapping',
+    None,
+    colander.null,
+]
+
+
+@pytest.mark.parametrize('cstruct', CASES)
+def test_differential(cstruct):
+    kw = {'max_count': 10}
+    expected = deserialize(ItemSchema, cstruct, **kw)
+    assert compiled_deserialize(ItemSchema, cstruct, **kw) == expected
+
+
+def test_compiled_source():
+    validator = get_schema_validator(ItemSchema)
+    assert validator.is_compiled
+    assert get_schema_validator(ItemSchema) is validator
+    source = validator.source
+    # Unsupported nodes are deserialized by colander
+    assert '.deserialize(' in source
+    assert validator.deserialize(VALID_ITEM, max_count=10)['tags'] == [
+        {'name': 'tag', 'weight': 2.5},
+        {'name': 'other', 'weight': 1.0},
+    ]
+
+
+def test_other_schemas():
+    for schema_class, cstruct in [
+        (StrictSchema, {'name': 'N', 'value': '1'}),
+        (StrictSchema, {'name': 'N', 'other': '1'}),
+        (StrictSchema, {'value': 'x', 'other': '1'}),
+        (ListSchema, [{'title': 'A'}, {'title': 'B', 'count': '3'}]),
+        (ListSchema, [{'title': 'A'}, {'title': ''}]),
+        (schemas.GetEmbeddedSchema, MultiDict({'offset': '10', 'limit': '0'})),
+        (schemas.GetEmbeddedSchema, MultiDict({'offset': '-1'})),
+        (schemas.GetNextPageSchema, MultiDict({'cursor_next': 'abc'})),
+    ]:
+        assert get_schema_validator(schema_class).is_compiled
+        assert compiled_deserialize(schema_class, cstruct) == deserialize(
+            schema_class, cstruct
+        )
+
+
+class CallsSchema(schemas.MappingNode):
+    name = schemas.StringNode(
+        preparer=lambda value: CallsSchema.calls.append('preparer') or value,
+        validator=lambda node, value: CallsSchema.calls.append('validator'),
+    )
+    value = schemas.IntegerNode(validator=colander.Range(min=0))
+
+    calls = []
+
+
+class BuggySchema(schemas.MappingNode):
+    value = schemas.IntegerNode(validator=lambda node, value: value / 0)
+
+
+class EmptySequenceSchema(schemas.MappingNode):
+    items = colander.SchemaNode(colander.Sequence(), missing=colander.drop)
+
+
+def test_user_code_is_called_once():
+    validator = get_schema_validator(CallsSchema)
+    assert validator.is_compiled
+    for cstruct in [
+        {'name': 'N', 'value': '-1'},
+        {'name': 'N', 'value': 'x'},
+        {'name': 'N'},
+        {'name': 'N', 'value': '1'},
+    ]:
+        CallsSchema.calls.clear()
+        expected = deserialize(CallsSchema, cstruct)
+        assert CallsSchema.calls == ['preparer', 'validator']
+        CallsSchema.calls.clear()
+        assert compiled_deserialize(CallsSchema, cstruct) == expected
+        assert CallsSchema.calls == ['preparer', 'validator']
+
+
+def test_errors_of_user_code_are_not_masked():
+    validator = get_schema_validator(BuggySchema)
+    assert validator.is_compiled
+    with pytest.raises(ZeroDivisionError):
+        validator.deserialize({'value': '1'})
+
+
+def test_sequence_without_children():
+    validator = get_schema_validator(EmptySequenceSchema)
+    assert validator.is_compiled
+    assert validator.deserialize({}) == {}
+    with pytest.raises(IndexError):
+        validator.deserialize({'items': [1]})
+
+
+def test_resource_nodes(pyramid_request):
+    validator = get_schema_validator(ResourcesSchema)
+    assert validator.is_compiled
+    kw = {'request': pyramid_request}
+    cstruct = {'resources': ['http://localhost/', '/unknown/']}
+    assert compiled_deserialize(ResourcesSchema, cstruct, **kw) == deserialize(
+        ResourcesSchema, cstruct, **kw
+    )
+    cstruct = {'resources': ['http://localhost/']}
+    result = validator.deserialize(cstruct, **kw)
+    assert result == {'resources': [pyramid_request.root]}
+
+
+VALUES = [
+    colander.null,
+    None,
+    '',
+    ' ',
+    'a',
+    'b',
+    'x',
+    ' text ',
+    'forbidden',
+    'true',
+    'false',
+    '0',
+    '5',
+    '-1',
+    '100',
+    '2.5',
+    0,
+    1,
+    2.5,
+    True,
+    [],
+    ['1', '2'],
+    [{'name': 'tag'}],
+    [{'name': 't'}],
+    {},
+    {'a': 1},
+    '2026-10-17T10:00:00',
+]
+
+
+def test_random_differential():
+    rnd = random.Random(42)
+    names = [node.name for node in ItemSchema().children] + ['unknown']
+    valid_count = 0
+    for _ in range(2000):
+        # Some fields of a valid item are replaced by random values
+        cstruct = dict(VALID_ITEM)
+        for name in rnd.sample(names, rnd.randint(0, 3)):
+            if rnd.random() < 0.3:
+                cstruct.pop(name, None)
+            else:
+                cstruct[name] = rnd.choice(VALUES)
+        expected = deserialize(ItemSchema, cstruct, max_count=10)
+        assert compiled_deserialize(ItemSchema, cstruct, max_count=10) == expected
+        if isinstance(expected, dict):
+            valid_count += 1
+    assert valid_count > 100
+
+
+def test_get_input_data(web_app, pyramid_request, monkeypatch):
+    monkeypatch.setattr(
+        pyramid_request.registry, '_restfw_schema_compiler_enabled', True, raising=False
+    )
+    pyramid_request.GET.update({'title': ' Title ', 'count': '3'})
+    assert get_input_data(None, pyramid_request, ItemSchema) == {
+        'title': 'Title',
+        'description': '',
+        'count': 3,
+        'kind': 'a',
+        'enabled': False,
+        'created': None,
+    }
+    pyramid_request.GET['count'] = '-3'
+    with pytest.raises(ValidationError) as info:
+        get_input_data(None, pyramid_request, ItemSchema)
+    assert info.value.detail == {'count': '-3 is less than minimum value 0'}
@@ -9,6 +9,7 @@ import datetime
 import colander
 import pendulum
 import pytest
+from pyramid.traversal import find_resource
 
 from ..hal import SimpleContainer
 from ..schemas import (
@@ -17,9 +18,11 @@ from ..schemas import (
     EmptyStringNode,
     IntegerNode,
     ResourceNode,
+    SequenceNode,
     StringNode,
     NullableValidator,
 )
+from ..utils import find_resources
 
 
 def test_serialize_empty_integer():
@@ -237,3 +240,69 @@ def test_resource_node_deserialize(pyramid_request):
     with pytest.raises(colander.Invalid) as e:
         resource_node.deserialize('http://localhost/container/not_found')
     assert e.value.msg == 'Resource has not found'
+
+
+class BulkContainer(SimpleContainer):
+    get_many_calls = []
+
+    def get_many(self, keys):
+        BulkContainer.get_many_calls.append(sorted(keys))
+        return {key: self._data[key] for key in keys if key in self._data}
+
+
+def test_find_resources(pyramid_request):
+    root = pyramid_request.root
+    users = root['users'] = SimpleContainer()
+    for name in ('bob', 'alice'):
+        user = users[name] = SimpleContainer()
+        files = user['files'] = BulkContainer()
+        for i in range(3):
+            files[f'file {i}'] = SimpleContainer()
+    BulkContainer.get_many_calls = []
+
+    paths = [
+        '/',
+        '/users/',
+        '/users/bob/files/file 0/',
+        '/users/bob/files/file%201',
+        '/users/bob/files/file 2',
+        '/users/bob/files/unknown/',
+        '/users/alice/files/file 1/',
+        '/users/alice/../bob/files/file 0',
+        '/users/unknown/files/file 0',
+        '/users/@@view',
+        '/users/bob/files/file 0/child',
+    ]
+    result = find_resources(root, paths)
+    for path in paths:
+        try:
+            expected = find_resource(root, path)
+        except KeyError:
+            expected = None
+        assert result[path] is expected, path
+    # Children of a container are got by one call of get_many()
+    assert sorted(BulkContainer.get_many_calls) == [
+        ['file 0', 'file 1', 'file 2', 'unknown'],
+        ['file 1'],
+    ]
+
+
+def test_resource_sequence_deserialize(pyramid_request):
+    node = SequenceNode(ResourceNode()).bind(request=pyramid_request)
+    root = pyramid_request.root
+    container = root['container'] = BulkContainer()
+    for i in range(3):
+        container[f'res-{i}'] = SimpleContainer()
+    BulkContainer.get_many_calls = []
+
+    urls = [f'http://localhost/container/res-{i}/' for i in range(3)]
+    assert node.deserialize(urls) == list(container.values())
+    assert BulkContainer.get_many_calls == [['res-0', 'res-1', 'res-2']]
+
+    # Errors are reported for every item
+    with pytest.raises(colander.Invalid) as e:
+        node.deserialize(urls + ['http://localhost/container/unknown/', '//bad_[url'])
+    assert e.value.asdict() == {
+        '3': 'Resource has not found',
+        '4': '//bad_[url is not a valid URL: Invalid IPv6 URL',
+    }
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import base64
+
+import pytest
+from zope.interface import implementer
+
+from .. import views
+from ..interfaces import ITotalCountProvider
+from ..total_count import (
+    CachedTotalCountProvider,
+    TotalCount,
+    get_total_count,
+    register_total_count_provider,
+)
+from .test_views import DummyContainer, DummyHalResource
+
+
+@implementer(ITotalCountProvider)
+class DummyCountProvider:
+    calls = 0
+    is_estimated = False
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def get_total_count(self, request):
+        DummyCountProvider.calls += 1
+        count = len(list(self.collection.values())) * 10
+        if self.is_estimated:
+            return TotalCount(count, is_estimated=True)
+        return count
+
+
+class CountedContainer(DummyContainer):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def register(app_config):
+    app_config.scan('restfw.tests.test_views')
+    app_config.commit()
+
+
+def test_get_total_count(app_config, pyramid_request):
+    container = CountedContainer()
+    container['a'] = DummyHalResource('A', '')
+    assert get_total_count(pyramid_request, container, 'items') is None
+
+    register_total_count_provider(app_config, DummyCountProvider, CountedContainer)
+    app_config.commit()
+    assert get_total_count(pyramid_request, container, 'items') == TotalCount(10)
+
+
+def test_listing_uses_count_provider(app_config, web_app, pyramid_request):
+    register_total_count_provider(
+        app_config, DummyCountProvider, CountedContainer, embedded_name='items'
+    )
+    app_config.commit()
+    container = CountedContainer()
+    pyramid_request.root['container'] = container
+    for i in range(3):
+        container[f'res-{i}'] = DummyHalResource(f'Title {i}', '')
+
+    for to_embedded in (
+        views.list_to_embedded_resources,
+        views.iter_to_embedded_resources,
+    ):
+        resources = list(container.values())
+        if to_embedded is views.iter_to_embedded_resources:
+            resources = iter(resources)
+        embedded = to_embedded(
+            pyramid_request,
+            {'offset': 0, 'limit': 2, 'total_count': True},
+            resources,
+            parent=container,
+            embedded_name='items',
+        )
+        assert embedded.total_count == TotalCount(30)
+
+    url = pyramid_request.resource_url(container)
+    res = web_app.get(url, params={'total_count': True})
+    assert res.headers['X-Total-Count'] == '30'
+    assert 'X-Total-Count-Estimated' not in res.headers
+
+    DummyCountProvider.is_estimated = True
+    try:
+        res = web_app.get(url, params={'total_count': True})
+    finally:
+        DummyCountProvider.is_estimated = False
+    assert res.headers['X-Total-Count'] == '30'
+    assert res.headers['X-Total-Count-Estimated'] == 'true'
+
+
+def test_cached_total_count_provider(app_config, pyramid_request):
+    provider = CachedTotalCountProvider(DummyCountProvider, ttl=60, max_size=1)
+    register_total_count_provider(app_config, provider, CountedContainer)
+    app_config.commit()
+    container = CountedContainer()
+    pyramid_request.root['container'] = container
+    container['a'] = DummyHalResource('A', '')
+    other = CountedContainer()
+    pyramid_request.root['other'] = other
+
+    DummyCountProvider.calls = 0
+    assert get_total_count(pyramid_request, container) == TotalCount(10)
+    container['b'] = DummyHalResource('B', '')
+    # Cached value is returned
+    assert get_total_count(pyramid_request, container) == TotalCount(10)
+    assert DummyCountProvider.calls == 1
+
+    # Only one value can be cached
+    assert get_total_count(pyramid_request, other) == TotalCount(0)
+    assert get_total_count(pyramid_request, container) == TotalCount(20)
+    assert DummyCountProvider.calls == 3
+
+    # Expired values are not used
+    provider.ttl = 0
+    provider.clear()
+    assert get_total_count(pyramid_request, container) == TotalCount(20)
+    assert get_total_count(pyramid_request, container) == TotalCount(20)
+    assert DummyCountProvider.calls == 5
+
+
+def test_cached_total_count_key(app_config, pyramid_request):
+    provider = CachedTotalCountProvider(DummyCountProvider, ttl=60)
+    register_total_count_provider(app_config, provider, CountedContainer)
+    app_config.commit()
+    container = CountedContainer()
+    pyramid_request.root['container'] = container
+    container['a'] = DummyHalResource('A', '')
+
+    DummyCountProvider.calls = 0
+    assert get_total_count(pyramid_request, container) == TotalCount(10)
+    # Parameters of paging don't change a key
+    pyramid_request.GET.update({'offset': '10', 'limit': '5', 'total_count': 'true'})
+    get_total_count(pyramid_request, container)
+    assert DummyCountProvider.calls == 1
+
+    # Filtered listings and listings of other users are counted separately
+    pyramid_request.GET['title'] = 'A'
+    get_total_count(pyramid_request, container)
+    assert DummyCountProvider.calls == 2
+    credentials = base64.b64encode(b'user:password').decode()
+    pyramid_request.headers['Authorization'] = f'Basic {credentials}'
+    get_total_count(pyramid_request, container)
+    assert DummyCountProvider.calls == 3
+    get_total_count(pyramid_request, container)
+    assert DummyCountProvider.calls == 3
+
+    # Custom key
+    provider.key = lambda request, collection: None
+    get_total_count(pyramid_request, container)
+    del pyramid_request.GET['title']
+    get_total_count(pyramid_request, container)
+    assert DummyCountProvider.calls == 4
@@ -8,7 +8,14 @@ import colander
 import pytest
 
 from .. import schemas
-from ..utils import create_validation_error, clone_request, open_pyramid_request
+from ..utils import (
+    Fields,
+    clone_request,
+    create_validation_error,
+    decode_cursor,
+    encode_cursor,
+    open_pyramid_request,
+)
 
 
 class ObjSchema(schemas.MappingNode):
@@ -92,3 +99,36 @@ def test_clone_request(pyramid_request):
             assert request2.path == request1.path
             request2.environ = request1.environ
             assert request2.headers == request1.headers
+
+
+def test_cursor_encoding(pyramid_request):
+    registry = pyramid_request.registry
+    for position in ['name', 10, ['2020-01-01', 123], {'key': None}]:
+        cursor = encode_cursor(registry, position)
+        assert '=' not in cursor
+        assert decode_cursor(registry, cursor) == position
+
+    cursor = encode_cursor(registry, ['name', 1])
+    for bad_cursor in ['', '*', cursor[:-1], 'A' + cursor]:
+        with pytest.raises(ValueError):
+            decode_cursor(registry, bad_cursor)
+
+
+def test_fields_parse():
+    assert Fields.parse('') is None
+    assert Fields.parse(' , ') is None
+
+    fields = Fields.parse('title, stats,_links.ext')
+    assert fields.names == {'title', 'stats', '_links'}
+    assert 'title' in fields
+    assert 'description' not in fields
+    assert fields.has_link('self')
+    assert fields.has_link('ext')
+    assert not fields.has_link('other')
+
+    fields = Fields.parse('title,_links,_links.ext')
+    assert fields.has_link('other')
+
+    fields = Fields.parse('title')
+    assert fields.has_link('self')
+    assert not fields.has_link('ext')
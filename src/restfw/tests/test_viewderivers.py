@@ -4,6 +4,8 @@
 :Date: 27.12.2019
 """
 
+import datetime
+
 import pytest
 from pyramid.authorization import ALL_PERMISSIONS, Allow, Everyone
 from pyramid.httpexceptions import (
@@ -19,6 +21,7 @@ from ..interfaces import MethodOptions
 from ..resources import Resource
 from ..typing import Json
 from ..utils import ETag
+from ..viewderivers import get_body_etag
 from ..views import ResourceView, resource_view_config
 
 
@@ -50,6 +53,26 @@ class DummyResource(Resource):
         return False
 
 
+class VersionedResource(DummyResource):
+    def __init__(self, model):
+        super().__init__(model)
+        self.version = 1
+        self.etag_calls = 0
+        self.last_modified = datetime.datetime(2026, 10, 17, 12, 30, 15, 500)
+
+    def get_etag(self):
+        self.etag_calls += 1
+        return ETag(f'v{self.version}')
+
+    def get_last_modified(self):
+        return self.last_modified
+
+    def http_put(self, request, params):
+        self.model = params
+        self.version += 1
+        return False
+
+
 @resource_view_config(DummyResource)
 class DummyResourceView(ResourceView):
     options_for_get = MethodOptions(None, DummySchema, permission='get')
@@ -59,6 +82,24 @@ class DummyResourceView(ResourceView):
         return self.resource.model
 
 
+class AutoEtagResource(DummyResource):
+    pass
+
+
+@resource_view_config(AutoEtagResource)
+class AutoEtagResourceView(DummyResourceView):
+    auto_etag = True
+
+
+class FastHeadAutoEtagResource(DummyResource):
+    pass
+
+
+@resource_view_config(FastHeadAutoEtagResource)
+class FastHeadAutoEtagResourceView(AutoEtagResourceView):
+    fast_head = True
+
+
 @view_config(
     name='custom_view',
     request_method={'GET', 'PATCH'},
@@ -250,3 +291,91 @@ def test_process_conditional_put_requests(
 
     new_params = {'foo': 'World', 'bar': 456}
     web_app.put_json(resource_url, params=new_params, **kwargs)
+
+
+def test_etag_is_computed_once_per_request(web_app, pyramid_request):
+    root = pyramid_request.root
+    root['resource'] = resource = VersionedResource({'foo': 'Hello', 'bar': 123})
+    resource_url = pyramid_request.resource_url(root['resource'])
+
+    res = web_app.get(resource_url, headers={'If-None-Match': '"other"'})
+    assert res.headers['ETag'] == '"v1"'
+    assert resource.etag_calls == 1
+
+    web_app.get(
+        resource_url,
+        headers={'If-None-Match': '"v1"'},
+        exception=HTTPNotModified(),
+    )
+    assert resource.etag_calls == 2
+
+    # ETag is computed again after modification of the resource
+    res = web_app.put_json(
+        resource_url,
+        params={'foo': 'World', 'bar': 456},
+        headers={'If-Match': '"v1"'},
+    )
+    assert res.headers['ETag'] == '"v2"'
+    assert resource.etag_calls == 4
+
+
+def test_process_if_modified_since(web_app, pyramid_request):
+    root = pyramid_request.root
+    root['resource'] = VersionedResource({'foo': 'Hello', 'bar': 123})
+    resource_url = pyramid_request.resource_url(root['resource'])
+
+    res = web_app.get(resource_url)
+    last_modified = res.headers['Last-Modified']
+    assert last_modified == 'Sat, 17 Oct 2026 12:30:15 GMT'
+
+    web_app.get(
+        resource_url,
+        headers={'If-Modified-Since': last_modified},
+        exception=HTTPNotModified(),
+    )
+    web_app.get(
+        resource_url,
+        headers={'If-Modified-Since': 'Sat, 17 Oct 2026 12:30:14 GMT'},
+        status=200,
+    )
+    # If-Modified-Since is ignored if If-None-Match is present
+    web_app.get(
+        resource_url,
+        headers={'If-Modified-Since': last_modified, 'If-None-Match': '"other"'},
+        status=200,
+    )
+
+
+def test_auto_etag(web_app, pyramid_request):
+    root = pyramid_request.root
+    root['resource'] = DummyResource({'foo': 'Hello', 'bar': 123})
+    root['auto'] = resource = AutoEtagResource({'foo': 'Hello', 'bar': 123})
+    res = web_app.get(pyramid_request.resource_url(root['resource']))
+    assert 'ETag' not in res.headers
+
+    resource_url = pyramid_request.resource_url(resource)
+    res = web_app.get(resource_url)
+    etag = res.headers['ETag']
+    assert etag == 'W/"%s"' % get_body_etag(res.body)
+
+    res = web_app.get(resource_url, headers={'If-None-Match': etag}, status=304)
+    assert res.headers['ETag'] == etag
+    assert res.body == b''
+    web_app.head(resource_url, headers={'If-None-Match': etag}, status=304)
+
+    resource.model = {'foo': 'World', 'bar': 123}
+    res = web_app.get(resource_url, headers={'If-None-Match': etag})
+    assert res.headers['ETag'] != etag
+
+    # HEAD response is rendered from a GET body to calculate ETag
+    root['fast'] = fast = FastHeadAutoEtagResource({'foo': 'Fast', 'bar': 1})
+    fast_url = pyramid_request.resource_url(fast)
+    res = web_app.head(fast_url)
+    assert res.headers['ETag'] == web_app.get(fast_url).headers['ETag']
+    res = web_app.head(fast_url, headers={'If-None-Match': etag}, status=200)
+    assert res.headers['ETag'] != etag
+
+    # An own ETag of resource is not replaced
+    resource.etag = ETag('etag')
+    res = web_app.get(resource_url)
+    assert res.headers['ETag'] == '"etag"'
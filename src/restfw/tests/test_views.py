@@ -4,19 +4,30 @@
 :Date: 08.09.2016
 """
 
+import bisect
 import uuid
 
 import colander
 import pytest
 from cykooz.testing import D
 from pyramid.authorization import ALL_PERMISSIONS, Allow, Everyone
+from pyramid import testing
+from pyramid.config import Configurator
+from pyramid.exceptions import ConfigurationError
+from pyramid.interfaces import IRequest
+from pyramid.threadlocal import get_current_request
+from webtest import TestApp
 
 from .. import interfaces, schemas, views
-from ..errors import ParametersError
+from ..authorization import has_view_access
+from ..errors import ParametersError, ValidationError
 from ..hal import HalResource, SimpleContainer
 from ..testing import assert_resource
+from ..testing.fixtures import simple_app
+from ..total_count import TotalCount
 from ..typing import Json
 from ..usage_examples import UsageExamples
+from ..utils import ETag, encode_cursor, is_testing, open_pyramid_request
 
 
 class DummyHalResource(HalResource):
@@ -103,6 +114,169 @@ class DummyContainerView(views.HalResourceWithEmbeddedView):
         )
 
 
+class StreamingDummyContainer(DummyContainer):
+    pass
+
+
+@views.resource_view_config()
+class StreamingDummyContainerView(DummyContainerView):
+    resource: StreamingDummyContainer
+    stream_embedded = True
+
+
+class RequestScopedHalResource(DummyHalResource):
+    pass
+
+
+@views.resource_view_config()
+class RequestScopedHalResourceView(DummyHalResourceView):
+    resource: RequestScopedHalResource
+
+    def as_dict(self) -> Json:
+        # Emulates usage of request-scoped resources, e.g. a DB session
+        assert get_current_request() is self.request
+        assert not self.request.session_closed
+        return super().as_dict()
+
+
+class RequestScopedContainer(DummyContainer):
+    pass
+
+
+@views.resource_view_config()
+class RequestScopedContainerView(StreamingDummyContainerView):
+    resource: RequestScopedContainer
+
+    def get_embedded(self, params: dict):
+        self.request.session_closed = False
+        self.request.add_finished_callback(self._close_session)
+        return super().get_embedded(params)
+
+    @staticmethod
+    def _close_session(request):
+        request.session_closed = True
+
+
+class FastHeadContainer(DummyContainer):
+    def get_etag(self):
+        return ETag(f'items-{len(self._data)}')
+
+
+@views.resource_view_config()
+class FastHeadContainerView(DummyContainerView):
+    resource: FastHeadContainer
+    fast_head = True
+    get_calls = 0
+
+    def http_get(self):
+        FastHeadContainerView.get_calls += 1
+        return super().http_get()
+
+
+class PreparedHalResource(DummyHalResource):
+    prepared_description = None
+
+
+@views.resource_view_config()
+class PreparedHalResourceView(DummyHalResourceView):
+    resource: PreparedHalResource
+    prepare_calls = []
+
+    @classmethod
+    def prepare_embedded(cls, request, resources):
+        cls.prepare_calls.append([r.__name__ for r in resources])
+        for resource in resources:
+            resource.prepared_description = f'Prepared {resource.title}'
+
+    def as_dict(self) -> Json:
+        return {
+            'title': self.resource.title,
+            'description': self.resource.prepared_description,
+        }
+
+
+class CursorDummyContainer(DummyContainer):
+    pass
+
+
+class GetCursorDummyContainerSchema(schemas.GetNextPageSchema):
+    pass
+
+
+@views.resource_view_config()
+class CursorDummyContainerView(views.HalResourceWithEmbeddedView):
+    resource: CursorDummyContainer
+    options_for_get = interfaces.MethodOptions(
+        GetCursorDummyContainerSchema,
+        schemas.HalResourceWithEmbeddedSchema,
+    )
+    cursor_paging = True
+
+    def get_embedded(self, params: dict):
+        keys = sorted(self.resource.keys())
+
+        def seek(position, limit, reverse):
+            if reverse:
+                index = bisect.bisect_left(keys, position)
+                page_keys = keys[max(0, index - limit) : index][::-1]
+            else:
+                index = 0 if position is None else bisect.bisect_right(keys, position)
+                page_keys = keys[index : index + limit]
+            return [self.resource[key] for key in page_keys]
+
+        return views.cursor_to_embedded_resources(
+            self.request,
+            params,
+            seek=seek,
+            get_position=lambda resource: resource.__name__,
+            parent=self.resource,
+            embedded_name='items',
+            get_total_count=lambda: len(keys),
+        )
+
+
+class SparseHalResource(DummyHalResource):
+    stats_calls = 0
+
+    def calculate_stats(self):
+        SparseHalResource.stats_calls += 1
+        return len(self.description)
+
+
+class SparseHalResourceSchema(DummyHalResourceSchema):
+    stats = schemas.IntegerNode(title='Length of description')
+
+
+@views.resource_view_config()
+class SparseHalResourceView(DummyHalResourceView):
+    resource: SparseHalResource
+    options_for_get = interfaces.MethodOptions(
+        schemas.GetResourceSchema,
+        SparseHalResourceSchema,
+    )
+
+    def as_dict(self) -> Json:
+        result = super().as_dict()
+        result['stats'] = views.Lazy(self.resource.calculate_stats)
+        return result
+
+
+class ReadOnlyHalResource(DummyHalResource):
+    read_only = False
+
+
+@views.resource_view_config()
+class ReadOnlyHalResourceView(DummyHalResourceView):
+    resource: ReadOnlyHalResource
+    options_for_put = DummyHalResourceView.options_for_put.replace(permission='edit')
+
+    def get_allowed_methods(self):
+        methods = super().get_allowed_methods()
+        if self.resource.read_only:
+            methods.discard('PUT')
+        return methods
+
+
 class DummyHalResourceExamples(UsageExamples):
     resource: DummyHalResource
 
@@ -187,6 +361,21 @@ class DummyContainerExamples(UsageExamples):
         )
 
 
+class CursorDummyContainerExamples(DummyContainerExamples):
+    count_of_embedded = 5
+
+    def prepare_resource(self):
+        resource = CursorDummyContainer()
+        self.root['test_container'] = resource
+        for i in range(self.count_of_embedded):
+            child = DummyHalResource(f'Resource title {i}', '')
+            resource[f'res-{i}'] = child
+        return resource
+
+    def post_requests(self):
+        pass
+
+
 @pytest.fixture(autouse=True)
 def register(app_config):
     app_config.scan('restfw.tests.test_views')
@@ -228,3 +417,370 @@ def test_resource_views(web_app, pyramid_request):
         'title': 'New title',
         'description': 'New description',
     }
+
+
+def test_resource_view_lookup_cache(web_app, pyramid_request):
+    container = DummyContainer()
+    pyramid_request.root['test_container'] = container
+    for i in range(5):
+        container[f'res-{i}'] = DummyHalResource(f'Title {i}', 'Description')
+
+    registry = pyramid_request.registry
+    cache = views.get_resource_view_lookup_cache(registry)
+    stats = cache.get_stats()
+
+    embedded = views.list_to_embedded_resources(
+        pyramid_request,
+        {'offset': 0, 'limit': 10, 'total_count': False},
+        resources=list(container.values()),
+        parent=container,
+        embedded_name='items',
+    )
+    result = embedded.__json__(pyramid_request)
+    assert len(result['items']) == 5
+    new_stats = cache.get_stats()
+    # Only one lookup for all resources of the same class
+    assert new_stats['misses'] - stats['misses'] <= 1
+    assert new_stats['hits'] - stats['hits'] >= 4
+
+    view = views.get_resource_view(container['res-0'], pyramid_request)
+    assert isinstance(view, DummyHalResourceView)
+    assert views.get_resource_view(object(), pyramid_request) is None
+
+    # Cache is dropped after changing of the registry
+    registry.registerAdapter(
+        lambda request, resource: None,
+        (IRequest, interfaces.IHalResource),
+        interfaces.IResourceView,
+        name='dummy',
+    )
+    assert views.get_resource_view_lookup_cache(registry) is not cache
+
+
+def test_streaming_of_embedded_resources(web_app, pyramid_request):
+    root = pyramid_request.root
+    root['container'] = container = DummyContainer()
+    root['streaming'] = streaming = StreamingDummyContainer()
+    for i in range(5):
+        container[f'res-{i}'] = DummyHalResource(f'Title {i}', 'Description')
+        streaming[f'res-{i}'] = container[f'res-{i}']
+
+    url = pyramid_request.resource_url(container)
+    streaming_url = pyramid_request.resource_url(streaming)
+    for params in [{}, {'limit': 2, 'total_count': True}, {'offset': 2, 'limit': 2}]:
+        res = web_app.get(url, params=params)
+        streaming_res = web_app.get(streaming_url, params=params)
+        assert streaming_res.content_type == 'application/json'
+        assert streaming_res.body == res.body.replace(b'/container/', b'/streaming/')
+        assert streaming_res.headers.get('X-Total-Count') == res.headers.get(
+            'X-Total-Count'
+        )
+
+    res = web_app.get(streaming_url, params={'limit': 2, 'total_count': True})
+    assert res.headers['X-Total-Count'] == '5'
+    assert res.json['_links']['next']['href'] == streaming_url + '?limit=2&offset=2'
+
+    res = web_app.head(streaming_url, params={'limit': 2, 'total_count': True})
+    assert res.body == b''
+    assert res.headers['X-Total-Count'] == '5'
+
+
+def test_streaming_uses_request():
+    # Bodies are not read by validation of results in production mode
+    wsgi_app = simple_app({'apps': 'restfw'})
+    registry = wsgi_app.registry
+    assert not is_testing(registry)
+    config = Configurator(registry=registry)
+    config.scan('restfw.tests.test_views')
+    config.commit()
+    with open_pyramid_request(registry) as request:
+        request.root['container'] = container = RequestScopedContainer()
+        for i in range(3):
+            container[f'res-{i}'] = RequestScopedHalResource(f'Title {i}', '')
+    res = TestApp(wsgi_app).get('/container/')
+    assert [item['title'] for item in res.json['_embedded']['items']] == [
+        'Title 0',
+        'Title 1',
+        'Title 2',
+    ]
+
+
+def test_json_stream_renderer(pyramid_request):
+    from ..renderers import json_renderer
+
+    container = DummyContainer()
+    pyramid_request.root['test_container'] = container
+    for i in range(3):
+        container[f'res-{i}'] = DummyHalResource(f'Title {i}', 'Description')
+    view = DummyContainerView(container, pyramid_request)
+    params = {'offset': 0, 'limit': 10, 'total_count': True, 'embedded': True}
+    result = view.__json__()
+    result['_embedded'] = view.get_embedded(params)
+
+    render = json_renderer(None)
+    expected = render(result, {'request': pyramid_request})
+
+    chunks = render(views.JsonStream(result), {'request': pyramid_request})
+    assert not isinstance(chunks, (str, bytes))
+    assert pyramid_request.response.headers['X-Total-Count'] == '3'
+    assert b''.join(chunks) == expected.encode('utf-8')
+
+
+@pytest.mark.parametrize(
+    'to_embedded',
+    [views.list_to_embedded_resources, views.iter_to_embedded_resources],
+)
+def test_prepare_embedded(pyramid_request, to_embedded):
+    container = DummyContainer()
+    pyramid_request.root['test_container'] = container
+    for i in range(4):
+        container[f'res-{i}'] = PreparedHalResource(f'Title {i}', '')
+    container['other'] = DummyHalResource('Other', 'Other description')
+    PreparedHalResourceView.prepare_calls.clear()
+
+    resources = list(container.values())
+    if to_embedded is views.iter_to_embedded_resources:
+        resources = iter(resources)
+    embedded = to_embedded(
+        pyramid_request,
+        {'offset': 1, 'limit': 3, 'total_count': False},
+        resources,
+        parent=container,
+        embedded_name='items',
+    )
+    # Hook is called once with resources of the page only
+    assert PreparedHalResourceView.prepare_calls == [['res-1', 'res-2', 'res-3']]
+    result = embedded.__json__(pyramid_request)
+    assert [item['description'] for item in result['items']] == [
+        'Prepared Title 1',
+        'Prepared Title 2',
+        'Prepared Title 3',
+    ]
+    assert (
+        views.get_resource_view_class(container['other'], pyramid_request)
+        is DummyHalResourceView
+    )
+
+
+class LazyResources:
+    def __init__(self, count):
+        self.count = count
+        self.len_calls = 0
+        self.fetched = 0
+
+    def __len__(self):
+        self.len_calls += 1
+        return self.count
+
+    def __getitem__(self, item: slice):
+        indexes = range(self.count)[item]
+        self.fetched += len(indexes)
+        return (DummyHalResource(f'Title {i}', '') for i in indexes)
+
+
+def test_list_to_embedded_lazy_sequence(pyramid_request):
+    container = DummyContainer()
+    pyramid_request.root['test_container'] = container
+    resources = LazyResources(10_000_000)
+    params = {'offset': 40, 'limit': 20, 'total_count': False}
+    embedded = views.list_to_embedded_resources(
+        pyramid_request, params, resources, container, 'items'
+    )
+    page = embedded.embedded['items']
+    assert [r.title for r in page] == [f'Title {i}' for i in range(40, 60)]
+    assert 'next' in embedded.paging_links
+    assert resources.fetched == 21
+    assert resources.len_calls == 0
+    assert embedded.total_count is None
+
+    params = {'offset': 9_999_990, 'limit': 20, 'total_count': True}
+    embedded = views.list_to_embedded_resources(
+        pyramid_request, params, resources, container, 'items'
+    )
+    assert len(embedded.embedded['items']) == 10
+    assert 'next' not in embedded.paging_links
+    assert resources.len_calls == 1
+    assert embedded.total_count == TotalCount(10_000_000)
+
+
+def test_cursor_container(web_app, pyramid_request):
+    resource_info = CursorDummyContainerExamples(pyramid_request)
+    assert_resource(resource_info, web_app)
+
+
+def test_cursor_paging(web_app, pyramid_request):
+    container = CursorDummyContainer()
+    pyramid_request.root['test_container'] = container
+    for i in range(7):
+        container[f'res-{i}'] = DummyHalResource(f'Title {i}', '')
+    url = pyramid_request.resource_url(container)
+
+    def get_names(res):
+        return [
+            item['_links']['self']['href'].rstrip('/').rsplit('/', 1)[1]
+            for item in res.json['_embedded']['items']
+        ]
+
+    res = web_app.get(url, params={'limit': 3})
+    assert get_names(res) == ['res-0', 'res-1', 'res-2']
+    assert 'prev' not in res.json['_links']
+    res = web_app.get(res.json['_links']['next']['href'])
+    assert get_names(res) == ['res-3', 'res-4', 'res-5']
+    next_url = res.json['_links']['next']['href']
+    prev_url = res.json['_links']['prev']['href']
+    res = web_app.get(next_url)
+    assert get_names(res) == ['res-6']
+    assert 'next' not in res.json['_links']
+    res = web_app.get(prev_url)
+    assert get_names(res) == ['res-0', 'res-1', 'res-2']
+    assert 'prev' not in res.json['_links']
+
+    # The empty page before the first item links to the first page
+    first_cursor = encode_cursor(pyramid_request.registry, 'res-0')
+    res = web_app.get(url, params={'limit': 3, 'cursor_prev': first_cursor})
+    assert get_names(res) == []
+    assert 'prev' not in res.json['_links']
+    res = web_app.get(res.json['_links']['next']['href'])
+    assert get_names(res) == ['res-0', 'res-1', 'res-2']
+
+    cursor = encode_cursor(pyramid_request.registry, 'res-1')
+    web_app.get(
+        url,
+        params={'cursor_next': cursor[:-2] + 'AA'},
+        exception=ValidationError({'cursor_next': 'Invalid cursor'}),
+    )
+    web_app.get(
+        url,
+        params={'cursor_prev': 'bad'},
+        exception=ValidationError({'cursor_prev': 'Invalid cursor'}),
+    )
+
+
+def test_cursor_secret_is_required():
+    with testing.testConfig(settings={}) as config:
+        config.include('restfw.config')
+        with pytest.raises(ConfigurationError):
+            config.add_resource_view(CursorDummyContainerView, CursorDummyContainer)
+        with pytest.raises(ConfigurationError):
+            encode_cursor(config.registry, 'res-1')
+
+
+def test_sparse_fieldsets(app_config, web_app, pyramid_request):
+    link_calls = []
+
+    def ext_link(request, resource):
+        link_calls.append(resource)
+        return 'http://example.com/ext'
+
+    app_config.add_external_link_fabric(ext_link, 'ext', SparseHalResource)
+    app_config.commit()
+    container = DummyContainer()
+    pyramid_request.root['test_container'] = container
+    container['resource'] = SparseHalResource('Title', 'Description')
+    url = pyramid_request.resource_url(container['resource'])
+    SparseHalResource.stats_calls = 0
+
+    res = web_app.get(url, params={'fields': 'title'})
+    assert res.json == {'_links': {'self': {'href': url}}, 'title': 'Title'}
+    assert SparseHalResource.stats_calls == 0
+    assert link_calls == []
+
+    res = web_app.get(url, params={'fields': 'stats,_links.ext'})
+    assert res.json == {
+        '_links': {
+            'self': {'href': url},
+            'ext': {'href': 'http://example.com/ext'},
+        },
+        'stats': 11,
+    }
+    assert SparseHalResource.stats_calls == 1
+    assert len(link_calls) == 1
+
+    res = web_app.get(url)
+    assert res.json == {
+        '_links': {
+            'self': {'href': url},
+            'ext': {'href': 'http://example.com/ext'},
+        },
+        'title': 'Title',
+        'description': 'Description',
+        'stats': 11,
+    }
+    assert SparseHalResource.stats_calls == 2
+
+    # Embedded resources are skipped if they are not requested
+    container_url = pyramid_request.resource_url(container)
+    res = web_app.get(container_url, params={'fields': '_links'})
+    assert res.json == {'_links': {'self': {'href': container_url}}}
+    res = web_app.get(container_url, params={'fields': '_embedded'})
+    assert set(res.json) == {'_links', '_embedded'}
+    assert res.json['_embedded']['items'][0]['stats'] == 11
+
+
+def test_fast_head(web_app, pyramid_request):
+    container = FastHeadContainer()
+    pyramid_request.root['test_container'] = container
+    for i in range(3):
+        container[f'res-{i}'] = DummyHalResource(f'Title {i}', '')
+    url = pyramid_request.resource_url(container)
+    FastHeadContainerView.get_calls = 0
+
+    res = web_app.get(url, params={'total_count': True})
+    assert FastHeadContainerView.get_calls == 1
+    get_headers = res.headers
+
+    res = web_app.head(url, params={'total_count': True})
+    assert FastHeadContainerView.get_calls == 1
+    assert res.body == b''
+    assert res.headers['ETag'] == get_headers['ETag'] == '"items-3"'
+    assert res.headers['X-Total-Count'] == '3'
+    assert res.headers['Content-Type'] == get_headers['Content-Type']
+    assert res.headers.get('Content-Length') in (None, get_headers['Content-Length'])
+
+    res = web_app.head(url)
+    assert 'X-Total-Count' not in res.headers
+    res = web_app.head(url, params={'total_count': True, 'embedded': False})
+    assert 'X-Total-Count' not in res.headers
+    web_app.head(url, headers={'If-None-Match': '"items-3"'}, status=304)
+
+
+def test_method_table():
+    table = views.get_method_table(DummyHalResourceView)
+    assert table is views.get_method_table(DummyHalResourceView)
+    assert table.allowed_methods == {'OPTIONS', 'GET', 'HEAD', 'PUT', 'DELETE'}
+    assert table.allow_header == 'DELETE, GET, HEAD, OPTIONS, PUT'
+    assert table.input_schemas['head'] is schemas.GetResourceSchema
+    assert table.permissions['put'] == 'put'
+    # PUT uses output schema of GET method
+    assert table.get_output_schema('put') is DummyHalResourceSchema
+    assert table.get_output_schema('delete') is None
+    assert table.get_output_schema('post') is None
+
+    # Tables are not inherited
+    sub_table = views.get_method_table(SparseHalResourceView)
+    assert sub_table is not table
+    assert sub_table.get_output_schema('get') is SparseHalResourceSchema
+
+
+def test_custom_allowed_methods(web_app, pyramid_request):
+    container = DummyContainer()
+    pyramid_request.root['test_container'] = container
+    resource = ReadOnlyHalResource('Title', 'Description')
+    container['resource'] = resource
+    url = pyramid_request.resource_url(resource)
+    res = web_app.options(url)
+    assert res.headers['Allow'] == 'DELETE, GET, HEAD, OPTIONS, PUT'
+    assert has_view_access(pyramid_request, resource, 'put')
+
+    resource.read_only = True
+    res = web_app.options(url)
+    assert res.headers['Allow'] == 'DELETE, GET, HEAD, OPTIONS'
+    assert not has_view_access(pyramid_request, resource, 'put')
+
+
+def test_options_request(web_app, pyramid_request):
+    container = DummyContainer()
+    pyramid_request.root['test_container'] = container
+    container['resource'] = DummyHalResource('Title', 'Description')
+    res = web_app.options(pyramid_request.resource_url(container['resource']))
+    assert res.headers['Allow'] == 'DELETE, GET, HEAD, OPTIONS, PUT'
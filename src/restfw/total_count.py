@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+:Authors: cykooz
+:Date: 17.10.2026
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Union
+
+from pyramid.config import Configurator
+from pyramid.traversal import resource_path
+from zope.interface import implementer
+
+from .interfaces import ITotalCountProvider
+from .response_cache import get_user_fingerprint
+from .typing import PyramidRequest
+from .utils import get_resource_etag
+
+
+class TotalCount:
+    """Total count of items in a collection.
+
+    If ``is_estimated`` is True, the count is approximate. In this case
+    a response will contain header ``X-Total-Count-Estimated: true``.
+    """
+
+    __slots__ = ('value', 'is_estimated')
+
+    def __init__(self, value: int, is_estimated=False):
+        self.value = value
+        self.is_estimated = is_estimated
+
+    def __repr__(self):
+        suffix = ' (estimated)' if self.is_estimated else ''
+        return f'<TotalCount {self.value}{suffix}>'
+
+    def __eq__(self, other):
+        if isinstance(other, TotalCount):
+            return (self.value, self.is_estimated) == (
+                other.value,
+                other.is_estimated,
+            )
+        return NotImplemented
+
+
+def register_total_count_provider(
+    config: Configurator, provider_factory, resource_class, embedded_name=''
+):
+    """Add into the pyramid registry an adapter that returns total count
+    of items in a collection resource.
+    :param config: A pyramid configurator.
+    :param provider_factory: Some callable object (takes only resource instance)
+        which returns an object that implements ITotalCountProvider.
+    :param resource_class: Class or interface of collection resource.
+    :param embedded_name: Name of embedded resources. Provider registered with
+        empty name is used for all embedded resources of the collection.
+    """
+    config.registry.registerAdapter(
+        provider_factory,
+        required=(resource_class,),
+        provided=ITotalCountProvider,
+        name=embedded_name,
+    )
+
+
+def get_total_count(
+    request: PyramidRequest, collection, embedded_name=''
+) -> Optional[TotalCount]:
+    """Returns total count of items of collection resource from registered
+    count provider or None if the provider is not registered or
+    it doesn't know the count."""
+    registry = request.registry
+    provider = None
+    if embedded_name:
+        provider = registry.queryAdapter(
+            collection, ITotalCountProvider, name=embedded_name
+        )
+    if provider is None:
+        provider = registry.queryAdapter(collection, ITotalCountProvider)
+    if provider is None:
+        return None
+    return to_total_count(provider.get_total_count(request))
+
+
+def to_total_count(value: Union[int, TotalCount, None]) -> Optional[TotalCount]:
+    if value is None or isinstance(value, TotalCount):
+        return value
+    return TotalCount(value)
+
+
+# Parameters of GET request which don't change a set of items of a collection
+PAGING_PARAMS = frozenset(
+    [
+        'embedded',
+        'fields',
+        'offset',
+        'limit',
+        'cursor_next',
+        'cursor_prev',
+        'total_count',
+    ]
+)
+
+
+def get_total_count_key(request: PyramidRequest, collection) -> Hashable:
+    """Returns a part of key of a cached total count that depends on
+    a request: parameters of the request that filter items of a collection
+    and an identifier of current user (items may be filtered by permissions).
+    """
+    params = tuple(
+        sorted(
+            (name, value)
+            for name, value in request.GET.items()
+            if name not in PAGING_PARAMS
+        )
+    )
+    return params, get_user_fingerprint(request)
+
+
+class CachedTotalCountProvider:
+    """Factory of total count providers which caches counts returned by
+    other provider. A cached value is keyed by path of collection resource,
+    its ETag and a value returned by ``key`` callable, and it expires after
+    ``ttl`` seconds.
+
+    ``key`` takes a request and a collection. By default, parameters
+    of the request except parameters of paging and an identifier of current
+    user are used (see :func:`get_total_count_key`).
+
+    Example:
+
+      .. code-block:: python
+
+        register_total_count_provider(
+            config,
+            CachedTotalCountProvider(UsersCountProvider, ttl=300),
+            Users,
+        )
+    """
+
+    def __init__(
+        self,
+        provider_factory,
+        ttl: float = 60.0,
+        max_size=1000,
+        key: Callable[[PyramidRequest, object], Hashable] = get_total_count_key,
+    ):
+        self.provider_factory = provider_factory
+        self.key = key
+        self.ttl = ttl
+        self.max_size = max_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, collection):
+        return _CachedTotalCount(self, collection)
+
+    def get_total_count(self, request: PyramidRequest, collection):
+        etag = get_resource_etag(request, collection)
+        key = (
+            resource_path(collection),
+            etag.serialize() if etag else None,
+            self.key(request, collection),
+        )
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        provider = self.provider_factory(collection)
+        count = to_total_count(provider.get_total_count(request))
+        if count is not None:
+            with self._lock:
+                self._cache[key] = (now + self.ttl, count)
+                self._cache.move_to_end(key)
+                if len(self._cache) > self.max_size:
+                    self._cache.popitem(last=False)
+        return count
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+@implementer(ITotalCountProvider)
+class _CachedTotalCount:
+    __slots__ = ('_cached_provider', '_collection')
+
+    def __init__(self, cached_provider: CachedTotalCountProvider, collection):
+        self._cached_provider = cached_provider
+        self._collection = collection
+
+    def get_total_count(self, request: PyramidRequest):
+        return self._cached_provider.get_total_count(request, self._collection)
@@ -3,7 +3,17 @@
 :Date: 25.12.2020
 """
 
-from typing import Dict, List, Tuple, Union
+from typing import (
+    Any,
+    Dict,
+    List,
+    Mapping,
+    Protocol,
+    Sequence,
+    Tuple,
+    Union,
+    runtime_checkable,
+)
 
 from pyramid.registry import Registry
 from pyramid.request import Request
@@ -16,3 +26,26 @@ Json = Union[SimpleJsonValue, List['Json'], Tuple['Json', ...], Dict[str, 'Json'
 
 class PyramidRequest(Request):
     registry: Registry
+
+
+@runtime_checkable
+class LazySequence(Protocol):
+    """A collection that can return its length and a slice of items
+    without materializing all items (e.g. ORM query, range-like views).
+    A slice must be returned as a sequence of items.
+    """
+
+    def __len__(self) -> int: ...
+
+    def __getitem__(self, item: slice) -> Any: ...
+
+
+@runtime_checkable
+class BulkLookup(Protocol):
+    """A container that can get many children by one query to a storage.
+    Returned mapping contains only found children, they must have
+    ``__name__`` and ``__parent__`` attributes like children returned
+    by ``__getitem__``.
+    """
+
+    def get_many(self, keys: Sequence[str]) -> Mapping[str, Any]: ...
@@ -4,23 +4,38 @@
 :Date: 26.08.2016
 """
 
+import base64
+import hashlib
+import hmac
+import json
 import re
+from collections.abc import Iterable, Mapping
 from contextlib import contextmanager
+from datetime import datetime, timezone
 from typing import ContextManager, Dict, Optional, Union
 
 import colander
 from pyramid.config import Configurator
+from pyramid.exceptions import ConfigurationError, URLDecodeError
 from pyramid.interfaces import IRequestFactory, IRootFactory
 from pyramid.registry import Registry
 from pyramid.request import Request, apply_request_extensions
+from pyramid.settings import asbool
 from pyramid.threadlocal import RequestContext, get_current_request
-from pyramid.traversal import DefaultRootFactory, find_resource
+from pyramid.traversal import (
+    DefaultRootFactory,
+    find_resource,
+    find_root,
+    traversal_path,
+)
 from webob.descriptors import serialize_etag_response
 from zope.interface.interfaces import IInterface
 
 from .errors import InvalidBodyFormat, ValidationError
 from .events import Event
 from .interfaces import IEvent, IHalResourceLinks, MethodOptions
+from .schema_cache import get_compiled_schema
+from .schema_compiler import get_schema_validator
 from .typing import PyramidRequest
 
 
@@ -79,12 +94,26 @@ def get_input_data(
         data_dict = request.params
 
     try:
-        schema = schema().bind(request=request, context=context)
-        return schema.deserialize(data_dict)
+        if is_schema_compiler_enabled(request.registry):
+            compiled = get_schema_validator(schema)
+        else:
+            compiled = get_compiled_schema(schema)
+        return compiled.deserialize(data_dict, request=request, context=context)
     except colander.Invalid as e:
         raise colander_invalid_to_response(e)
 
 
+def is_schema_compiler_enabled(registry: Registry) -> bool:
+    """Returns True if input data is validated by functions compiled
+    from schemas (see ``restfw.schema_compiler``)."""
+    enabled = getattr(registry, '_restfw_schema_compiler_enabled', None)
+    if enabled is None:
+        settings = registry.settings or {}
+        enabled = asbool(settings.get('restfw.schema_compiler', False))
+        registry._restfw_schema_compiler_enabled = enabled
+    return enabled
+
+
 def colander_invalid_to_response(exc: colander.Invalid):
     return ValidationError(exc.asdict())
 
@@ -111,14 +140,15 @@ def create_validation_error(schema_class, message, node_name=None, value=None):
     if schema_class is None:
         node_name = node_name or ''
         return ValidationError({node_name: message})
-    error = _create_error(schema_class(), message, node_name, value)
+    schema = get_compiled_schema(schema_class).instance
+    error = _create_error(schema, message, node_name, value)
     return colander_invalid_to_response(error)
 
 
 def create_multi_validation_error(schema_class, errors: Dict[str, str]):
     if schema_class is None:
         return ValidationError(errors.copy())
-    schema = schema_class()
+    schema = get_compiled_schema(schema_class).instance
     error = colander.Invalid(schema)
     for node_name, message in errors.items():
         error.add(_create_error(schema, message, node_name))
@@ -158,6 +188,161 @@ def get_paging_links(
     return links
 
 
+def get_cursor_paging_links(
+    resource,
+    request: PyramidRequest,
+    next_cursor: Optional[str],
+    prev_cursor: Optional[str],
+    next_is_first_page: bool = False,
+) -> dict:
+    """Returns links to the next and previous pages of a collection.
+    If ``next_is_first_page`` is True and ``next_cursor`` is not specified,
+    the next link points to the first page.
+    """
+    links = {}
+    query = request.GET.copy()
+    for name in ('total_count', 'cursor_next', 'cursor_prev'):
+        query.pop(name, None)
+    if next_cursor:
+        next_query = query.copy()
+        next_query['cursor_next'] = next_cursor
+        links['next'] = {'href': request.resource_url(resource, query=next_query)}
+    elif next_is_first_page:
+        links['next'] = {'href': request.resource_url(resource, query=query)}
+    if prev_cursor:
+        prev_query = query.copy()
+        prev_query['cursor_prev'] = prev_cursor
+        links['prev'] = {'href': request.resource_url(resource, query=prev_query)}
+    return links
+
+
+_CURSOR_SIGNATURE_SIZE = 12
+
+
+def _get_cursor_secret(registry: Registry) -> bytes:
+    secret = getattr(registry, '_restfw_cursor_secret', None)
+    if secret is None:
+        secret = (registry.settings or {}).get('restfw.cursor_secret')
+        if not secret:
+            raise ConfigurationError('Setting "restfw.cursor_secret" is required')
+        secret = secret.encode('utf-8') if isinstance(secret, str) else secret
+        registry._restfw_cursor_secret = secret
+    return secret
+
+
+def encode_cursor(registry: Registry, position) -> str:
+    """Returns an opaque and tamper-evident string with the given position
+    of item in a collection. The position must be JSON-serializable.
+
+    The cursor is signed by value of ``restfw.cursor_secret`` setting.
+    It must be the same for all processes of an application.
+    :raise ConfigurationError: if the setting is absent.
+    """
+    payload = json.dumps(position, separators=(',', ':')).encode('utf-8')
+    signature = hmac.new(_get_cursor_secret(registry), payload, hashlib.sha256)
+    token = signature.digest()[:_CURSOR_SIGNATURE_SIZE] + payload
+    return base64.urlsafe_b64encode(token).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(registry: Registry, cursor: str):
+    """Returns position of item in a collection encoded into the given cursor.
+    :raise ValueError: if the cursor is invalid or it was tampered.
+    """
+    try:
+        token = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+    signature = token[:_CURSOR_SIGNATURE_SIZE]
+    payload = token[_CURSOR_SIGNATURE_SIZE:]
+    expected = hmac.new(_get_cursor_secret(registry), payload, hashlib.sha256)
+    if not hmac.compare_digest(signature, expected.digest()[:_CURSOR_SIGNATURE_SIZE]):
+        raise ValueError('Invalid cursor')
+    return json.loads(payload)
+
+
+class Fields:
+    """Set of fields requested by a client through ``fields`` parameter
+    of GET request (sparse fieldsets).
+
+    Value of the parameter is a comma-separated list of names of top-level
+    fields. Names of links may be specified as ``_links.<name>``.
+    Link ``self`` is always included.
+    """
+
+    __slots__ = ('names', 'links')
+
+    def __init__(self, names, links=None):
+        self.names = frozenset(names)
+        # None means all links
+        self.links = None if links is None else frozenset(links)
+
+    def __repr__(self):
+        return f'<Fields {sorted(self.names)} links={self.links}>'
+
+    def __contains__(self, name) -> bool:
+        return name in self.names
+
+    def has_link(self, name) -> bool:
+        if name == 'self' or (self.links is None and '_links' in self.names):
+            return True
+        return self.links is not None and name in self.links
+
+    @classmethod
+    def parse(cls, value: str) -> Optional['Fields']:
+        names = set()
+        links = set()
+        all_links = False
+        for name in value.split(','):
+            name = name.strip()
+            if not name:
+                continue
+            if name == '_links':
+                all_links = True
+            elif name.startswith('_links.'):
+                links.add(name[7:])
+                name = '_links'
+            names.add(name)
+        if not names:
+            return None
+        return cls(names, None if all_links else links)
+
+
+def get_requested_fields(
+    request: PyramidRequest, input_schema=None
+) -> Optional[Fields]:
+    """Returns fields requested through ``fields`` parameter of GET request.
+    Returns None if the parameter is absent or the given input schema
+    doesn't support it (has not a node with name ``fields``).
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    value = request.GET.get('fields')
+    if not value or input_schema is None:
+        return None
+    nodes = getattr(input_schema, '__all_schema_nodes__', None)
+    if nodes is None:
+        nodes = input_schema.children
+    if not any(node.name == 'fields' for node in nodes):
+        return None
+    return Fields.parse(value)
+
+
+def make_partial_schema(schema: colander.SchemaNode, fields: Fields):
+    """Returns a copy of the given output schema in which all nodes
+    excluded from a response by sparse fieldsets are optional.
+    """
+    schema = schema.clone()
+    for node in schema.children:
+        if node.name == '_links':
+            # Link to self is always included
+            for link_node in node.children:
+                if not fields.has_link(link_node.name):
+                    link_node.missing = colander.drop
+        elif node.name not in fields:
+            node.missing = colander.drop
+    return schema
+
+
 def register_resource_links_extender(config: Configurator, adapter, resource_class):
     """Add into the pyramid registry an adapter for extend resource links.
     :param config: A pyramid configurator.
@@ -170,7 +355,7 @@ def register_resource_links_extender(config: Configurator, adapter, resource_cla
 
 
 def find_resource_by_type(resource, path, class_or_interface):
-    context = find_resource(resource, path)
+    context = find_resource_by_path(resource, path)
     if IInterface.providedBy(class_or_interface):
         test = class_or_interface.providedBy
     else:
@@ -261,3 +446,249 @@ class ETag:
 
     def serialize(self) -> str:
         return serialize_etag_response((self.value, self.is_strict))
+
+
+_NOT_MEMOIZED = object()
+
+
+def _get_memoized(request: PyramidRequest, resource, kind: str, getter):
+    memo = getattr(request, '_restfw_resource_memo', None)
+    if memo is None:
+        memo = request._restfw_resource_memo = {}
+    key = (id(resource), kind)
+    # A resource is stored with a value to prevent reusing of its id
+    _, value = memo.get(key, (None, _NOT_MEMOIZED))
+    if value is _NOT_MEMOIZED:
+        value = getter()
+        memo[key] = (resource, value)
+    return value
+
+
+def get_resource_etag(request: PyramidRequest, resource) -> Optional[ETag]:
+    """Returns ETag of the resource. The value is computed at most once
+    per request until ``invalidate_resource_etag()`` is called."""
+    return _get_memoized(request, resource, 'etag', resource.get_etag)
+
+
+def get_resource_last_modified(request: PyramidRequest, resource) -> Optional[datetime]:
+    """Returns time of last modification of the resource in UTC.
+    The value is computed at most once per request until
+    ``invalidate_resource_etag()`` is called."""
+    get_last_modified = getattr(resource, 'get_last_modified', None)
+    if get_last_modified is None:
+        return None
+
+    def getter():
+        last_modified = get_last_modified()
+        if last_modified is None:
+            return None
+        if last_modified.tzinfo is None:
+            return last_modified.replace(tzinfo=timezone.utc)
+        return last_modified.astimezone(timezone.utc)
+
+    return _get_memoized(request, resource, 'last_modified', getter)
+
+
+def invalidate_resource_etag(request: PyramidRequest, resource):
+    """Drops memoized values of ETag and time of last modification
+    of the resource. Must be called after modification of the resource."""
+    memo = getattr(request, '_restfw_resource_memo', None)
+    if memo:
+        resource_id = id(resource)
+        memo.pop((resource_id, 'etag'), None)
+        memo.pop((resource_id, 'last_modified'), None)
+
+
+class ResourceIdentityMap:
+    """Resources built while processing of a request. Repeated lookups
+    of a resource by its path or by its name inside a parent return
+    the same instance.
+    """
+
+    __slots__ = ('_children', '_paths')
+
+    def __init__(self):
+        self._children = {}
+        self._paths = {}
+
+    def __len__(self):
+        return len(self._children) + len(self._paths)
+
+    def get_child(self, parent, name: str):
+        # A parent is stored with a child to prevent reusing of its id
+        entry = self._children.get((id(parent), name))
+        if entry is not None and entry[0] is parent:
+            return entry[1]
+        return None
+
+    def add_child(self, parent, name: str, child):
+        self._children[(id(parent), name)] = (parent, child)
+
+    def get(self, path: str):
+        return self._paths.get(path)
+
+    def add(self, path: str, resource):
+        self._paths[path] = resource
+
+    def clear(self):
+        self._children.clear()
+        self._paths.clear()
+
+
+def is_resource_identity_map_enabled(registry: Registry) -> bool:
+    enabled = getattr(registry, '_restfw_identity_map_enabled', None)
+    if enabled is None:
+        settings = registry.settings or {}
+        enabled = asbool(settings.get('restfw.resource_identity_map', False))
+        registry._restfw_identity_map_enabled = enabled
+    return enabled
+
+
+def get_resource_identity_map(
+    request: Optional[PyramidRequest] = None, registry: Optional[Registry] = None
+) -> Optional[ResourceIdentityMap]:
+    """Returns the identity map of resources of the request or None
+    if it is disabled by ``restfw.resource_identity_map`` setting.
+    The map lives as long as the request.
+    """
+    if request is None:
+        if registry is not None and not is_resource_identity_map_enabled(registry):
+            return None
+        request = get_current_request()
+        if request is None:
+            return None
+    if registry is None:
+        registry = request.registry
+    elif request.registry is not registry:
+        return None
+    if not is_resource_identity_map_enabled(registry):
+        return None
+    identity_map = getattr(request, '_restfw_identity_map', None)
+    if identity_map is None:
+        identity_map = request._restfw_identity_map = ResourceIdentityMap()
+    return identity_map
+
+
+def clear_resource_identity_map(request: PyramidRequest):
+    """Drops all resources from the identity map of the request.
+    Must be called after modification of resources."""
+    identity_map = getattr(request, '_restfw_identity_map', None)
+    if identity_map is not None:
+        identity_map.clear()
+
+
+def get_acl_decisions(request: PyramidRequest) -> dict:
+    """Returns the memo of authorization decisions of the request."""
+    decisions = getattr(request, '_restfw_acl_decisions', None)
+    if decisions is None:
+        decisions = request._restfw_acl_decisions = {}
+    return decisions
+
+
+def get_compiled_acls(request: PyramidRequest) -> dict:
+    """Returns the cache of ACL compiled while the request."""
+    compiled_acls = getattr(request, '_restfw_compiled_acls', None)
+    if compiled_acls is None:
+        compiled_acls = request._restfw_compiled_acls = {}
+    return compiled_acls
+
+
+def clear_acl_decisions(request: PyramidRequest):
+    """Drops all memoized authorization decisions and compiled ACL
+    of the request. Must be called after modification of resources."""
+    for name in ('_restfw_acl_decisions', '_restfw_compiled_acls'):
+        cache = getattr(request, name, None)
+        if cache is not None:
+            cache.clear()
+
+
+def find_resource_by_path(
+    resource, path: str, request: Optional[PyramidRequest] = None
+):
+    """The same as ``pyramid.traversal.find_resource()``, but resources found
+    by absolute paths are stored in the identity map of the request."""
+    if not isinstance(path, str) or not path.startswith('/'):
+        return find_resource(resource, path)
+    identity_map = get_resource_identity_map(
+        request, registry=getattr(resource, '__registry__', None)
+    )
+    if identity_map is None:
+        return find_resource(resource, path)
+    key = '/' + path.strip('/')
+    context = identity_map.get(key)
+    if context is None:
+        context = find_resource(resource, path)
+        identity_map.add(key, context)
+    return context
+
+
+def _get_children(context, keys: list) -> Mapping:
+    get_many = getattr(context, 'get_many', None)
+    if get_many is not None:
+        return get_many(keys)
+    getitem = getattr(context, '__getitem__', None)
+    children = {}
+    if getitem is None:
+        return children
+    for key in keys:
+        try:
+            children[key] = getitem(key)
+        except KeyError:
+            pass
+    return children
+
+
+def find_resources(
+    resource, paths: Iterable[str], request: Optional[PyramidRequest] = None
+) -> dict:
+    """Finds resources by many absolute paths. Common prefixes of paths
+    are traversed only once. If a resource has method
+    ``get_many(keys)`` (see ``restfw.typing.BulkLookup``), it is used
+    to get all required children of the resource by one call.
+
+    Returns a dict that maps every path to a found resource
+    or to None if a resource has not found.
+    """
+    identity_map = get_resource_identity_map(
+        request, registry=getattr(resource, '__registry__', None)
+    )
+    result = {}
+    # Nodes of a tree of path segments: (paths, children)
+    tree = ([], {})
+    for path in paths:
+        if path in result:
+            continue
+        key = '/' + path.strip('/')
+        if identity_map is not None:
+            context = identity_map.get(key)
+            if context is not None:
+                result[path] = context
+                continue
+        result[path] = None
+        try:
+            segments = traversal_path(path)
+        except (ValueError, URLDecodeError):
+            continue
+        if any(segment.startswith('@@') for segment in segments):
+            # find_resource() treats it as a name of view
+            continue
+        node = tree
+        for segment in segments:
+            node = node[1].setdefault(segment, ([], {}))
+        node[0].append(path)
+
+    stack = [(find_root(resource), tree)]
+    while stack:
+        context, (node_paths, node_children) = stack.pop()
+        for path in node_paths:
+            result[path] = context
+            if identity_map is not None:
+                identity_map.add('/' + path.strip('/'), context)
+        if not node_children:
+            continue
+        children = _get_children(context, list(node_children))
+        for key, child_node in node_children.items():
+            child = children.get(key)
+            if child is not None:
+                stack.append((child, child_node))
+    return result
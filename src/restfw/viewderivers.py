@@ -5,24 +5,44 @@
 """
 
 import json
-from inspect import isclass
+import zlib
+from inspect import isclass, iscoroutinefunction
 from typing import Callable
 
-import colander
 from pyramid.httpexceptions import (
     HTTPMethodNotAllowed,
     HTTPNotModified,
     HTTPPreconditionFailed,
 )
-from pyramid.interfaces import IViewDeriverInfo
+from pyramid.interfaces import IRendererFactory, IViewDeriverInfo
 from pyramid.response import Response
-from pyramid.viewderivers import INGRESS
+from pyramid.traversal import resource_path
+from pyramid.viewderivers import INGRESS, VIEW
 from webob.etag import AnyETag, NoETag
 
-from .errors import ResultValidationError
+from .async_views import run_coroutine
 from .interfaces import IResource, IResourceView
+from .renderers import JSON, decompress_body, strip_etag_encoding
+from .response_cache import (
+    CachedResponse,
+    get_response_cache_backend,
+    get_response_cache_key,
+    is_response_cache_enabled,
+)
+from .result_validation import (
+    get_result_schema,
+    get_result_validation_sampler,
+    get_result_validation_settings,
+    logger,
+    validate_result,
+)
 from .typing import PyramidRequest
-from .utils import is_testing
+from .utils import (
+    get_resource_etag,
+    get_resource_last_modified,
+    is_testing,
+)
+from .views import JsonStream, is_auto_etag_enabled
 
 
 _View = Callable[[object, PyramidRequest], Response]
@@ -68,7 +88,7 @@ def process_conditional_requests(view: _View, info: IViewDeriverInfo):
             if_match = request.if_match
             if_none_match = request.if_none_match
             if if_match is not AnyETag or if_none_match is not NoETag:
-                etag = context.get_etag()
+                etag = get_resource_etag(request, context)
                 if etag is None:
                     if None not in if_match:
                         raise HTTPPreconditionFailed({'etag': None})
@@ -76,19 +96,54 @@ def process_conditional_requests(view: _View, info: IViewDeriverInfo):
                     # https://tools.ietf.org/html/rfc7232#section-6
                     # https://tools.ietf.org/html/rfc7232#section-2.3.2
                     if if_match is not AnyETag:
-                        if not etag.is_strict or etag.value not in if_match:
+                        if not etag.is_strict or not _etag_matches(etag, if_match):
                             raise HTTPPreconditionFailed({'etag': etag.serialize()})
-                    if etag.value in if_none_match:
+                    if _etag_matches(etag, if_none_match):
                         if request.method in ('GET', 'HEAD'):
                             raise HTTPNotModified()
                         raise HTTPPreconditionFailed({'etag': etag.serialize()})
+            elif request.method in ('GET', 'HEAD'):
+                # https://tools.ietf.org/html/rfc7232#section-3.3
+                # If-Modified-Since is ignored if If-None-Match is present.
+                if_modified_since = request.if_modified_since
+                if if_modified_since is not None:
+                    last_modified = get_resource_last_modified(request, context)
+                    if (
+                        last_modified is not None
+                        and last_modified.replace(microsecond=0) <= if_modified_since
+                    ):
+                        raise HTTPNotModified()
 
         return view(context, request)
 
     return mapped_view
 
 
-def check_result_schema(view: _View, info: IViewDeriverInfo):
+def _etag_matches(etag, matcher) -> bool:
+    """Checks the ETag of resource by values from If-Match or If-None-Match
+    header. Suffixes of content-codings of compressed responses
+    are ignored."""
+    value = etag.value
+    if value in matcher:
+        return True
+    return any(
+        strip_etag_encoding(other) == value for other in getattr(matcher, 'etags', ())
+    )
+
+
+def get_body_etag(body: bytes) -> str:
+    """Returns value of weak ETag calculated from a response body."""
+    return f'{len(body):x}-{zlib.crc32(body):08x}'
+
+
+def auto_etag(view: _View, info: IViewDeriverInfo):
+    """Adds weak ETag calculated from a rendered body to responses of GET
+    requests to resources that haven't own ETag, and answers
+    with 304 status if the ETag matches If-None-Match header.
+
+    The mode is enabled by ``restfw.auto_etag`` setting or by
+    ``auto_etag`` attribute of a view class.
+    """
     if info.exception_only:
         return view
     if info.options.get('name'):
@@ -97,62 +152,195 @@ def check_result_schema(view: _View, info: IViewDeriverInfo):
     view_class = info.options.get('view')
     if not isclass(view_class) or not IResourceView.implementedBy(view_class):
         return view
+    if not is_auto_etag_enabled(view_class, info.registry):
+        return view
 
     def mapped_view(context, request: PyramidRequest):
         response = view(context, request)
         if (
-            context is not request.root
-            and IResource.providedBy(context)
-            and request.method not in {'HEAD', 'OPTIONS'}
+            request.method in ('GET', 'HEAD')
+            and response.status_code == 200
+            and response.etag is None
+            # Don't read body of streamed response
+            and isinstance(response.app_iter, (list, tuple))
         ):
+            value = get_body_etag(response.body)
+            response.etag = (value, False)
+            if value in request.if_none_match:
+                return HTTPNotModified(headers={'ETag': response.headers['ETag']})
+        return response
+
+    return mapped_view
+
+
+def _is_result_checked(context, request: PyramidRequest) -> bool:
+    return (
+        context is not request.root
+        and IResource.providedBy(context)
+        and request.method not in {'HEAD', 'OPTIONS'}
+    )
+
+
+def check_result_schema(view: _View, info: IViewDeriverInfo):
+    if info.exception_only:
+        return view
+    if info.options.get('name'):
+        # Do not wrap a custom-named view for resource.
+        return view
+    view_class = info.options.get('view')
+    if not isclass(view_class) or not IResourceView.implementedBy(view_class):
+        return view
+
+    def mapped_view(context, request: PyramidRequest):
+        response = view(context, request)
+        if _is_result_checked(context, request):
             method = request.method.lower()
-            try:
-                output_schema = view_class.get_output_schema_for_http_method(method)
-            except RuntimeError as e:
-                raise ResultValidationError(e.args[0])
-            if output_schema is None:
+            schema = get_result_schema(view_class, method, request, context)
+            if schema is None:
                 return response
+            rendered = decompress_body(response.body, response.content_encoding)
+            validate_result(schema, json.loads(rendered))
+        return response
+
+    return mapped_view
+
+
+def sample_result_schema(view: _View, info: IViewDeriverInfo):
+    """Validates a sample of results of views in production mode.
+    Errors are logged instead of raising.
 
-            try:
-                rendered = response.body
-                schema = output_schema().bind(request=request, context=context)
-                cstruct = json.loads(rendered)
-                appstruct = schema.deserialize(cstruct)
-                if isinstance(appstruct, dict):
-                    if not isinstance(cstruct, dict):
-                        raise ResultValidationError(
-                            f'Type of API result ({cstruct.__class__.__name__}) '
-                            f'is not equal to expected type (dict)'
-                        )
-                    result_keys = set(cstruct.keys())
-                    schema_keys = set(appstruct.keys())
-                    detail = {}
-                    diff = result_keys - schema_keys
-                    for key in diff:
-                        detail[key] = 'Field from result is absent in the schema'
-                    diff = schema_keys - result_keys
-                    for key in diff:
-                        detail[key] = 'Field from schema is absent in the result'
-                    if detail:
-                        raise ResultValidationError(detail)
-                elif isinstance(appstruct, (list, tuple)):
-                    if not isinstance(cstruct, (list, tuple)):
-                        raise ResultValidationError(
-                            f'Type of API result ({cstruct.__class__.__name__}) '
-                            f'is not equal to expected type (list)'
-                        )
-            except colander.Invalid as e:
-                raise ResultValidationError(e.asdict())
+    The deriver is placed below ``rendered_view``, so a result of a view
+    is converted into JSON data by adapters of the JSON renderer,
+    validated, and the converted data is passed to the renderer.
+    A body of response isn't parsed.
+    """
+    if info.exception_only:
+        return view
+    if info.options.get('name'):
+        # Do not wrap a custom-named view for resource.
+        return view
+    view_class = info.options.get('view')
+    if not isclass(view_class) or not IResourceView.implementedBy(view_class):
+        return view
+    renderer = info.registry.queryUtility(IRendererFactory, name='')
+    if not isinstance(renderer, JSON):
+        return view
+    sampler = get_result_validation_sampler(info.registry)
+
+    def mapped_view(context, request: PyramidRequest):
+        result = view(context, request)
+        if (
+            isinstance(result, (Response, JsonStream))
+            or not _is_result_checked(context, request)
+            or not sampler.should_validate(view_class)
+        ):
+            return result
+        method = request.method.lower()
+        try:
+            schema = get_result_schema(view_class, method, request, context)
+        except Exception:
+            logger.exception('Failed to prepare validation of result')
+            return result
+        if schema is None:
+            return result
+        # Errors of adapters are raised as they would be raised by the renderer.
+        data = renderer.to_json_data(result, request)
+        # Validation is executed in the request thread because nodes
+        # of the bound schema may use the request, its identity map
+        # of resources and sessions of storages.
+        request_info = f'{request.method} {request.path}'
+        sampler.validate(view_class, request_info, schema, data)
+        return data
+
+    return mapped_view
+
+
+def cache_response(view: _View, info: IViewDeriverInfo):
+    """Stores rendered responses of GET requests in the response cache
+    if ``options_for_get`` of a view class has ``cacheable=True``."""
+    if info.exception_only:
+        return view
+    if info.options.get('name'):
+        # Do not wrap a custom-named view for resource.
+        return view
+    view_class = info.options.get('view')
+    if not isclass(view_class) or not IResourceView.implementedBy(view_class):
+        return view
+    options_for_get = getattr(view_class, 'options_for_get', None)
+    if not getattr(options_for_get, 'cacheable', False):
+        return view
+    registry = info.registry
+    if not is_response_cache_enabled(registry):
+        return view
+
+    def mapped_view(context, request: PyramidRequest):
+        if (
+            request.method != 'GET'
+            or context is request.root
+            or not IResource.providedBy(context)
+        ):
+            return view(context, request)
+        backend = get_response_cache_backend(request.registry)
+        key = get_response_cache_key(request, context)
+        cached = backend.get(key)
+        if cached is not None:
+            return cached.to_response()
+        response = view(context, request)
+        if (
+            response.status_code == 200
+            and 'Set-Cookie' not in response.headers
+            # Don't read body of streamed response
+            and isinstance(response.app_iter, (list, tuple))
+        ):
+            backend.set(
+                key, resource_path(context), CachedResponse.from_response(response)
+            )
         return response
 
     return mapped_view
 
 
+def execute_coroutine(view: _View, info: IViewDeriverInfo):
+    """Executes coroutines returned by methods of async resource views
+    before rendering of its results."""
+    view_class = info.options.get('view')
+    attr = info.options.get('attr')
+    if not isclass(view_class) or not attr:
+        return view
+    if not iscoroutinefunction(getattr(view_class, attr, None)):
+        return view
+
+    def mapped_view(context, request: PyramidRequest):
+        return run_coroutine(request, view(context, request))
+
+    return mapped_view
+
+
 def register_view_derivers(config):
     config.add_view_deriver(
         process_conditional_requests,
         name='process_conditional_requests',
         under=INGRESS,
     )
+    config.add_view_deriver(
+        auto_etag,
+        name='auto_etag',
+        under='process_conditional_requests',
+        over='secured_view',
+    )
     if is_testing(config.registry):
         config.add_view_deriver(check_result_schema, name='check_result_schema')
+    elif get_result_validation_settings(config.registry)['sample_rate'] > 0:
+        config.add_view_deriver(
+            sample_result_schema,
+            name='check_result_schema',
+            under='rendered_view',
+            over='execute_coroutine',
+        )
+    config.add_view_deriver(cache_response, name='cache_response')
+    config.add_view_deriver(
+        execute_coroutine,
+        name='execute_coroutine',
+        under='rendered_view',
+        over=VIEW,
+    )
@@ -5,29 +5,229 @@
 """
 
 import itertools
-from typing import Optional, Set, Type, Union, get_type_hints
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Set,
+    Type,
+    Union,
+    get_type_hints,
+)
 
 import venusian
 from pyramid import httpexceptions
 from pyramid.config import Configurator
 from pyramid.interfaces import ILocation
+from pyramid.response import Response
+from pyramid.settings import asbool
 from pyramid.traversal import quote_path_segment
-from zope.interface import implementer, provider
+from zope.interface import implementer, provider, providedBy
 
 from . import interfaces, schemas
 from .errors import ParametersError
+from .events import ResourceChanged
 from .external_links import get_external_links
 from .hal import HalResource, SimpleContainer
 from .resources import Resource
-from .typing import Json, PyramidRequest
-from .utils import create_multi_validation_error, get_input_data, get_paging_links
+from .response_cache import get_response_cache_backend, get_response_cache_key
+from .total_count import (
+    TotalCount,
+    get_total_count as get_provided_total_count,
+    to_total_count,
+)
+from .typing import Json, LazySequence, PyramidRequest
+from .utils import (
+    Fields,
+    clear_acl_decisions,
+    clear_resource_identity_map,
+    create_multi_validation_error,
+    create_validation_error,
+    decode_cursor,
+    encode_cursor,
+    get_cursor_paging_links,
+    get_input_data,
+    get_paging_links,
+    get_requested_fields,
+    get_resource_etag,
+    get_resource_last_modified,
+    invalidate_resource_etag,
+    notify,
+)
+
+
+class ResourceViewLookupCache:
+    """Cache of resource view factories resolved by provided-by specifications
+    of a request and a resource.
+
+    The cache is dropped every time when the adapter registry is changed.
+    """
+
+    __slots__ = ('generation', 'factories', 'hits', 'misses')
+
+    def __init__(self, generation: int):
+        self.generation = generation
+        self.factories = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self.factories),
+        }
+
+
+def get_resource_view_lookup_cache(registry) -> ResourceViewLookupCache:
+    adapters = registry.adapters
+    cache: Optional[ResourceViewLookupCache] = getattr(
+        registry, '_restfw_view_lookup_cache', None
+    )
+    if cache is None or cache.generation != adapters._generation:
+        cache = ResourceViewLookupCache(adapters._generation)
+        registry._restfw_view_lookup_cache = cache
+    return cache
+
+
+def _lookup_resource_view_factory(resource, request: PyramidRequest):
+    registry = request.registry
+    cache = get_resource_view_lookup_cache(registry)
+    key = (providedBy(request), providedBy(resource))
+    try:
+        factory = cache.factories[key]
+        cache.hits += 1
+    except KeyError:
+        cache.misses += 1
+        factory = registry.adapters.lookup(key, interfaces.IResourceView)
+        cache.factories[key] = factory
+    return factory
 
 
 def get_resource_view(resource, request: PyramidRequest) -> Optional['ResourceView']:
-    return request.registry.queryMultiAdapter(
-        (request, resource), interfaces.IResourceView
+    factory = _lookup_resource_view_factory(resource, request)
+    if factory is None:
+        return None
+    return factory(request, resource)
+
+
+def get_resource_view_class(
+    resource, request: PyramidRequest
+) -> Optional[Type['ResourceView']]:
+    """Returns class of resource view without creating an instance of it."""
+    factory = _lookup_resource_view_factory(resource, request)
+    if factory is None:
+        return None
+    get_view_class = getattr(factory, 'get_view_class', None)
+    if get_view_class is not None:
+        return get_view_class(request, resource)
+    view = factory(request, resource)
+    return None if view is None else view.__class__
+
+
+HTTP_METHODS = ('get', 'post', 'put', 'patch', 'delete')
+
+
+class MethodTable:
+    """Immutable table with options of HTTP methods of a resource view class.
+    Keys of mappings are names of HTTP methods in lower case. Options of GET
+    method are also used for HEAD method.
+
+    Options are taken from attributes ``options_for_*`` of the class,
+    so instances of the view class must not override them. Allowed methods
+    may be changed by overriding of ``ResourceView.get_allowed_methods()``.
+    """
+
+    __slots__ = (
+        'view_class',
+        'allowed_methods',
+        'allow_header',
+        'has_custom_allowed_methods',
+        'options',
+        'input_schemas',
+        'output_schemas',
+        'permissions',
+        'output_errors',
     )
 
+    def __init__(self, view_class):
+        from .authorization import get_view_permission
+
+        allowed_methods = {'OPTIONS'}
+        options = {}
+        input_schemas = {}
+        output_schemas = {}
+        permissions = {}
+        output_errors = {}
+        for method in HTTP_METHODS:
+            method_options = getattr(view_class, f'options_for_{method}', None)
+            if method_options is None:
+                continue
+            allowed_methods.add(method.upper())
+            options[method] = method_options
+            input_schemas[method] = method_options.input_schema
+            permissions[method] = get_view_permission(method, method_options.permission)
+            output_schema = method_options.output_schema
+            if output_schema is False:
+                if method in ('put', 'patch', 'delete'):
+                    # Get output_schema of the GET method
+                    # if it is equal False for PUT/PATCH/DELETE methods.
+                    get_options = getattr(view_class, 'options_for_get', None)
+                    output_schema = get_options.output_schema if get_options else None
+                else:
+                    output_errors[method] = (
+                        f'Output schema specified for {method.upper()} method in'
+                        f' {view_class.__name__} view class can not be False.'
+                    )
+            output_schemas[method] = output_schema
+        if 'get' in options:
+            allowed_methods.add('HEAD')
+            for mapping in (options, input_schemas, output_schemas, permissions):
+                mapping['head'] = mapping['get']
+
+        self.view_class = view_class
+        self.allowed_methods = frozenset(allowed_methods)
+        self.allow_header = ', '.join(sorted(allowed_methods))
+        self.has_custom_allowed_methods = (
+            getattr(view_class, 'get_allowed_methods', None)
+            is not ResourceView.get_allowed_methods
+        )
+        self.options = MappingProxyType(options)
+        self.input_schemas = MappingProxyType(input_schemas)
+        self.output_schemas = MappingProxyType(output_schemas)
+        self.permissions = MappingProxyType(permissions)
+        self.output_errors = MappingProxyType(output_errors)
+
+    def get_output_schema(self, method: str):
+        if error := self.output_errors.get(method):
+            raise RuntimeError(error)
+        return self.output_schemas.get(method)
+
+
+def get_method_table(view_class) -> MethodTable:
+    """Returns table with options of HTTP methods of the view class.
+    The table is built once and stored in the class."""
+    table = getattr(view_class, '__method_table__', None)
+    # A table of base class must not be used for subclasses
+    if table is None or table.view_class is not view_class:
+        table = MethodTable(view_class)
+        view_class.__method_table__ = table
+    return table
+
+
+def is_auto_etag_enabled(view_class, registry) -> bool:
+    """Returns True if weak ETags are calculated from rendered bodies
+    of GET responses of the view class (see ``ResourceView.auto_etag``)."""
+    enabled = getattr(view_class, 'auto_etag', None)
+    if enabled is None:
+        settings = registry.settings or {}
+        enabled = asbool(settings.get('restfw.auto_etag', False))
+    return enabled
+
 
 class resource_view_config:
     """A class :term:`decorator` which allows a
@@ -106,11 +306,46 @@ class resource_view_config:
         return wrapped
 
 
+class Lazy:
+    """A value of field of resource representation that is computed
+    only if the field is included into a response.
+
+    Example:
+
+      .. code-block:: python
+
+        def as_dict(self):
+            return {
+                'name': self.resource.name,
+                'stats': Lazy(self.resource.calculate_stats),
+            }
+    """
+
+    __slots__ = ('func',)
+
+    def __init__(self, func: Callable[[], Any]):
+        self.func = func
+
+    def __json__(self, request: PyramidRequest):
+        return self.func()
+
+
 @resource_view_config()
 @implementer(interfaces.IResourceView)
 @provider(interfaces.IResourceViewClass)
 class ResourceView:
     resource: Resource
+    # Fields requested by a client through ``fields`` parameter
+    # of GET request. None means all fields.
+    fields: Optional[Fields] = None
+    # Add weak ETag calculated from a rendered body to responses
+    # of GET requests. None means a value of ``restfw.auto_etag`` setting.
+    auto_etag: Optional[bool] = None
+    # Answer to HEAD requests without rendering of a resource representation.
+    # Only headers are calculated: ETag, Last-Modified and X-Total-Count.
+    # The mode is not used if ETag is calculated from a rendered body
+    # (see ``auto_etag``).
+    fast_head = False
 
     def __init__(self, context: Resource, request: PyramidRequest):
         self.resource = context
@@ -123,13 +358,17 @@ class ResourceView:
         return str(self)
 
     def __json__(self) -> Json:
-        return self.as_dict()
+        return self._filter_fields(self.as_dict())
 
     def as_dict(self) -> Json:
         return {}
 
     def http_options(self):
-        allowed_methods = ', '.join(self.get_allowed_methods())
+        table = get_method_table(self.__class__)
+        if table.has_custom_allowed_methods:
+            allowed_methods = ', '.join(sorted(self.get_allowed_methods()))
+        else:
+            allowed_methods = table.allow_header
         self.request.response.headers['Allow'] = allowed_methods
         if 'Access-Control-Request-Method' in self.request.headers:
             self.request.response.headers['Access-Control-Allow-Methods'] = (
@@ -142,11 +381,52 @@ class ResourceView:
     )
 
     def http_head(self):
-        return self.http_get()
+        if not self._is_fast_head():
+            return self.http_get()
+        cached_response = self._get_cached_get_response()
+        if cached_response is not None:
+            return cached_response
+        self._process_result(result=self.resource, context=self.resource)
+        self._add_head_headers()
+        return self._get_head_response()
+
+    def _is_fast_head(self) -> bool:
+        return self.fast_head and not is_auto_etag_enabled(
+            self.__class__, self.request.registry
+        )
+
+    def _get_cached_get_response(self) -> Optional[Response]:
+        method_options = self.options_for_get
+        if method_options is not None and method_options.cacheable:
+            # Headers of a cached GET response contain right Content-Length
+            backend = get_response_cache_backend(self.request.registry)
+            cached = backend.get(get_response_cache_key(self.request, self.resource))
+            if cached is not None:
+                return cached.to_response()
+        return None
+
+    def _get_head_response(self) -> Response:
+        response = self.request.response
+        response.content_type = 'application/json'
+        # Length of the body is unknown without rendering of a GET response
+        response.content_length = None
+        from .renderers import get_compression
+
+        compression = get_compression(self.request.registry)
+        if compression:
+            # The same Vary and ETag headers as in a response of GET request
+            compression.prepare_response(response, compression.negotiate(self.request))
+        return response
+
+    def _add_head_headers(self):
+        """Adds headers which depend on a resource representation
+        into a response of HEAD request in the fast mode."""
+        pass
 
     def http_get(self):
         """Returns a resource representation."""
         self._process_result(result=self.resource, context=self.resource)
+        self.fields = self.get_requested_fields(self.request)
         return self.__json__()
 
     options_for_post: Optional[interfaces.MethodOptions] = None
@@ -162,6 +442,7 @@ class ResourceView:
             )
             error.headers = e.headers
             raise error from e
+        self._on_resource_changed()
         return self._process_result(result, created)
 
     options_for_put: Optional[interfaces.MethodOptions] = None
@@ -177,6 +458,7 @@ class ResourceView:
             )
             error.headers = e.headers
             raise error from e
+        self._on_resource_changed()
         self._process_result(
             result=self.resource, created=created, context=self.resource
         )
@@ -195,6 +477,7 @@ class ResourceView:
             )
             error.headers = e.headers
             raise error from e
+        self._on_resource_changed()
         self._process_result(
             result=self.resource, created=created, context=self.resource
         )
@@ -213,32 +496,43 @@ class ResourceView:
             )
             error.headers = e.headers
             raise error from e
+        self._on_resource_changed()
         return self._process_result(result)
 
+    def _on_resource_changed(self):
+        """Called after successful modification of the resource
+        by POST, PUT, PATCH or DELETE request."""
+        invalidate_resource_etag(self.request, self.resource)
+        clear_resource_identity_map(self.request)
+        clear_acl_decisions(self.request)
+        notify(ResourceChanged(self.resource), self.request)
+
     def get_allowed_methods(self) -> Set[str]:
-        methods = {'OPTIONS'}
-        for method in ('get', 'put', 'patch', 'delete', 'post'):
-            method_options = f'options_for_{method}'
-            method_options = getattr(self, method_options, None)
-            if method_options is not None:
-                methods.add(method.upper())
-        if 'GET' in methods:
-            methods.add('HEAD')
-        return methods
+        return set(get_method_table(self.__class__).allowed_methods)
 
     def _get_params(self) -> Union[dict, list]:
-        request_method = self.request.method.lower()
-        request_method = 'get' if request_method == 'head' else request_method
-        method_options: Optional[interfaces.MethodOptions] = getattr(
-            self, f'options_for_{request_method}', None
-        )
-        input_schema = method_options.input_schema if method_options else None
+        table = get_method_table(self.__class__)
+        input_schema = table.input_schemas.get(self.request.method.lower())
         return (
             get_input_data(self.resource, self.request, input_schema)
             if input_schema
             else {}
         )
 
+    @classmethod
+    def get_requested_fields(cls, request: PyramidRequest) -> Optional[Fields]:
+        """Returns fields requested through ``fields`` parameter of GET request
+        if input schema of GET method supports it."""
+        method_options = cls.options_for_get
+        input_schema = method_options.input_schema if method_options else None
+        return get_requested_fields(request, input_schema)
+
+    def _filter_fields(self, result):
+        fields = self.fields
+        if fields is None or not isinstance(result, dict):
+            return result
+        return {key: value for key, value in result.items() if key in fields}
+
     def _process_result(self, result, created=False, context=None):
         if result is None:
             return httpexceptions.HTTPNoContent()
@@ -253,19 +547,7 @@ class ResourceView:
 
     @classmethod
     def get_output_schema_for_http_method(cls, method: str):
-        method_options = getattr(cls, f'options_for_{method}', None)
-        output_schema = method_options.output_schema if method_options else None
-        if output_schema is False:
-            if method not in ('put', 'patch', 'delete'):
-                # Get output_schema of the GET method
-                # if it is equal False for PUT/PATCH/DELETE methods.
-                raise RuntimeError(
-                    f'Output schema specified for {method.upper()} method in'
-                    f' {cls.__name__} view class can not be False.'
-                )
-            if method_options := cls.options_for_get:
-                output_schema = method_options.output_schema
-        return output_schema
+        return get_method_table(cls).get_output_schema(method)
 
 
 @resource_view_config()
@@ -277,8 +559,15 @@ class HalResourceView(ResourceView):
     )
 
     def __json__(self) -> Json:
-        result = self.as_dict()
+        return self._add_links(self._filter_fields(self.as_dict()))
+
+    def _add_links(self, result: dict) -> dict:
+        fields = self.fields
         links = self.get_links()
+        if fields is not None:
+            links = {
+                name: link for name, link in links.items() if fields.has_link(name)
+            }
         registry = self.request.registry
 
         # Add external links
@@ -286,6 +575,8 @@ class HalResourceView(ResourceView):
             if name in links:
                 # Don't overwrite the link added by resource
                 continue
+            if fields is not None and not fields.has_link(name):
+                continue
             link = link_fabric.get_link(self.request)
             if not link:
                 continue
@@ -300,12 +591,16 @@ class HalResourceView(ResourceView):
             if name in links:
                 # Don't overwrite the link added by resource
                 continue
+            if fields is not None and not fields.has_link(name):
+                continue
             links[name] = {'href': self_url + quote_path_segment(name) + '/'}
         result['_links'] = links
         return result
 
     def as_embedded(self) -> dict:
-        result = self.as_dict()
+        return self._add_embedded_links(self.as_dict())
+
+    def _add_embedded_links(self, result: dict) -> dict:
         # The embedded version of resource has not external links and links to dynamic sub-resources
         links = self.get_links()
 
@@ -324,48 +619,104 @@ class HalResourceView(ResourceView):
     def get_links(self) -> dict:
         return {'self': {'href': self.request.resource_url(self.resource)}}
 
+    @classmethod
+    def prepare_embedded(cls, request: PyramidRequest, resources: list):
+        """This hook is called before rendering of a page of embedded resources.
+        ``resources`` contains all resources of the page that will be rendered
+        by this view class.
+
+        It may be used to load related data for all resources by one query
+        to a storage and stash it (for example, into resources) to use in
+        following calls of ``as_embedded()``.
+        """
+        pass
+
+
+def prepare_embedded_resources(request: PyramidRequest, resources):
+    """Calls ``prepare_embedded()`` hook of view classes for the given page
+    of embedded resources. Resources are grouped by classes of its views.
+    """
+    groups = {}
+    for resource in resources:
+        view_class = get_resource_view_class(resource, request)
+        if view_class is not None and hasattr(view_class, 'prepare_embedded'):
+            groups.setdefault(view_class, []).append(resource)
+    for view_class, group in groups.items():
+        view_class.prepare_embedded(request, group)
+
 
 class EmbeddedResources:
     __slots__ = ('paging_links', 'total_count', 'embedded')
 
     def __init__(self, paging_links=None, total_count=None, **kwargs):
         self.paging_links = paging_links or {}
-        self.total_count = total_count
+        self.total_count: Optional[TotalCount] = to_total_count(total_count)
         self.embedded = kwargs
 
     def __json__(self, request: PyramidRequest):
         result = {}
+        for key, rendered, is_list in self.iter_rendered(request):
+            result[key] = list(rendered) if is_list else rendered
+        self.add_headers(request)
+        return result
+
+    def iter_rendered(
+        self, request: PyramidRequest
+    ) -> Iterator[tuple[str, Union[Iterator[Json], Json], bool]]:
+        """Yields tuples with name of embedded resources, its rendered
+        representation and flag that indicates the representation is a list.
+        Items of lists are rendered lazily, one by one.
+        """
         for key, resources in self.embedded.items():
             if resources is None:
                 continue
             if not isinstance(resources, (dict, str)) and hasattr(
                 resources, '__iter__'
             ):
-                rendered = []
-                for resource in resources:
-                    view = get_resource_view(resource, request)
-                    if view:
-                        if hasattr(view, 'as_embedded'):
-                            rendered.append(view.as_embedded())
-                        else:
-                            rendered.append(view.__json__())
-                    else:
-                        rendered.append(resource)
+                rendered = (
+                    _render_embedded_resource(resource, request)
+                    for resource in resources
+                )
+                yield key, rendered, True
             elif interfaces.IHalResource.providedBy(resources):
-                view = get_resource_view(resources, request)
-                if view:
-                    if hasattr(view, 'as_embedded'):
-                        rendered = view.as_embedded()
-                    else:
-                        rendered = view.__json__()
-                else:
-                    rendered = resources
+                yield key, _render_embedded_resource(resources, request), False
             else:
-                rendered = resources
-            result[key] = rendered
-        if self.total_count is not None:
-            request.response.headers['X-Total-Count'] = str(self.total_count)
-        return result
+                yield key, resources, False
+
+    def add_headers(self, request: PyramidRequest):
+        total_count = self.total_count
+        if total_count is None:
+            return
+        headers = request.response.headers
+        headers['X-Total-Count'] = str(total_count.value)
+        if total_count.is_estimated:
+            headers['X-Total-Count-Estimated'] = 'true'
+
+
+def _render_embedded_resource(resource, request: PyramidRequest) -> Json:
+    view = get_resource_view(resource, request)
+    if view:
+        if hasattr(view, 'as_embedded'):
+            return view.as_embedded()
+        return view.__json__()
+    return resource
+
+
+class JsonStream:
+    """A wrapper of a view result which tells the JSON renderer to encode
+    embedded resources one by one into ``app_iter`` of response
+    instead of building whole body in memory.
+
+    Representations of embedded resources are built by the renderer while
+    the request is processed, only encoding of them is deferred. So objects
+    with ``__json__()`` method inside of the representations must not use
+    request-scoped resources (a DB session, threadlocals).
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value: dict):
+        self.value = value
 
 
 @implementer(interfaces.IHalResourceWithEmbeddedView)
@@ -374,35 +725,81 @@ class HalResourceWithEmbeddedView(HalResourceView):
         schemas.GetEmbeddedSchema,
         schemas.HalResourceWithEmbeddedSchema,
     )
+    # Encode embedded resources into a response body in streaming mode.
+    # Note that an error occurred while encoding of embedded resources
+    # can't change status of the response in this mode.
+    stream_embedded = False
+    # The view uses cursor_to_embedded_resources(), so its registration
+    # requires ``restfw.cursor_secret`` setting.
+    cursor_paging = False
 
     def http_get(self):
         params = self._get_params()
+        self.fields = fields = self.get_requested_fields(self.request)
         result = self.__json__()
-        if params.get('embedded', True):
+        if params.get('embedded', True) and (fields is None or '_embedded' in fields):
             embedded_resources = self.get_embedded(params)
             if embedded_resources:
                 result['_embedded'] = embedded_resources
                 result['_links'].update(embedded_resources.paging_links)
-        return self._process_result(result, context=self.resource)
+        result = self._process_result(result, context=self.resource)
+        if self.stream_embedded and isinstance(result, dict):
+            return JsonStream(result)
+        return result
 
     def get_embedded(self, params: dict) -> EmbeddedResources:
         return EmbeddedResources(total_count=0, items=[])
 
+    def _add_head_headers(self):
+        params = self._get_params()
+        if not params.get('total_count') or not params.get('embedded', True):
+            return
+        fields = self.get_requested_fields(self.request)
+        if fields is not None and '_embedded' not in fields:
+            return
+        # An empty page is enough to get a total count from
+        # a total count provider or from the collection.
+        embedded_resources = self.get_embedded(dict(params, limit=0))
+        if embedded_resources:
+            embedded_resources.add_headers(self.request)
+
 
 def list_to_embedded_resources(
-    request: PyramidRequest, params, resources, parent, embedded_name: str
+    request: PyramidRequest,
+    params,
+    resources: Union[LazySequence, Iterable],
+    parent,
+    embedded_name: str,
 ):
+    """Returns a page of embedded resources for offset/limit pagination.
+
+    If ``resources`` implements the ``LazySequence`` protocol (supports
+    ``len()`` and slicing), only items of requested page are fetched
+    from it, and ``len()`` is called only if total count is requested and
+    a total count provider is not registered. Other iterables are converted
+    into a list.
+    """
     offset = params['offset']
     limit = params['limit']
     end = offset + limit
-    count = len(resources)
-    if not isinstance(resources, (list, tuple)):
+    if not isinstance(resources, (list, tuple)) and (
+        isinstance(resources, Mapping) or not isinstance(resources, LazySequence)
+    ):
         resources = list(resources)
-    page = resources[offset:end]
-    has_next_page = count > end
+    page = resources[offset : end + 1]
+    if not isinstance(page, list):
+        page = list(page)
+    has_next_page = len(page) > limit
+    if has_next_page:
+        del page[limit:]
+    prepare_embedded_resources(request, page)
     paging_links = get_paging_links(parent, request, offset, limit, has_next_page)
     embedded = {embedded_name: page}
-    total_count = count if params['total_count'] else None
+    total_count = None
+    if params['total_count']:
+        total_count = get_provided_total_count(request, parent, embedded_name)
+        if total_count is None:
+            total_count = len(resources)
     return EmbeddedResources(paging_links, total_count, **embedded)
 
 
@@ -428,27 +825,107 @@ def iter_to_embedded_resources(request, params, iterable, parent, embedded_name)
     offset = params['offset']
     limit = params['limit']
     end = offset + limit + 1
+    total_count = None
     if params['total_count']:
-        iterable = _IterLength(iterable)
+        total_count = get_provided_total_count(request, parent, embedded_name)
+        if total_count is None:
+            iterable = _IterLength(iterable)
 
     page = list(itertools.islice(iterable, offset, end))
     has_next_page = len(page) > limit
     if has_next_page:
         page.pop(limit)
+    prepare_embedded_resources(request, page)
     paging_links = get_paging_links(parent, request, offset, limit, has_next_page)
     embedded = {embedded_name: page}
-    total_count = iterable.get_len() if params['total_count'] else None
+    if params['total_count'] and total_count is None:
+        total_count = iterable.get_len()
+    return EmbeddedResources(paging_links, total_count, **embedded)
+
+
+def cursor_to_embedded_resources(
+    request: PyramidRequest,
+    params: dict,
+    seek: Callable[[Any, int, bool], Iterable],
+    get_position: Callable[[Any], Json],
+    parent,
+    embedded_name: str,
+    get_total_count: Optional[Callable[[], int]] = None,
+):
+    """Returns a page of embedded resources for keyset (cursor based) pagination.
+    ``params`` must be deserialized by ``GetNextPageSchema``.
+
+    :param seek: A callable with arguments ``(position, limit, reverse)`` that
+        returns up to ``limit`` items of the collection placed after the item
+        with the given ``position`` (from start of the collection if
+        ``position`` is None). If ``reverse`` is True, it must return items
+        placed before the item with the given position in backward order.
+    :param get_position: A callable that returns JSON-serializable position
+        (sort key) of the given item.
+    :param get_total_count: An optional callable that returns total count of
+        items in the collection. It is used only if a total count provider
+        is not registered for the parent resource.
+    """
+    limit = params['limit']
+    registry = request.registry
+    cursor_name = 'cursor_prev' if params.get('cursor_prev') else 'cursor_next'
+    cursor = params.get(cursor_name)
+    position = None
+    if cursor:
+        try:
+            position = decode_cursor(registry, cursor)
+        except ValueError:
+            raise create_validation_error(None, 'Invalid cursor', cursor_name)
+
+    reverse = cursor_name == 'cursor_prev'
+    page = list(itertools.islice(seek(position, limit + 1, reverse), limit + 1))
+    has_more = len(page) > limit
+    page = page[:limit]
+    if reverse:
+        page.reverse()
+        has_next_page, has_prev_page = True, has_more
+    else:
+        has_next_page, has_prev_page = has_more, position is not None
+
+    next_cursor = prev_cursor = None
+    if page:
+        if has_next_page:
+            next_cursor = encode_cursor(registry, get_position(page[-1]))
+        if has_prev_page:
+            prev_cursor = encode_cursor(registry, get_position(page[0]))
+    prepare_embedded_resources(request, page)
+    paging_links = get_cursor_paging_links(
+        parent,
+        request,
+        next_cursor,
+        prev_cursor,
+        # An empty page in backward direction means that there are no items
+        # before the position, so the next page is the first page.
+        next_is_first_page=reverse and not page,
+    )
+    embedded = {embedded_name: page}
+    total_count = None
+    if params.get('total_count'):
+        total_count = get_provided_total_count(request, parent, embedded_name)
+        if total_count is None and get_total_count is not None:
+            total_count = get_total_count()
     return EmbeddedResources(paging_links, total_count, **embedded)
 
 
 def _try_add_etag(request: PyramidRequest, result, context: Optional[Resource] = None):
-    etag = None
+    resource = None
     if interfaces.IResource.providedBy(result):
-        etag = result.get_etag()
+        resource = result
     elif context is not None:
-        etag = context.get_etag()
+        resource = context
+    if resource is None:
+        return
+    etag = get_resource_etag(request, resource)
     if etag is not None:
         request.response.etag = (etag.value, etag.is_strict)
+    last_modified = get_resource_last_modified(request, resource)
+    if last_modified is not None:
+        request.response.last_modified = last_modified
 
 
 @resource_view_config()